@@ -0,0 +1,189 @@
+import os
+import re
+import copy
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from core.registry import JsonRegistry
+from core.storage import write_lock
+
+
+INTENT_CACHE_FILE = "memory/intent_cache.json"
+
+# In-memory LRU size, on-disk entry bound and lifetime of a cached intent
+INTENT_CACHE_MEMORY_ENTRIES = int(os.environ.get("SOLIN_INTENT_CACHE_MEMORY", 256))
+INTENT_CACHE_DISK_ENTRIES = int(os.environ.get("SOLIN_INTENT_CACHE_SIZE", 2000))
+INTENT_CACHE_TTL = float(os.environ.get("SOLIN_INTENT_CACHE_TTL", 30 * 24 * 3600))
+
+# Resolved dates/times the model may have filled in from "today", "now", ...
+_DATE_OR_TIME = re.compile(r"\d{4}-\d{2}-\d{2}|\b\d{1,2}:\d{2}\b")
+
+
+def normalize_input(user_input):
+    """Spelling of an utterance used as the cache key"""
+    text = unicodedata.normalize("NFKC", str(user_input)).casefold()
+    text = " ".join(text.split())
+    return text.strip(" \"'").rstrip(".!?").strip()
+
+
+def prompt_fingerprint(system_prompt, model):
+    """Changes whenever the system prompt or the model does"""
+    return hashlib.sha256(f"{model}\0{system_prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+def is_cacheable(normalized_input, result):
+    """Only plain action dicts whose params came from the words typed
+
+    A result holding a concrete date or time the user never wrote (the
+    model resolving "today" or "now") would be stale tomorrow, so it is
+    not cached.
+    """
+    if not isinstance(result, dict) or not result.get("action"):
+        return False
+    params = result.get("params") or {}
+    if not isinstance(params, dict):
+        return False
+    for value in params.values():
+        for stamp in _DATE_OR_TIME.findall(str(value)):
+            if stamp not in normalized_input:
+                return False
+    return True
+
+
+# ----------------------------------------
+# Two-Tier Intent Cache
+# ----------------------------------------
+
+class IntentCache:
+    """Parsed LLM intents keyed by normalized input, prompt and model.
+
+    Lookups hit an in-process LRU first, then ``intent_cache.json`` (shared
+    by every session and re-read only when it changes). Entries expire
+    after ``ttl`` seconds; the file keeps at most ``disk_entries`` of them,
+    dropping the oldest, plus anything written under a different system
+    prompt or model.
+    """
+
+    def __init__(self, path=INTENT_CACHE_FILE, memory_entries=INTENT_CACHE_MEMORY_ENTRIES,
+                 disk_entries=INTENT_CACHE_DISK_ENTRIES, ttl=INTENT_CACHE_TTL):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._disk = JsonRegistry(path)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                       "miss_seconds": 0.0, "hit_seconds": 0.0}
+
+    @staticmethod
+    def _key(normalized_input, fingerprint):
+        return hashlib.sha256(f"{fingerprint}\0{normalized_input}".encode("utf-8")).hexdigest()[:32]
+
+    def _remember(self, key, created, result):
+        self._memory[key] = (created, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, user_input, fingerprint):
+        """Cached intent for ``user_input`` (a fresh copy), or None"""
+        started = time.perf_counter()
+        key = self._key(normalize_input(user_input), fingerprint)
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self._memory.move_to_end(key)
+                tier = "memory_hits"
+            else:
+                self._memory.pop(key, None)
+                cached = None
+                stored = self._disk.lookup(key)
+                if (stored and stored.get("fingerprint") == fingerprint
+                        and now - stored.get("created", 0) < self.ttl):
+                    cached = (stored["created"], stored["result"])
+                    self._remember(key, *cached)
+                    tier = "disk_hits"
+            if cached is None:
+                return None
+            self._stats[tier] += 1
+            self._stats["hit_seconds"] += time.perf_counter() - started
+            # Callers may fill in params, so never hand out the cached dict
+            return copy.deepcopy(cached[1])
+
+    def put(self, user_input, fingerprint, result, seconds=None):
+        """Records a miss that took ``seconds`` and caches ``result`` if safe"""
+        normalized_input = normalize_input(user_input)
+        with self._lock:
+            self._stats["misses"] += 1
+            if seconds is not None:
+                self._stats["miss_seconds"] += seconds
+            if not is_cacheable(normalized_input, result):
+                return False
+            key = self._key(normalized_input, fingerprint)
+            created = time.time()
+            result = copy.deepcopy(result)
+            self._remember(key, created, result)
+
+            with write_lock(self.path):
+                stored = self._disk.get() or {}
+                stored[key] = {"input": normalized_input, "fingerprint": fingerprint,
+                               "created": created, "result": result}
+                self._disk.save(self._prune(stored, fingerprint, created))
+        return True
+
+    def _prune(self, stored, fingerprint, now):
+        live = [(entry.get("created", 0), key) for key, entry in stored.items()
+                if entry.get("fingerprint") == fingerprint
+                and now - entry.get("created", 0) < self.ttl]
+        live.sort(reverse=True)
+        return {key: stored[key] for _, key in live[:self.disk_entries]}
+
+    def clear(self):
+        with self._lock, write_lock(self.path):
+            self._memory.clear()
+            self._disk.save({})
+
+    def stats(self):
+        """Hit/miss counters and the LLM time the hits are estimated to have saved"""
+        with self._lock:
+            stats = dict(self._stats)
+            memory_entries = len(self._memory)
+        disk = self._disk.get() or {}
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        average_miss = stats["miss_seconds"] / stats["misses"] if stats["misses"] else 0.0
+        return {
+            "memory_hits": stats["memory_hits"],
+            "disk_hits": stats["disk_hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "average_miss_seconds": round(average_miss, 3),
+            "average_hit_ms": round(stats["hit_seconds"] / hits * 1000, 3) if hits else 0.0,
+            "saved_seconds": round(max(average_miss * hits - stats["hit_seconds"], 0.0), 3),
+            "memory_entries": memory_entries,
+            "disk_entries": len(disk)
+            }
+
+
+_intent_cache = None
+_intent_cache_lock = threading.Lock()
+
+
+def get_intent_cache():
+    """Process-wide intent cache"""
+    global _intent_cache
+    with _intent_cache_lock:
+        if _intent_cache is None:
+            _intent_cache = IntentCache()
+        return _intent_cache
+
+
+def intent_cache_stats():
+    """Hit/miss counters of the interpret_command cache"""
+    return get_intent_cache().stats()
@@ -1,61 +1,151 @@
 import os
 import requests
 import json
-import re
 import unicodedata
 import time
+import threading
+from contextlib import closing
+
+from agents.intent_cache import get_intent_cache, prompt_fingerprint
+from agents.ollama_client import OllamaUnavailable, get_ollama_client
+
+SYSTEM_PROMPT_FILE=os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__),"..")),
+                                "prompts","system_prompts.md")
+INTERPRET_INSTRUCTION="Interpret the following user request and return a dictionary describing the action."
+
+_system_prompt_cache={"signature": None, "text": None, "fingerprints": {}}
+_system_prompt_lock=threading.Lock()
+
+def load_system_prompt(model):
+    """
+    Returns (system message, fingerprint) for ``model``, or (None, None) if
+    the prompt file is missing. The file is read once and only re-read when
+    its mtime or size changes, so the message stays byte-identical between
+    calls and Ollama can reuse the evaluated prefix.
+    """
+    try:
+        stat=os.stat(SYSTEM_PROMPT_FILE)
+    except FileNotFoundError:
+        return None, None
+    signature=(stat.st_mtime_ns, stat.st_size)
+    
+    with _system_prompt_lock:
+        cache=_system_prompt_cache
+        if cache["signature"]!=signature:
+            with open(SYSTEM_PROMPT_FILE, "r", encoding="utf-8") as file:
+                cache["text"]=f"{file.read().strip()}\n\n{INTERPRET_INSTRUCTION}"
+            cache["signature"]=signature
+            cache["fingerprints"]={}
+        if model not in cache["fingerprints"]:
+            cache["fingerprints"][model]=prompt_fingerprint(cache["text"], model)
+        return cache["text"], cache["fingerprints"][model]
 
 def interpret_command(user_input):
-    max_retries=5
-    retry_delay=3
-    base_dir=os.path.abspath(os.path.join(os.path.dirname(__file__),".."))
-    system_prompt_file=os.path.join(base_dir,"prompts","system_prompts.md")
+    client=get_ollama_client()
+    model=client.model
     
-    if not os.path.exists(system_prompt_file):
+    system_prompt, fingerprint=load_system_prompt(model)
+    if system_prompt is None:
         print("System prompt file not found. I’d love to help, but I need that first.")
         return None
-        
-    with open(system_prompt_file, "r", encoding="utf-8") as file:
-        system_prompt=file.read()
-        
-    final_prompt=(
-        f"{system_prompt.strip()}\n\n"
-        f"Interpret the following user request and return a dictionary describing the action.\n"
-        f"### User Input:\n"
-        f"{user_input.strip()}"
-        )
 
-    url="http://localhost:11434/api/generate"
+    # Everyday commands are answered from the cache without calling Ollama
+    cache=get_intent_cache()
+    cached=cache.get(user_input, fingerprint)
+    if cached is not None:
+        return cached
 
-    payload={
-        "model":"llama3:8b",
-        "prompt":final_prompt,
-        "stream": False
-        }
-    
-    for attempt in range(max_retries):
-        try:
-            response=requests.post(url, json=payload)
-            if response.status_code==200:
-                break
-            else:
-                print(f"Attempt {attempt+1}: Ollama returned status code {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"Attempt {attempt+1} failed: {e}")
-        time.sleep(retry_delay)
-        
-    else:
-        print(f"Ollama could not be reached after {max_retries} attempts.")
+    # Stable system message + the utterance alone: only the latter is evaluated
+    messages=[
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_input.strip()}
+        ]
+
+    def attempt(timeout):
+        extractor=DictExtractor()
+        with closing(client.chat_chunks(messages, model=model, timeout=timeout)) as chunks:
+            for chunk in chunks:
+                # Hang up once the first object is complete; the chatter after it is never generated
+                extractor.feed(chunk)
+                if extractor.done:
+                    break
+        return extractor
+
+    started=time.perf_counter()
+    try:
+        extractor=client.retrying(attempt, on_retry=lambda n, e: print(f"Attempt {n} failed: {e}"))
+    except OllamaUnavailable:
+        # Breaker is open: fail instantly, the background probe re-enables calls
+        print("Ollama is unavailable right now; try one of the built-in commands (type 'help').")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Ollama could not be reached: {e}")
         return None
     
-    if response.status_code==200:
-        json_response=response.json()
-        json_output=json_response.get("response", "")
-        print("Raw LLM Response:\n", json_output)
-        parsed = extract_dict(json_output)
-        return parsed
-    else:
-        print(f"Ollama returned an error code: {response.status_code}. Possibly offended by the prompt.")
+    print("Raw LLM Response:\n", extractor.text)
+    parsed=extractor.result if extractor.done else extract_dict(extractor.text)
+    cache.put(user_input, fingerprint, parsed, time.perf_counter()-started)
+    return parsed
+    
+class DictExtractor:
+    """
+    Incremental version of extract_dict for streamed responses. Feed it the
+    text as it arrives; the first JSON object is parsed the moment its
+    closing brace shows up. Braces inside JSON strings are not counted.
+    """
+    
+    def __init__(self):
+        self.text=""
+        self.result=None
+        self.done=False
+        self._start=-1
+        self._position=0
+        self._depth=0
+        self._in_string=False
+        self._escaped=False
+        
+    @property
+    def started(self):
+        return self._start!=-1
+        
+    def feed(self, chunk):
+        """Returns the parsed dict once complete, else None"""
+        if self.done:
+            return self.result
+        self.text+=unicodedata.normalize("NFKC", chunk)
+        text=self.text
+        
+        for i in range(self._position, len(text)):
+            char=text[i]
+            if self._start==-1:
+                if char=="{":
+                    self._start=i
+                    self._depth=1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped=False
+                elif char=="\\":
+                    self._escaped=True
+                elif char=='"':
+                    self._in_string=False
+            elif char=='"':
+                self._in_string=True
+            elif char=="{":
+                self._depth+=1
+            elif char=="}":
+                self._depth-=1
+                if self._depth==0:
+                    self._position=i+1
+                    self.done=True
+                    json_str=text[self._start:i+1]
+                    try:
+                        self.result=json.loads(json_str)
+                    except json.JSONDecodeError as e:
+                        print(f"JSON decoding failed: {e}")
+                        print("Extracted (bad) block was :\n", repr(json_str))
+                    return self.result
+        self._position=len(text)
         return None
     
 def extract_dict(response_line)->dict:
@@ -64,31 +154,12 @@ def extract_dict(response_line)->dict:
     Handles markdown code blocks, extra text, and common formatting noise.
     """
     
-    response_line = response_line.replace("```json", "").replace("```", "").strip()
-    
-    response_line = unicodedata.normalize("NFKC", response_line)
-    
-    start=response_line.find("{")
-    if start==-1:
+    extractor=DictExtractor()
+    parsed=extractor.feed(response_line)
+    if extractor.done:
+        return parsed
+    if not extractor.started:
         print("No opening brace found.")
-        return None
-    
-    brace_count = 0
-    for i in range(start, len(response_line)):
-        if response_line[i] == "{":
-            brace_count+=1
-        elif response_line[i] == "}":
-            brace_count-=1
-            if brace_count == 0:
-                json_str = response_line[start:i+1]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError as e:
-                    print(f"JSON decoding failed: {e}")
-                    print("Extracted (bad) block was :\n", repr(json_str))
-                    return None
-    print("Unmatched braces - no valid JSON object found.")
+    else:
+        print("Unmatched braces - no valid JSON object found.")
     return None
-
-    
-
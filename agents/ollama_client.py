@@ -0,0 +1,347 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+OLLAMA_URL = os.environ.get("SOLIN_OLLAMA_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_MODEL = os.environ.get("SOLIN_OLLAMA_MODEL", "llama3:8b")
+
+# (connect, read) seconds: fail fast if Ollama is down, wait for long generations
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("SOLIN_OLLAMA_CONNECT_TIMEOUT", 3.05))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("SOLIN_OLLAMA_READ_TIMEOUT", 120))
+
+# How long Ollama keeps the model loaded after each request
+OLLAMA_KEEP_ALIVE = os.environ.get("SOLIN_OLLAMA_KEEP_ALIVE", "30m")
+
+OLLAMA_POOL_SIZE = int(os.environ.get("SOLIN_OLLAMA_POOL_SIZE", 4))
+
+# Context window assumed when the model's Modelfile does not set num_ctx
+# (Ollama's own default, whatever the model was trained with)
+OLLAMA_NUM_CTX = int(os.environ.get("SOLIN_OLLAMA_NUM_CTX", 2048))
+
+# Stream tokens so callers can stop reading as soon as they have an answer
+OLLAMA_STREAM = os.environ.get("SOLIN_OLLAMA_STREAM", "1").lower() not in ("0", "false", "no")
+
+# Retries: attempts per call, backoff bounds (seconds, full jitter) and the
+# overall deadline of one retried call
+OLLAMA_ATTEMPTS = int(os.environ.get("SOLIN_OLLAMA_ATTEMPTS", 3))
+OLLAMA_BACKOFF_BASE = float(os.environ.get("SOLIN_OLLAMA_BACKOFF_BASE", 0.25))
+OLLAMA_BACKOFF_MAX = float(os.environ.get("SOLIN_OLLAMA_BACKOFF_MAX", 4.0))
+OLLAMA_DEADLINE = float(os.environ.get("SOLIN_OLLAMA_DEADLINE", 60))
+
+# Consecutive failed requests that open the breaker, and how often the
+# background probe checks /api/tags while it is open
+OLLAMA_BREAKER_THRESHOLD = int(os.environ.get("SOLIN_OLLAMA_BREAKER_THRESHOLD", 3))
+OLLAMA_PROBE_INTERVAL = float(os.environ.get("SOLIN_OLLAMA_PROBE_INTERVAL", 2.0))
+OLLAMA_PROBE_MAX_INTERVAL = float(os.environ.get("SOLIN_OLLAMA_PROBE_MAX_INTERVAL", 30.0))
+
+
+class OllamaUnavailable(requests.exceptions.ConnectionError):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+# ----------------------------------------
+# Circuit Breaker
+# ----------------------------------------
+
+class CircuitBreaker:
+    """Stops calls to a service that keeps failing.
+
+    After ``threshold`` consecutive failures the breaker opens: ``allow()``
+    returns False, so callers fail immediately and take their fallback
+    instead of waiting on timeouts. While open, a background thread runs
+    ``probe`` with a jittered, growing interval and closes the breaker the
+    first time it succeeds.
+    """
+
+    def __init__(self, probe, threshold=OLLAMA_BREAKER_THRESHOLD,
+                 probe_interval=OLLAMA_PROBE_INTERVAL, max_probe_interval=OLLAMA_PROBE_MAX_INTERVAL):
+        self.probe = probe
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        return "open" if self.opened_at is not None else "closed"
+
+    def allow(self):
+        return self.opened_at is None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures < self.threshold:
+                return
+            self.opened_at = time.monotonic()
+        threading.Thread(target=self._probe_until_healthy, daemon=True).start()
+
+    def _probe_until_healthy(self):
+        interval = self.probe_interval
+        while True:
+            time.sleep(random.uniform(interval / 2, interval))
+            if self.probe():
+                with self._lock:
+                    self.failures = 0
+                    self.opened_at = None
+                return
+            interval = min(interval * 2, self.max_probe_interval)
+
+
+# ----------------------------------------
+# Pooled Ollama Client
+# ----------------------------------------
+
+class OllamaClient:
+    """One keep-alive HTTP session shared by every Ollama call.
+
+    Connections are pooled by a ``requests.Session`` so only the first call
+    pays for TCP setup, and every request carries ``keep_alive`` so the
+    model stays resident between commands instead of being reloaded. All
+    requests go through one circuit breaker, so an outage costs a few
+    failed attempts once rather than a full timeout on every command.
+    """
+
+    def __init__(self, base_url=OLLAMA_URL, model=OLLAMA_MODEL,
+                 timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT),
+                 keep_alive=OLLAMA_KEEP_ALIVE, pool_size=OLLAMA_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.breaker = CircuitBreaker(self.healthy)
+
+        self._timings = {}
+        self._timings_lock = threading.Lock()
+        self._context_windows = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def _timeout(self, timeout):
+        timeout = timeout or self.timeout
+        if isinstance(timeout, (int, float)):
+            return (min(self.timeout[0], timeout), timeout)
+        return timeout
+
+    def _post(self, api, payload, timeout=None, stream=False):
+        """POST guarded by the breaker; connection errors and 5xx count as failures"""
+        if not self.breaker.allow():
+            raise OllamaUnavailable(f"Ollama at {self.base_url} is unavailable (circuit open)")
+        try:
+            response = self.session.post(self.url(f"/api/{api}"), json=payload,
+                                         timeout=self._timeout(timeout), stream=stream)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def healthy(self, timeout=2.0):
+        """Cheap liveness check against ``/api/tags``"""
+        try:
+            return self.session.get(self.url("/api/tags"), timeout=timeout).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def retrying(self, call, attempts=OLLAMA_ATTEMPTS, deadline=OLLAMA_DEADLINE, on_retry=None):
+        """Runs ``call(timeout)`` until it succeeds or the deadline passes
+
+        Retries use exponential backoff with full jitter. ``timeout`` is the
+        time left before the deadline, so no single attempt can overrun it.
+        An open breaker is not retried.
+        """
+        expires = time.monotonic() + deadline
+        backoff = OLLAMA_BACKOFF_BASE
+        for attempt in range(1, attempts + 1):
+            remaining = expires - time.monotonic()
+            try:
+                return call(min(remaining, self.timeout[1]))
+            except OllamaUnavailable:
+                raise
+            except requests.exceptions.RequestException as e:
+                delay = random.uniform(0, min(backoff, OLLAMA_BACKOFF_MAX))
+                if attempt == attempts or time.monotonic() + delay >= expires:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e)
+                time.sleep(delay)
+                backoff *= 2
+
+    def generate(self, prompt, model=None, timeout=None, **fields):
+        """POSTs to ``/api/generate`` (non-streaming) and returns the response
+
+        Extra keyword arguments (``stop``, ``options``, ``format`` ...) are
+        passed through in the request body. A numeric ``timeout`` only
+        replaces the read timeout.
+        """
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            **fields
+            }
+        return self._post("generate", payload, timeout)
+
+    def chat(self, messages, model=None, timeout=None, **fields):
+        """POSTs to ``/api/chat`` (non-streaming) and returns the response
+
+        Keeping the system message byte-identical between calls lets Ollama
+        reuse its evaluated prefix, so only the new messages are processed.
+        """
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            **fields
+            }
+        return self._post("chat", payload, timeout)
+
+    # ---------- Streaming ----------
+
+    def generate_chunks(self, prompt, model=None, timeout=None, stream=OLLAMA_STREAM, **fields):
+        """Yields the generated text piece by piece as Ollama produces it
+
+        Closing the generator early (``break`` inside ``closing()``) drops
+        the connection, which makes Ollama stop generating. With
+        ``stream=False`` the whole response is yielded once.
+        """
+        payload = {"model": model or self.model, "prompt": prompt, "keep_alive": self.keep_alive,
+                   **fields}
+        return self._chunks("generate", payload, timeout, stream,
+                            lambda body: body.get("response", ""))
+
+    def chat_chunks(self, messages, model=None, timeout=None, stream=OLLAMA_STREAM, **fields):
+        """``generate_chunks`` for ``/api/chat``"""
+        payload = {"model": model or self.model, "messages": messages,
+                   "keep_alive": self.keep_alive, **fields}
+        return self._chunks("chat", payload, timeout, stream,
+                            lambda body: (body.get("message") or {}).get("content", ""))
+
+    def _chunks(self, api, payload, timeout, stream, text_of):
+        payload["stream"] = stream
+        # A numeric timeout also bounds the whole stream, not just each read
+        expires = time.monotonic() + timeout if isinstance(timeout, (int, float)) else None
+        response = self._post(api, payload, timeout, stream=stream)
+        try:
+            response.raise_for_status()
+            if not stream:
+                body = response.json()
+                self.record_timings(api, body)
+                yield text_of(body)
+                return
+
+            for line in response.iter_lines():
+                if expires is not None and time.monotonic() > expires:
+                    raise requests.exceptions.Timeout(f"Ollama did not finish within {timeout}s")
+                if not line:
+                    continue
+                body = json.loads(line)
+                if body.get("error"):
+                    raise requests.exceptions.HTTPError(body["error"], response=response)
+                text = text_of(body)
+                if text:
+                    yield text
+                if body.get("done"):
+                    self.record_timings(api, body)
+                    return
+        except requests.exceptions.ConnectionError:
+            # The stream broke off mid-way
+            self.breaker.record_failure()
+            raise
+        finally:
+            response.close()
+
+    def record_timings(self, api, body):
+        """Adds the token counts and durations Ollama reports in ``body``"""
+        with self._timings_lock:
+            totals = self._timings.setdefault(api, {
+                "calls": 0, "prompt_eval_count": 0, "prompt_eval_seconds": 0.0,
+                "eval_count": 0, "eval_seconds": 0.0})
+            totals["calls"] += 1
+            totals["prompt_eval_count"] += body.get("prompt_eval_count") or 0
+            totals["prompt_eval_seconds"] += (body.get("prompt_eval_duration") or 0) / 1e9
+            totals["eval_count"] += body.get("eval_count") or 0
+            totals["eval_seconds"] += (body.get("eval_duration") or 0) / 1e9
+
+    def timings(self):
+        """Per-API totals plus the average prompt tokens/seconds per call"""
+        with self._timings_lock:
+            timings = {api: dict(totals) for api, totals in self._timings.items()}
+        for totals in timings.values():
+            totals["avg_prompt_eval_count"] = round(totals["prompt_eval_count"] / totals["calls"], 1)
+            totals["avg_prompt_eval_ms"] = round(totals["prompt_eval_seconds"] / totals["calls"] * 1000, 1)
+        return timings
+
+    def context_window(self, model=None):
+        """Tokens of context the model runs with, from ``/api/show``
+
+        Uses ``num_ctx`` from the Modelfile parameters, falling back to
+        ``OLLAMA_NUM_CTX``, capped by the trained context length. Looked up
+        once per model; an unreachable server gives the fallback uncached.
+        """
+        model = model or self.model
+        if model in self._context_windows:
+            return self._context_windows[model]
+        try:
+            response = self._post("show", {"model": model, "name": model}, timeout=10)
+            response.raise_for_status()
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            return OLLAMA_NUM_CTX
+
+        match = re.search(r"^\s*num_ctx\s+(\d+)", body.get("parameters") or "", re.MULTILINE)
+        window = int(match.group(1)) if match else OLLAMA_NUM_CTX
+        trained = [value for key, value in (body.get("model_info") or {}).items()
+                   if key.endswith(".context_length") and isinstance(value, int)]
+        if trained:
+            window = min(window, trained[0])
+        self._context_windows[model] = window
+        return window
+
+    def warm_up(self):
+        """Loads the model without generating anything; False if unreachable"""
+        try:
+            response = self._post("generate", {"model": self.model, "keep_alive": self.keep_alive})
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client():
+    """Process-wide Ollama client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
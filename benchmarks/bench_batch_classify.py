@@ -0,0 +1,129 @@
+"""Compares one-at-a-time and batched LLM category classification.
+
+Runs against a local stand-in for Ollama that answers /api/generate from a
+keyword table and sleeps like a real model would: a fixed cost per call,
+plus prompt evaluation and generation time per token. "single" classifies
+each description with its own call (classify_with_llm); "batch" sends them
+through classify_expense_batch, which packs as many as the context window
+allows into one JSON-array request. "batch + 10% bad" makes the stand-in
+answer one item in ten with a non-category, to include the retries.
+
+    python -m benchmarks.bench_batch_classify [N]
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CATEGORY_OF = {
+    "Breakfast": "Food", "Lunch": "Food", "Dinner": "Food", "Uber ride": "Transport",
+    "Metro card": "Transport", "Electricity bill": "Bills", "Vegetables": "Groceries",
+    "Pharmacy": "Health", "Netflix": "Entertainment", "Amazon order": "Shopping",
+    "Movie tickets": "Entertainment", "Petrol": "Transport", "Rent": "Bills"
+    }
+CATEGORIES = {name: "" for name in ["Food", "Transport", "Bills", "Groceries", "Health",
+                                    "Education", "Investment", "Insurance", "Shopping",
+                                    "Social", "Entertainment", "EMI", "Savings"]}
+
+# Simulated model: seconds per call, per prompt token and per generated token
+CALL_SECONDS = 0.02
+PROMPT_TOKEN_SECONDS = 0.0002
+OUTPUT_TOKEN_SECONDS = 0.004
+NUM_CTX = 2048
+
+
+class StandIn(BaseHTTPRequestHandler):
+    error_rate = 0.0
+    calls = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._reply({"models": []})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/show":
+            return self._reply({"parameters": f"num_ctx {NUM_CTX}",
+                                "model_info": {"llama.context_length": 8192}})
+        prompt = payload.get("prompt")
+        if prompt is None:
+            # warm_up
+            return self._reply({"done": True})
+        type(self).calls += 1
+
+        def answer(description):
+            if random.random() < self.error_rate:
+                return "Miscellaneous"
+            return CATEGORY_OF.get(description.strip(), "Shopping")
+
+        if "JSON array" in prompt:
+            descriptions = re.findall(r"^\s*\d+\. (.+)$", prompt, re.MULTILINE)
+            text = json.dumps([answer(description) for description in descriptions])
+        else:
+            text = answer(re.search(r'User Input: "(.*)"', prompt).group(1))
+
+        prompt_tokens, output_tokens = len(prompt) // 4 + 1, len(text) // 4 + 1
+        time.sleep(CALL_SECONDS + prompt_tokens * PROMPT_TOKEN_SECONDS
+                   + output_tokens * OUTPUT_TOKEN_SECONDS)
+        if not payload.get("stream", True):
+            return self._reply({"response": text, "done": True, "prompt_eval_count": prompt_tokens,
+                                "eval_count": output_tokens})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for line in ({"response": text, "done": False}, {"response": "", "done": True}):
+            self.wfile.write((json.dumps(line) + "\n").encode("utf-8"))
+
+
+def measure(label, run, descriptions):
+    StandIn.calls = 0
+    start = time.perf_counter()
+    results = run(descriptions)
+    elapsed = time.perf_counter() - start
+    correct = sum(result == CATEGORY_OF[description]
+                  for description, result in zip(descriptions, results))
+    print(label.ljust(18) + f"| {StandIn.calls:>6} | {elapsed:>9.2f} | {len(descriptions) / elapsed:>13.1f}"
+          f" | {correct:>5}/{len(descriptions)}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Must be set before the client module reads it
+    os.environ["SOLIN_OLLAMA_URL"] = f"http://127.0.0.1:{server.server_port}"
+
+    from agents.ollama_client import get_ollama_client
+    from memory.category_manager import (classification_batch_size, classify_expense_batch,
+                                         classify_with_llm)
+
+    rng = random.Random(42)
+    descriptions = [rng.choice(list(CATEGORY_OF)) for _ in range(n)]
+    names = list(CATEGORIES)
+    window = get_ollama_client().context_window()
+    print(f"{n} descriptions, num_ctx {window}, "
+          f"batch size {classification_batch_size(descriptions, names, window)}\n")
+    print("Mode".ljust(18) + "| " + "Calls".rjust(6) + " | " + "Seconds".rjust(9) + " | "
+          + "Classified/sec".rjust(13) + " | " + "Correct".rjust(9))
+    print("-" * 67)
+    measure("single", lambda items: [classify_with_llm(item, names) for item in items], descriptions)
+    measure("batch", lambda items: classify_expense_batch(items, CATEGORIES), descriptions)
+    StandIn.error_rate = 0.1
+    measure("batch + 10% bad", lambda items: classify_expense_batch(items, CATEGORIES), descriptions)
+    server.shutdown()
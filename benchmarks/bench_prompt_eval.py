@@ -0,0 +1,74 @@
+"""Measures how much prompt Ollama evaluates per interpret_command call.
+
+"generate" rebuilds the old request: the whole system prompt followed by
+the utterance, sent to /api/generate every time. "chat" is the current
+request: a byte-stable system message plus the utterance on /api/chat,
+which lets Ollama reuse the cached prefix. The first chat call primes the
+cache and is reported separately.
+
+Needs a running Ollama (SOLIN_OLLAMA_URL / SOLIN_OLLAMA_MODEL apply).
+
+    python -m benchmarks.bench_prompt_eval [ROUNDS]
+"""
+import sys
+import time
+
+from agents.llm_agent import INTERPRET_INSTRUCTION, load_system_prompt
+from agents.ollama_client import get_ollama_client
+
+
+UTTERANCES = ["show today's expenses", "view budget", "I spent 250 on lunch",
+              "what did I spend last week", "delete entry 2 from food",
+              "how much is left in my transport budget", "add 90 for metro card",
+              "show my expenses for last monday"]
+
+
+def run_generate(client, system_prompt, utterance):
+    prompt = (f"{system_prompt}\n### User Input:\n{utterance}")
+    response = client.generate(prompt)
+    response.raise_for_status()
+    return response.json()
+
+
+def run_chat(client, system_prompt, utterance):
+    response = client.chat([{"role": "system", "content": system_prompt},
+                            {"role": "user", "content": utterance}])
+    response.raise_for_status()
+    return response.json()
+
+
+def measure(label, call, client, system_prompt, rounds):
+    tokens, prompt_seconds, wall = [], [], []
+    for _ in range(rounds):
+        for utterance in UTTERANCES:
+            start = time.perf_counter()
+            body = call(client, system_prompt, utterance)
+            wall.append(time.perf_counter() - start)
+            tokens.append(body.get("prompt_eval_count") or 0)
+            prompt_seconds.append((body.get("prompt_eval_duration") or 0) / 1e9)
+    count = len(tokens)
+    print(label.ljust(16) + f"| {sum(tokens) / count:>14.0f} | {sum(prompt_seconds) / count * 1000:>16.1f}"
+          f" | {sum(wall) / count * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    client = get_ollama_client()
+    system_prompt, _ = load_system_prompt(client.model)
+    if system_prompt is None:
+        sys.exit("prompts/system_prompts.md not found")
+    if not client.warm_up():
+        sys.exit(f"Ollama is not reachable at {client.base_url}")
+
+    print(f"Model: {client.model}, {len(UTTERANCES) * rounds} calls per mode")
+    print(f"Instruction: {INTERPRET_INSTRUCTION}\n")
+    print("Mode".ljust(16) + "| " + "Prompt tokens".rjust(14) + " | " + "Prompt eval (ms)".rjust(16)
+          + " | " + "Wall (ms)".rjust(12))
+    print("-" * 66)
+    measure("generate", run_generate, client, system_prompt, rounds)
+
+    start = time.perf_counter()
+    body = run_chat(client, system_prompt, "hello")
+    print("chat (priming)".ljust(16) + f"| {body.get('prompt_eval_count') or 0:>14} | "
+          f"{(body.get('prompt_eval_duration') or 0) / 1e6:>16.1f} | {(time.perf_counter() - start) * 1000:>12.1f}")
+    measure("chat", run_chat, client, system_prompt, rounds)
@@ -1,33 +1,166 @@
-from agents.llm_agent import llm_understand
+import re
+from datetime import datetime
+
+from tools.system_tools import interpret_date_reference, interpret_date_range
+
+
+# ----------------------------------------
+# Deterministic Fast Path
+# ----------------------------------------
+
+# Commands typed every day are matched here with precompiled rules so they
+# skip the LLM round trip entirely. A rule either extracts every parameter
+# it needs or declines, in which case the input goes to interpret_command.
+
+_VIEW = r"(?:show|view|list|see|display|get)(?: me)?(?: all)?(?: (?:my|the))?"
+_AMOUNT = r"(?:rs\.?|inr|₹)?\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?:rs\.?|rupees|inr|/-)?"
+_DAY = r"(?P<date>today|yesterday|last \w+|\d{4}-\d{2}-\d{2})"
+_TIME = r"(?P<time>\d{1,2}(?::\d{2})?\s*(?:am|pm)?)"
+
+START_TRACKER = re.compile(
+    r"^(?:start|open|launch|begin|get started with)(?: (?:my|the))? expense tracker$")
+EXPENSE_STATUS = re.compile(rf"^(?:{_VIEW} )?(?:expenses? |tracker )?status$")
+MONTHLY_SUMMARY = re.compile(rf"^(?:{_VIEW} )?monthly (?:summary|report|trend)$")
+VIEW_BUDGET = re.compile(
+    rf"^(?:{_VIEW}|check|what(?:'s| is)(?: my)?) budgets?(?: (?:for|of) (?P<category>[a-z][\w &-]*))?$")
+VIEW_EXPENSES = re.compile(
+    rf"^{_VIEW}(?: {_DAY}(?:'s)?)? expenses?(?: (?:for|on|from) (?P<when>.+))?$")
+ADD_EXPENSE = re.compile(
+    rf"^(?:add|log|record|i spent|spent|i paid|paid)(?: an?)?(?: expense(?: of)?)? {_AMOUNT}"
+    rf" (?:for|on) (?P<description>.+?)(?: (?:on )?{_DAY})?(?: at {_TIME})?$")
+DELETE_ENTRY = re.compile(
+    r"^(?:delete|remove)(?: the)? (?:entry|expense|item)(?: (?:number|no\.?))? ?#?"
+    r"(?P<number>\d+)(?: (?:from|in) (?P<category>[a-z][\w &-]*))?$")
+# An ID needs its "id" or brackets, or a hex letter, so a ten-digit
+# number (an entry number, a phone number) is never read as one
+DELETE_BY_ID = re.compile(
+    r"^(?:delete|remove)(?: the)? (?:entry|expense|item)(?: id \[?| \[| (?=\d*[a-f]))"
+    r"(?P<entry_id>[0-9a-f]{10})\]?$")
+CURRENT_DATETIME = re.compile(
+    r"^(?:what(?:'s| is)? )?(?:the )?(?:current )?(?:date|time|date and time|day)(?: (?:is it|today|now))?$")
+HELP = re.compile(r"^(?:help|what can you do)$")
+
+
+def _normalize(user_input):
+    """Input with whitespace collapsed, in its original case"""
+    text = " ".join(user_input.strip().split())
+    return text.rstrip(".!?").replace("’", "'")
+
+
+def _group(match, name, text):
+    """A captured group in the user's own casing (rules match lower case)"""
+    value = match.group(name)
+    if value is None or len(text) != len(match.string):
+        return value
+    return text[match.start(name):match.end(name)].strip()
+
+
+def _resolve_day(phrase):
+    """ISO date for a single-day phrase, or None if it is not one"""
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", phrase):
+        try:
+            datetime.strptime(phrase, "%Y-%m-%d")
+        except ValueError:
+            return None
+        return phrase
+    try:
+        return interpret_date_reference(phrase)
+    except (ValueError, IndexError):
+        return None
+
+
+def _parse_time(phrase):
+    """HH:MM for '9', '9:30', '9pm' or '21:30', or None"""
+    match = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", phrase)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif not match.group(2):
+        # A bare "at 9" is too ambiguous to log
+        return None
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _add_expense(match, text):
+    amount = float(match.group("amount").replace(",", ""))
+    description = _group(match, "description", text)
+    if not amount or not description:
+        return None
+    params = {"amount": amount, "description": description, "user_input": text}
+    if match.group("date"):
+        date = _resolve_day(match.group("date"))
+        if not date:
+            return None
+        params["date"] = date
+    if match.group("time"):
+        time = _parse_time(match.group("time"))
+        if not time:
+            return None
+        params["time"] = time
+    return params
+
+
+def _view_expenses(match, text):
+    when = match.group("date") or match.group("when")
+    if not when:
+        return {}
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", when):
+        date = _resolve_day(when)
+        return {"from_date": date, "to_date": date} if date else None
+    if _resolve_day(when):
+        return {"date": when}
+    if interpret_date_range(when):
+        return {"period": when}
+    return None
+
+
+def _view_budget(match, text):
+    if match.group("category"):
+        return {"mode": "specific", "category": _group(match, "category", text)}
+    return {"mode": "all"}
+
+
+def _delete_entry(match, text):
+    params = {"entry_choice": int(match.group("number"))}
+    if match.group("category"):
+        params["cat_choice"] = _group(match, "category", text)
+    return params
+
+
+RULES = [
+    (START_TRACKER, "start_expense_tracker", None),
+    (HELP, "help", None),
+    (EXPENSE_STATUS, "expense_status", None),
+    (MONTHLY_SUMMARY, "monthly_summary", None),
+    (VIEW_BUDGET, "view_budget", _view_budget),
+    (VIEW_EXPENSES, "view_expenses", _view_expenses),
+    (ADD_EXPENSE, "add_expenses", _add_expense),
+    (DELETE_BY_ID, "delete_expense", lambda match, text: {"entry_id": match.group("entry_id")}),
+    (DELETE_ENTRY, "delete_expense", _delete_entry),
+    (CURRENT_DATETIME, "show_current_datetime", None)
+    ]
+
 
 def parse_command(user_input):
-    user_input=user_input.lower()
-    
-    if "create file" in user_input:
-        return "create_file"
-    
-    elif "open browser" in user_input:
-        return "open_browser"
-    
-    elif "calculate my income tax" in user_input:
-        return "calculate_income_tax"
-    
-    elif any(phrase in user_input for phrase in [
-            "start expense tracker",
-            "open expense tracker",
-            "launch expense tracker",
-            "begin expense tracker",
-            "start my expense tracker",
-            "get started with expense tracker",
-            "start the expense tracker"]):
-        return {
-            "action": "start_expense_tracker",
-            "params":{}
-            }
-    
-    # Fallback to LLM interpretation
-    action = llm_understand(user_input)
-    return action
-    
-        
+    """Action dict for a command the rules fully understand, else None
 
+    Returns the same ``{"action", "params"}`` shape as interpret_command so
+    the result can go straight to dispatch_task.
+    """
+    text = _normalize(user_input)
+    lowered = text.lower()
+    for pattern, action, extract_params in RULES:
+        match = pattern.match(lowered)
+        if not match:
+            continue
+        params = extract_params(match, text) if extract_params else {}
+        if params is None:
+            return None
+        return {"action": action, "params": params}
+    return None
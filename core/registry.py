@@ -0,0 +1,92 @@
+import os
+import threading
+
+from core.storage import read_json, read_lock, save_json, write_lock
+
+
+def normalize_name(name):
+    """Key used for case-insensitive category lookups"""
+    return " ".join(str(name).split()).casefold()
+
+
+# ----------------------------------------
+# Cached JSON Registries
+# ----------------------------------------
+
+class JsonRegistry:
+    """Process-wide cached copy of one small JSON file.
+
+    The file is parsed once and served from memory until its inode, mtime
+    or size changes, so edits made by hand or by another session are still
+    picked up. Callers get a shallow copy they are free to modify.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        """Re-reads the file if it changed; returns the cached data"""
+        signature = self._stat()
+        if signature == self._signature:
+            return self._data
+
+        with read_lock(self.path):
+            # Stat again under the lock so the signature matches what we read
+            signature = self._stat()
+            data = read_json(self.path) if signature is not None else None
+        self._data = data
+        self._signature = signature
+        self._reloaded()
+        return data
+
+    def _reloaded(self):
+        """Hook for subclasses that keep indexes over the data"""
+
+    def get(self):
+        """The file's contents, or None if it does not exist"""
+        with self._lock:
+            data = self._refresh()
+            return dict(data) if data is not None else None
+
+    def lookup(self, key, default=None):
+        """One top-level value, without copying the whole file"""
+        with self._lock:
+            data = self._refresh()
+            return data.get(key, default) if data is not None else default
+
+    def save(self, data):
+        with self._lock, write_lock(self.path):
+            save_json(self.path, data)
+            self._data = dict(data)
+            self._signature = self._stat()
+            self._reloaded()
+
+
+class CategoryRegistry(JsonRegistry):
+    """``categories.json`` with a case-insensitive index of the names"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._index = {}
+
+    def _reloaded(self):
+        self._index = {}
+        for name in self._data or {}:
+            # The first spelling wins if two only differ in case
+            self._index.setdefault(normalize_name(name), name)
+
+    def find(self, name):
+        """Registered spelling of ``name`` regardless of case, or None"""
+        with self._lock:
+            self._refresh()
+            return self._index.get(normalize_name(name))
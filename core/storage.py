@@ -0,0 +1,292 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks below only serialise threads of this process
+    fcntl = None
+
+
+# ----------------------------------------
+# Atomic Writes
+# ----------------------------------------
+
+def _fsync_directory(directory):
+    """Makes a rename in ``directory`` durable (a no-op where unsupported)"""
+    if fcntl is None:
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, data):
+    """Replaces ``path`` with ``data`` (bytes or str) all at once
+
+    The data goes to a uniquely named temp file in the same directory, is
+    fsynced and then renamed over ``path``, so readers see either the old
+    or the new file and a crash never leaves it truncated.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open_atomic(path, "wb") as file:
+        file.write(data)
+
+
+@contextmanager
+def open_atomic(path, mode="w", encoding="utf-8", newline=None):
+    """Like ``write_atomic`` for output written incrementally
+
+    Yields a file open on the temp file; ``path`` is only replaced once the
+    block finishes without an exception.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.",
+                                     suffix=".tmp", dir=directory or ".")
+    try:
+        if "b" in mode:
+            file = os.fdopen(fd, mode)
+        else:
+            file = os.fdopen(fd, mode, encoding=encoding, newline=newline)
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def write_json_atomic(path, data, indent=4):
+    write_atomic(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+# ----------------------------------------
+# Advisory File Locks
+# ----------------------------------------
+
+class _PathLock:
+    """Process-wide state of the advisory lock on one path.
+
+    Threads of this process take turns through a re-entrant lock; the
+    flock on ``<path>.lock`` is held while the outermost holder is inside,
+    upgraded to exclusive if a nested block asks for writing.
+    """
+
+    def __init__(self, path):
+        self.lock_path = f"{path}.lock"
+        self.thread_lock = threading.RLock()
+        self.owner = None
+        self.depth = 0
+        self.file = None
+        self.exclusive = False
+
+    def acquire(self, exclusive):
+        self.thread_lock.acquire()
+        try:
+            if self.depth == 0:
+                directory = os.path.dirname(self.lock_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.file = open(self.lock_path, "a+")
+                self._flock(exclusive)
+            elif exclusive and not self.exclusive:
+                self._flock(True)
+        except BaseException:
+            if self.depth == 0 and self.file is not None:
+                self.file.close()
+                self.file = None
+            self.thread_lock.release()
+            raise
+        self.depth += 1
+        self.owner = threading.get_ident()
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+            self.exclusive = False
+            self.owner = None
+        self.thread_lock.release()
+
+    def _flock(self, exclusive):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self.exclusive = exclusive
+
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path):
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        if key not in _path_locks:
+            _path_locks[key] = _PathLock(key)
+        return _path_locks[key]
+
+
+@contextmanager
+def file_lock(path, exclusive=False):
+    """Advisory lock on ``path``: shared for readers, exclusive for writers
+
+    Several processes may hold the shared lock at once; a writer waits for
+    all of them and excludes everyone else. The lock lives on a sidecar
+    ``<path>.lock`` file because atomic writes replace ``path`` itself.
+    Re-entrant within a thread.
+    """
+    lock = _path_lock(path)
+    lock.acquire(exclusive)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def read_lock(path):
+    return file_lock(path, exclusive=False)
+
+
+def write_lock(path):
+    return file_lock(path, exclusive=True)
+
+
+def holds_lock(path):
+    """True if the calling thread is inside a lock on ``path``"""
+    return _path_lock(path).owner == threading.get_ident()
+
+
+# ----------------------------------------
+# Locked JSON Files
+# ----------------------------------------
+
+def read_json(path, default=None):
+    """Loads ``path`` under a shared lock, or returns ``default`` if missing"""
+    with read_lock(path):
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+
+def save_json(path, data, indent=4):
+    """Atomically replaces ``path`` with ``data`` under an exclusive lock"""
+    with write_lock(path):
+        write_json_atomic(path, data, indent)
+
+
+@contextmanager
+def update_json(path, default=None):
+    """Read-modify-write of a JSON file with writers serialised
+
+    Yields the current data (``default`` if the file is missing) and
+    writes it back atomically when the block exits without an error.
+    """
+    with write_lock(path):
+        data = read_json(path, default)
+        yield data
+        write_json_atomic(path, data)
+
+
+# ----------------------------------------
+# Group Commit
+# ----------------------------------------
+
+class GroupCommitLog:
+    """Append-only file whose fsyncs are shared between writers.
+
+    ``write`` appends a record and returns a ticket; ``sync(ticket)`` then
+    waits until it is durable. Callers that hold their own locks should
+    release them between the two, so other writers can append meanwhile.
+    If another thread is already syncing, later ones wait for it and then
+    cover everyone still waiting with a single fsync. ``append`` does both
+    steps. Inside ``deferred()`` the calling thread's fsyncs are held back
+    until its outermost block exits, so a burst of writes from one caller
+    costs one fsync; other threads are not affected.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._cond = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self._local = threading.local()
+
+    def write(self, data):
+        """Appends ``data``; returns its ticket, or None inside ``deferred()``"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self._cond:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as file:
+                file.write(data)
+            self._written += 1
+            ticket = self._written
+        if getattr(self._local, "depth", 0):
+            # Synced when this thread's outermost deferred() block exits
+            self._local.pending = ticket
+            return None
+        return ticket
+
+    def append(self, data):
+        """Appends ``data`` and returns once it is durable"""
+        ticket = self.write(data)
+        if ticket is not None:
+            self.sync(ticket)
+
+    def sync(self, ticket=None):
+        """Blocks until every record up to ``ticket`` (default: all) is durable"""
+        with self._cond:
+            if ticket is None:
+                ticket = self._written
+            while self._synced < ticket and self._syncing:
+                self._cond.wait()
+            if self._synced >= ticket:
+                return
+            self._syncing = True
+            target = self._written
+
+        synced = False
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "ab") as file:
+                    os.fsync(file.fileno())
+            synced = True
+        finally:
+            with self._cond:
+                self._syncing = False
+                if synced:
+                    self._synced = max(self._synced, target)
+                self._cond.notify_all()
+
+    @contextmanager
+    def deferred(self):
+        """Holds back this thread's fsyncs for the block, then issues one"""
+        local = self._local
+        local.depth = getattr(local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                pending, local.pending = getattr(local, "pending", None), None
+                if pending is not None:
+                    self.sync(pending)
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 
 
 
-from tools.system_tools import show_current_datetime, interpret_date_reference
+from tools.system_tools import show_current_datetime, interpret_date_reference, interpret_date_range
 from memory.memory_manager import (
                                    remember,
                                    recall,
@@ -13,18 +13,30 @@ from memory.memory_manager import (
 from tools.expense_tracker import (
                                    add_expenses,
                                    view_expenses,
+                                   query_expenses,
                                    edit_expense,
+                                   edit_expense_by_id,
                                    delete_expense,
+                                   delete_expense_by_id,
                                    manage_category_deletion,
                                    expense_status,
+                                   expense_breakdown,
+                                   monthly_summary,
+                                   verify_expense_totals,
                                    set_budget,
                                    view_budget,
-                                   delete_budget_category
+                                   delete_budget_category,
+                                   compress_archives
     )
+from tools.bulk_import import import_expenses
+from tools.export import export_expenses
+from agents.intent_cache import intent_cache_stats
+from memory.category_memo import remember_category
 from memory.category_manager import (
                                     expense_category_classification,
                                     extract_description,
                                     extract_amount_from_description,
+                                    learn_category,
                                     load_categories
                                     )
 from collections import defaultdict
@@ -78,14 +90,24 @@ ACTION_MAP ={
      'start_expense_tracker': print_intro_to_expense_tracker,
      'add_expenses': add_expenses,
      'view_expenses': view_expenses,
+     'query_expenses': query_expenses,
      'edit_expense': edit_expense,
+     'edit_expense_by_id': edit_expense_by_id,
      'delete_expense': delete_expense,
+     'delete_expense_by_id': delete_expense_by_id,
      'manage_category_deletion': manage_category_deletion,
      'expense_status': expense_status,
+     'expense_breakdown': expense_breakdown,
+     'monthly_summary': monthly_summary,
+     'verify_expense_totals': verify_expense_totals,
      'set_budget': set_budget,
      'view_budget': view_budget,
      'delete_budget_category': delete_budget_category,
+     'compress_archives': compress_archives,
+     'import_expenses': import_expenses,
+     'export_expenses': export_expenses,
      'show_current_datetime': show_current_datetime,
+     'intent_cache_stats': intent_cache_stats,
 }
 
 EXPENSE_ACTIONS=[
@@ -158,9 +180,14 @@ def dispatch_task(action, params):
             category=classification["category"]
         
         category=params.get("category") or classification["category"]
+        # A category the user picked is remembered, and learned, right away
+        remembered=classification["source"]=="user" and category==classification["category"]
         if classification["prompt_user"]:
             print("\nI'm not confident about the category.")
-            print(f"My top suggestion is '{category}' (from LLM)")
+            if classification.get("confidence") is not None:
+                print(f"My top suggestion is '{category}' (confidence {classification['confidence']:.0%})")
+            else:
+                print(f"My top suggestion is '{category}'")
             
             categories=load_categories()
         
@@ -171,6 +198,9 @@ def dispatch_task(action, params):
             try:
                 choice = int(input("Your choice (number): "))
                 category=list(categories.keys())[choice - 1]
+                # Remember the user's pick so this merchant is not asked about again
+                remember_category(description, category)
+                remembered=True
             except:
                 print("Invalid input. Using best guess.")
         
@@ -216,6 +246,8 @@ def dispatch_task(action, params):
         if "error" in result:
             print (f"PHANTOM: {result['error']}")
             return 
+        if not remembered:
+            learn_category(result["category"], result["description"])
 
         print(f"\nLogged ₹{result['amount']} under '{result['category']}' for '{result['description']}'"
           f"on {result['date']} at {result['time']}.")
@@ -229,60 +261,83 @@ def dispatch_task(action, params):
            print(f"No budget set for '{result['category']}'.")
 
     elif action == "view_expenses":
-        date_provided=False
-        if "date" in params or "date_filter" in params:
-            natural_date=(params.get("date") or params.get("date_filter") or "").replace("_", " ").strip()
-            resolved_date=interpret_date_reference(natural_date)
-            if resolved_date:
-                params["date"]=resolved_date
-                date_provided=True
+        date_range=None
+        if params.get("from_date") or params.get("to_date"):
+            date_range=tuple(
+                (interpret_date_reference(str(d)) or str(d)) if d else None
+                for d in (params.get("from_date"), params.get("to_date")))
+        else:
+            period=params.get("period") or params.get("date") or params.get("date_filter") or ""
+            period=str(period).replace("_", " ").strip()
+            # Single-day phrases keep going through the date path below
+            if period and ("period" in params or not interpret_date_reference(period)):
+                date_range=interpret_date_range(period)
+        
+        if date_range:
+            categories=params.get("categories") or params.get("category")
+            print(f"Expenses from {date_range[0] or 'the beginning'} to {date_range[1] or 'today'}")
+            result = safe_execute(query_expenses, action="view_expenses", params={
+                "start_date": date_range[0],
+                "end_date": date_range[1],
+                "categories": [categories] if isinstance(categories, str) else categories,
+                "min_amount": params.get("min_amount"),
+                "max_amount": params.get("max_amount")
+                })
+        else:
+            date_provided=False
+            if "date" in params or "date_filter" in params:
+                natural_date=(params.get("date") or params.get("date_filter") or "").replace("_", " ").strip()
+                resolved_date=interpret_date_reference(natural_date)
+                if resolved_date:
+                    params["date"]=resolved_date
+                    date_provided=True
                 
-            else:
-                try:
-                    datetime.strptime(natural_date, "%Y-%m-%d")
-                    if is_date_recent(natural_date, max_days_old=30):
-                        params["date"]=natural_date
-                        date_provided=True
+                else:
+                    try:
+                        datetime.strptime(natural_date, "%Y-%m-%d")
+                        if is_date_recent(natural_date, max_days_old=30):
+                            params["date"]=natural_date
+                            date_provided=True
                         
-                    else:
-                        raise ValueError("Too far in the past")
-                    #datetime.strptime(params["date"], "%Y-%m-%d")
-                    # date is valid; keep it
-                except:
-                    print("Invalid or hallucinated date: ", params["date"])
-                    result = {
-                        "status": "failed",
-                        "reason": "invalid_or_hallucinated_date"
+                        else:
+                            raise ValueError("Too far in the past")
+                        #datetime.strptime(params["date"], "%Y-%m-%d")
+                        # date is valid; keep it
+                    except:
+                        print("Invalid or hallucinated date: ", params["date"])
+                        result = {
+                            "status": "failed",
+                            "reason": "invalid_or_hallucinated_date"
+                            }
+                        print(result)
+                        return result
+                if "date_filter" in params:
+                    del params["date_filter"]
+            elif "days" in params:
+                try:
+                    offset=int(params["days"])
+                    date_obj=datetime.now() + timedelta(days=offset)
+                    params["date"]=date_obj.strftime("%Y-%m-%d")
+                    del params["days"]
+                    date_provided=True
+                except ValueError:
+                    print("Invalid days offset provided.")
+                    result={
+                        "status":"failed",
+                        "reason":"invalid_days_argument"
                         }
                     print(result)
                     return result
-            if "date_filter" in params:
-                del params["date_filter"]
-        elif "days" in params:
-            try:
-                offset=int(params["days"])
-                date_obj=datetime.now() + timedelta(days=offset)
-                params["date"]=date_obj.strftime("%Y-%m-%d")
-                del params["days"]
-                date_provided=True
-            except ValueError:
-                print("Invalid days offset provided.")
-                result={
-                    "status":"failed",
-                    "reason":"invalid_days_argument"
-                    }
-                print(result)
-                return result
-        if not date_provided:
-            params["all"]=True
+            if not date_provided:
+                params["all"]=True
             
-        # Clean out bad keys that break view_expenses()
-        valid_keys={"date"}
-        params = {k:v for k,v in params.items() if k in valid_keys}
+            # Clean out bad keys that break view_expenses()
+            valid_keys={"date"}
+            params = {k:v for k,v in params.items() if k in valid_keys}
         
-        print("Final view_expenses params", params)
+            print("Final view_expenses params", params)
                 
-        result = safe_execute(view_expenses, action="view_expenses", params=params)
+            result = safe_execute(view_expenses, action="view_expenses", params=params)
         
         if not result:
             print("No expenses logged yet.")
@@ -314,7 +369,7 @@ def dispatch_task(action, params):
                         amount=expense.get("amount", 0)
                         description = expense.get("description", "")
                         time=expense.get("time", "")
-                        print(f"     - ₹{amount:.2f} | {description} @ {time}")
+                        print(f"     - ₹{amount:.2f} | {description} @ {time}  [{expense.get('id', '-')}]")
             if has_entries:
                 total=result.get("total_expense", 0.0)
                 print(f"\nTotal spent overall: ₹{total:.2f}")
@@ -332,12 +387,32 @@ def dispatch_task(action, params):
                 description=expense.get("description", "")
                 date=expense.get("date", "")
                 time=expense.get("time", "")
-                print(f"    - ₹{amount:.2f} | {description} | {date} @ {time}")
+                print(f"    - ₹{amount:.2f} | {description} | {date} @ {time}  [{expense.get('id', '-')}]")
         return {
             "status": "success",
             "expenses": result
             }
         
+    elif action == "edit_expense" and (params.get("entry_id") or params.get("id")):
+        # Addressed by stable ID: no preview of the category needed
+        entry_id=str(params.get("entry_id") or params.get("id")).strip()
+        field_choice=params.get("field_choice") or params.get("field") or input(
+            "Which field would you like to edit? (amount / description / date / time/ category): ").strip().lower()
+        new_value=params.get("new_value") or input(f"Enter new value for {field_choice}: ").strip()
+        
+        result = safe_execute(edit_expense_by_id, action="edit_expense", params={
+            "entry_id": entry_id,
+            "field_choice": field_choice,
+            "new_value": new_value
+            })
+        
+        if result and result.get("success"):
+            print(f"{field_choice.title()} for entry [{entry_id}] updated to: {new_value}")
+            return {"status": "success", "action": "edit_expense"}
+        else:
+            print(f"Edit failed: {result.get('error')}")
+            return {"status": "failed", "reason": result.get("error", "unknown")}
+        
     elif action == "edit_expense":
         
         category = params.get("category") or input("Enter the category to edit: ").strip()
@@ -356,7 +431,7 @@ def dispatch_task(action, params):
         
         print(f"\n Entries in category '{category}':")
         for entry in entries:
-            print(f"{entry['index']}. ₹{entry['amount']} | {entry['description']} | {entry['date']} {entry['time']}")
+            print(f"{entry['index']}. ₹{entry['amount']} | {entry['description']} | {entry['date']} {entry['time']}  [{entry['id']}]")
             
         try:
             entry_choice=int(input("Which entry number would you like to edit? ").strip())
@@ -397,6 +472,27 @@ def dispatch_task(action, params):
             print(f"Edit failed: {result.get('error')}")
             return {"status": "failed", "reason": result.get("error", "unknown")}
     
+    elif action == "delete_expense" and (params.get("entry_id") or params.get("id")):
+        entry_id=str(params.get("entry_id") or params.get("id")).strip()
+        
+        confirm = params.get("confirm")
+        if confirm is None:
+            confirm_input=input(f"Are you sure you want to delete entry [{entry_id}]? (yes/no): ").strip().lower()
+            confirm = confirm_input=="yes"
+        
+        result = safe_execute(delete_expense_by_id, action="delete_expense", params={
+            "entry_id": entry_id,
+            "confirm": confirm
+            })
+        
+        if result.get("success"):
+            deleted=result["deleted_entry"]
+            print(f"Entry [{entry_id}] from '{result['cat_choice']}' has been deleted: ₹{deleted['amount']} | {deleted['description']}")
+        elif result.get("confirmation_required"):
+            print("Deletion not confirmed. Action cancelled.")
+        else:
+            print(f"Delete failed: {result.get('error')}")
+            
     elif action == "delete_expense":
         cat_choice = params.get("cat_choice") or input("Enter the category to delete from: ").strip()
         try:
@@ -450,6 +546,8 @@ def dispatch_task(action, params):
             print(f"Categories: {result['total_categories']}")
             print(f"Entries: {result['total_entries']}")
             print(f"Total Spent: ₹{result['total_amount_spent']}")
+            if result.get("archived_months"):
+                print(f"Archived: {result['archived_entries']} entries over {result['archived_months']} months (₹{result['archived_amount_spent']})")
         else:
             print("No expenses found yet")
             
@@ -495,15 +593,16 @@ def dispatch_task(action, params):
         elif "error" in result:
             print(result["error"])
         elif result["mode"] == "all":
-            print("\nHere are your allocated budgets:\n")
-            print("Category".ljust(20) + "| " + "Budget".rjust(12))
-            print("-" * 35)
-            for cat, amt in result["budgets"].items():
-                print(f"{cat.title().ljust(20)}| ₹{amt:>11.2f}")
-            print("-" * 35)
+            print(f"\nHere are your allocated budgets for {result['month']}:\n")
+            print("Category".ljust(20) + "| " + "Budget".rjust(12) + " | " + "Spent".rjust(12) + " | " + "Remaining".rjust(12))
+            print("-" * 65)
+            for cat, usage in result["utilization"].items():
+                print(f"{cat.title().ljust(20)}| ₹{usage['budget']:>11.2f} | ₹{usage['spent']:>11.2f} | ₹{usage['remaining']:>11.2f}")
+            print("-" * 65)
             print(f"Total categories: {result['total_categories']}\n")
         elif result["mode"] == "specific":
             print(f"Budget for '{result['category']}': ₹{result['budget']:,.2f}")
+            print(f"Spent in {result['month']}: ₹{result['spent']:,.2f} (₹{result['remaining']:,.2f} remaining)")
             
     elif action == "delete_budget_category":
         cat_choice=params.get("cat_choice") or input("Enter the budget category you want to delete: ").strip()
@@ -528,6 +627,36 @@ def dispatch_task(action, params):
         else:
             print(f"Failed to delete budget: {result.get('error')}")
             
+    elif action == "import_expenses":
+        path = params.get("path") or params.get("file") or input("Enter the statement file (CSV or JSONL): ").strip()
+        result = safe_execute(import_expenses, action="import_expenses", params={
+            "path": path,
+            "dry_run": bool(params.get("dry_run", False))
+            })
+
+        if result and result.get("success"):
+            print(f"Imported {result['imported']} of {result['rows_read']} rows (₹{result['imported_amount']:,.2f}) in {result['seconds']}s")
+            print(f"Skipped: {result['duplicates']} duplicates, {result['skipped_credits']} credits, {result['invalid_rows']} unreadable rows")
+            if result["unclassified"]:
+                print(f"{result['unclassified']} rows could not be classified and were filed under 'Uncategorized'.")
+        else:
+            print(f"Import failed: {result.get('error') if result else 'unknown error'}")
+
+    elif action == "export_expenses":
+        result = safe_execute(export_expenses, action="export_expenses", params={
+            "path": params.get("path") or params.get("file"),
+            "export_format": params.get("format") or params.get("export_format"),
+            "start_date": params.get("start_date"),
+            "end_date": params.get("end_date"),
+            "categories": params.get("categories") or params.get("category"),
+            "include_archives": params.get("include_archives", True)
+            })
+
+        if result and result.get("success"):
+            print(f"Exported {result['rows']} expenses to {result['path']} ({result['format'].upper()})")
+        else:
+            print(f"Export failed: {result.get('error') if result else 'unknown error'}")
+
     elif action in ACTION_MAP:
        result=safe_execute(ACTION_MAP[action], action=action, params=params)
        if result is not None:
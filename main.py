@@ -1,5 +1,10 @@
 def run_solin():
     from agents.llm_agent import interpret_command
+    from core.command_parser import parse_command
+    from agents.ollama_client import get_ollama_client
+    from memory.category_manager import warm_up_nlp
+    from memory.category_memo import get_category_memo
+    import threading
     from core.task_dispatcher import dispatch_task, print_intro_to_expense_tracker
     from datetime import datetime
     from memory.memory_reset import check_and_reset_monthly_expense
@@ -28,6 +33,10 @@ def run_solin():
     print("Brilliance on demand.")
     print(f"{greeting}, Sir!")
     
+    # Load the models while the user types their first command
+    threading.Thread(target=get_ollama_client().warm_up, daemon=True).start()
+    threading.Thread(target=warm_up_nlp, daemon=True).start()
+
     print_intro_to_expense_tracker()
 
     reset_status = check_and_reset_monthly_expense()
@@ -40,20 +49,25 @@ def run_solin():
         else:
             print(f"Reset failed: {result.get('error')}")
 
-    while True:
-        user_input=input("You: ")
-        if user_input.strip().lower() in ["exit", "quit", "escape","bye"]:
-            print("Goodbye, Until next time.")
-            break
-            
-        response_line=interpret_command(user_input)
-        if response_line:
-            action=response_line.get("action")
-            params=response_line.get("params",{})
-            print(f"\nS.O.L.I.N.: Executing '{action}' with parameters {params}")
-            dispatch_task(action, params)
-        else:
-            print("\nS.O.L.I.N.: Unable to process your request.")
+    try:
+        while True:
+            user_input=input("You: ")
+            if user_input.strip().lower() in ["exit", "quit", "escape","bye"]:
+                print("Goodbye, Until next time.")
+                break
+                
+            # Rule-based fast path first; the LLM only sees what it cannot parse
+            response_line=parse_command(user_input) or interpret_command(user_input)
+            if response_line:
+                action=response_line.get("action")
+                params=response_line.get("params",{})
+                print(f"\nS.O.L.I.N.: Executing '{action}' with parameters {params}")
+                dispatch_task(action, params)
+            else:
+                print("\nS.O.L.I.N.: Unable to process your request.")
+    finally:
+        # Memo hit counts are kept in memory between corrections
+        get_category_memo().flush()
 
 
 if __name__=="__main__":
@@ -0,0 +1,182 @@
+import os
+import re
+import math
+import threading
+
+from tools.expense_store import get_store
+
+
+# Posterior probability a local prediction needs before the LLM is skipped
+CLASSIFIER_THRESHOLD = float(os.environ.get("SOLIN_CLASSIFIER_THRESHOLD", 0.6))
+
+# A keyword from categories.json counts as this many labelled expenses
+DESCRIPTION_WEIGHT = 3
+
+# Laplace smoothing of the token counts
+SMOOTHING = 0.5
+
+STOPWORDS = {
+    "a", "an", "the", "for", "on", "at", "to", "of", "in", "and", "with", "from", "my",
+    "me", "i", "paid", "pay", "spent", "spend", "bought", "buy", "rs", "inr", "rupees",
+    "via", "upi", "payment", "expense", "order", "today", "yesterday"
+    }
+
+
+def tokenize(text):
+    """Lower-case word tokens without stopwords, numbers or plural 's'"""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", str(text).lower()):
+        if token in STOPWORDS or token.isdigit() or len(token) < 2:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+# ----------------------------------------
+# Naive Bayes Category Classifier
+# ----------------------------------------
+
+class CategoryClassifier:
+    """Multinomial naive Bayes over category keywords and past expenses.
+
+    Token counts come from two sources kept apart: the keyword descriptions
+    in ``categories.json`` (recounted whenever that dict changes) and the
+    descriptions of every logged and archived expense (counted once per
+    process, then kept current through ``learn``). ``classify`` returns the
+    best category with its posterior probability as the confidence.
+    """
+
+    def __init__(self, smoothing=SMOOTHING, description_weight=DESCRIPTION_WEIGHT):
+        self.smoothing = smoothing
+        self.description_weight = description_weight
+        self._categories = None
+        self._keyword_counts = {}
+        self._history_counts = None
+        self._history_docs = {}
+        self._lock = threading.RLock()
+
+    # ---------- Index ----------
+
+    def _refresh(self):
+        """Recounts whichever source changed since the last call"""
+        categories = get_store().load_categories() or {}
+        if categories != self._categories:
+            self._categories = dict(categories)
+            self._keyword_counts = {}
+            for category, keywords in categories.items():
+                counts = {}
+                for token in tokenize(f"{category} {keywords}"):
+                    counts[token] = counts.get(token, 0) + self.description_weight
+                self._keyword_counts[category] = counts
+
+        if self._history_counts is None:
+            self._history_counts = {}
+            self._history_docs = {}
+            store = get_store()
+            for entries in (store.iter_archived_entries(), store.iter_entries()):
+                for category, entry in entries:
+                    self._count(category, entry.get("description"))
+
+    def _count(self, category, description):
+        counts = self._history_counts.setdefault(category, {})
+        for token in tokenize(description):
+            counts[token] = counts.get(token, 0) + 1
+        self._history_docs[category] = self._history_docs.get(category, 0) + 1
+
+    def learn(self, category, description):
+        """Adds one labelled expense (e.g. just logged or corrected by the user)"""
+        with self._lock:
+            if self._history_counts is not None:
+                self._count(category, description)
+
+    def unlearn(self, category, description):
+        """Takes back a ``learn`` (e.g. an expense moved out of ``category``)"""
+        with self._lock:
+            if self._history_counts is None or not self._history_docs.get(category):
+                return
+            counts = self._history_counts.get(category, {})
+            for token in tokenize(description):
+                if counts.get(token, 0) > 1:
+                    counts[token] -= 1
+                else:
+                    counts.pop(token, None)
+            self._history_docs[category] -= 1
+
+    def invalidate(self):
+        """Forces a full recount on the next call"""
+        with self._lock:
+            self._categories = None
+            self._history_counts = None
+
+    # ---------- Scoring ----------
+
+    def scores(self, description):
+        """``{category: probability}`` over the categories the description matches
+
+        A category matches if it has seen at least one of the description's
+        tokens. Categories that have seen none of them carry no evidence for
+        it and are left out of the normalisation. Otherwise, with a dozen
+        categories, one clear keyword hit such as "swiggy" would still end
+        up well under ``CLASSIFIER_THRESHOLD``. Empty when no token has been
+        seen at all.
+        """
+        with self._lock:
+            self._refresh()
+            tokens = tokenize(description)
+            categories = list(self._categories)
+            if not categories:
+                return {}
+
+            tables = {}
+            for category in categories:
+                keyword_counts = self._keyword_counts.get(category, {})
+                history_counts = self._history_counts.get(category, {})
+                tables[category] = (keyword_counts, history_counts,
+                                    sum(keyword_counts.values()) + sum(history_counts.values()))
+            vocabulary = set()
+            for keyword_counts, history_counts, _ in tables.values():
+                vocabulary.update(keyword_counts)
+                vocabulary.update(history_counts)
+            known = [token for token in tokens if token in vocabulary]
+            if not known:
+                return {}
+            tables = {category: table for category, table in tables.items()
+                      if any(token in table[0] or token in table[1] for token in known)}
+
+            total_docs = sum(self._history_docs.get(category, 0) + 1 for category in categories)
+            log_scores = {}
+            for category, (keyword_counts, history_counts, total) in tables.items():
+                score = math.log((self._history_docs.get(category, 0) + 1) / total_docs)
+                denominator = total + self.smoothing * len(vocabulary)
+                for token in known:
+                    count = keyword_counts.get(token, 0) + history_counts.get(token, 0)
+                    score += math.log((count + self.smoothing) / denominator)
+                log_scores[category] = score
+
+        best = max(log_scores.values())
+        weights = {category: math.exp(score - best) for category, score in log_scores.items()}
+        normalizer = sum(weights.values())
+        return {category: weight / normalizer for category, weight in weights.items()}
+
+    def classify(self, description):
+        """``(category, confidence)``; ``(None, 0.0)`` if nothing is known"""
+        scores = self.scores(description)
+        if not scores:
+            return None, 0.0
+        category = max(scores, key=scores.get)
+        return category, scores[category]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_category_classifier():
+    """Process-wide classifier"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = CategoryClassifier()
+        return _classifier
@@ -1,9 +1,33 @@
-import json
 import os
 import re
-import requests
-import spacy
-nlp = spacy.load("en_core_web_sm")
+import json
+import threading
+from contextlib import closing
+
+from agents.ollama_client import get_ollama_client
+from memory.category_classifier import CLASSIFIER_THRESHOLD, get_category_classifier
+from memory.category_memo import get_category_memo, remember_category
+from tools.expense_store import get_store
+
+# spaCy is imported and loaded on first use, with only what noun_chunks
+# needs (tok2vec, tagger, attribute_ruler, parser)
+NLP_MODEL = "en_core_web_sm"
+NLP_EXCLUDE = ["ner", "lemmatizer", "textcat", "senter"]
+
+# Processes for bulk extraction, and the batch size from which they pay off
+NLP_PROCESSES = int(os.environ.get("SOLIN_SPACY_PROCESSES", min(4, os.cpu_count() or 1)))
+NLP_MULTIPROCESS_MIN = 2000
+
+# Descriptions of at most this many words skip spaCy (0 always parses)
+FAST_DESCRIPTION_WORDS = int(os.environ.get("SOLIN_FAST_DESCRIPTION_WORDS", 3))
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+# Upper bound on descriptions per batched classification call, and tokens
+# of the context window kept free for the model's formatting overhead
+BATCH_MAX_ITEMS = int(os.environ.get("SOLIN_CLASSIFY_BATCH_MAX", 50))
+CONTEXT_RESERVE_TOKENS = 64
 
 default_categories = {
     "Food": "Meals, snacks, restaurants, cafes, delivery, Swiggy, Zomato",
@@ -21,21 +45,17 @@ default_categories = {
     "Savings": "Deposits, recurring savings, piggy bank, bank transfer to savings"
 }
 
-category_file="memory/categories.json"
-
-
 def load_categories():
-    if not os.path.exists(category_file):
+    categories=get_store().load_categories()
+    if categories is None:
         print("S.O.L.I.N.: Sir, categories.json is missing. I’ve restored default categories.")
         save_categories(default_categories)
         return default_categories
     
-    with open(category_file, "r") as file:
-        return json.load(file)
+    return categories
     
 def save_categories(categories):
-    with open(category_file, "w") as file:
-        json.dump(categories, file, indent=4)
+    get_store().save_categories(categories)
         
 def rephrase_description(desc):
     desc = desc.lower().strip()
@@ -65,49 +85,40 @@ def expense_category_classification(description):
     categories=load_categories()
     if not categories:
         print("No categories found.")
-        return {"category": None, "prompt_user": True, "confidence": 0.0}
+        return {"category": None, "prompt_user": True, "confidence": 0.0, "source": None}
     
     category_names=list(categories.keys())
-    category_list = ", ".join(category_names)
     
-    prompt = f"""
-    Categorize the following expense into one of the predefined categories.
-    Categories: [{category_list}]
-
-    User Input: "{description}"
-
-    Respond with only the category name as a plain text line.
-    """
+    # Merchants the user has already placed never reach a model again
+    remembered=get_category_memo().get(description)
+    if remembered in categories:
+        print(f"SOLIN Category Memo: {description} -> {remembered}")
+        return {"category": remembered, "confidence": 1.0, "prompt_user": False, "source": "memo"}
+    
+    # Most everyday expenses are settled by the local classifier; the LLM
+    # only sees the ones it is unsure about
+    local_category, local_confidence=get_category_classifier().classify(description)
+    if local_category in categories and local_confidence>=CLASSIFIER_THRESHOLD:
+        print(f"SOLIN Local Classifier: {description} -> {local_category} ({local_confidence:.2f})")
+        return {"category": local_category, "confidence": local_confidence, "prompt_user": False,
+                "source": "local"}
+    
     try:
-        response=requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model":"llama3:8b", "prompt": prompt, "stream": False, "stop":["\n"]},
-            timeout=30
-            )
-        raw=response.json()
-        response_text=raw.get("response", "").strip()
-        print("LLM Raw Response: ", repr(response_text))
-        
-        #Match exactly against categories
-        if response_text in category_list:
-            return {
-                "category": response_text,
-                "confidence":1.0,
-                "prompt_user": False
-                }
-        else:
-            print()
-        category=response.text.strip()
+        category=classify_with_llm(description, category_names)
         print(f"SOLIN LLM Classifier: {description} -> {category}")
         
-        if category in category_names:
-            return {"category": category, "confidence": 1.0, "prompt_user": False}
+        if category:
+            # The LLM gives no score of its own, so none is reported
+            return {"category": category, "confidence": None, "prompt_user": False, "source": "llm"}
         else:
             raise ValueError("LLM response not in category list.")
-            return None
         
     except Exception as e:
         print(f"LLM Categorization failed: {e}")
+        if local_category in categories:
+            # Let the caller offer the local guess alongside the full list
+            return {"category": local_category, "confidence": local_confidence, "prompt_user": True,
+                    "source": "local"}
         # Fallback to manual prompt
         print("\n Available categories: ")
         for i, cat in enumerate(category_names, 1):
@@ -116,10 +127,172 @@ def expense_category_classification(description):
             choice = input("Please choose a category: ").strip()
             if choice.isdigit() and 1 <= int(choice) <= len(category_names):
                 selected=category_names[int(choice)-1]
-                return {"category": selected, "confidence": 1.0, "prompt_user": False}
+                # Remembered (and learned) so this merchant is not asked about again
+                remember_category(description, selected)
+                return {"category": selected, "confidence": 1.0, "prompt_user": False,
+                        "source": "user"}
             else:
                 print("Invalid selection. Please enter a valid number")        
     
+def learn_category(category, description):
+    """Feeds a logged expense back into the local classifier"""
+    if category and description:
+        get_category_classifier().learn(category, description)
+
+def _clean_category_answer(text):
+    return text.strip().strip("\"'`*.").strip().lower()
+
+def match_streamed_category(text, by_lower):
+    """
+    Category named by a partially streamed answer, or None while it could
+    still turn into something else. "Food" is only accepted early when no
+    other category starts with it (e.g. "Food Delivery"); otherwise it has
+    to be followed by a line break, punctuation or the end of the stream.
+    """
+    answer=_clean_category_answer(text)
+    if answer not in by_lower:
+        return None
+    stripped=text.rstrip()
+    finished=stripped!=text or stripped[-1:] in (".", "\"", "'", "`", "*")
+    if finished or not any(other!=answer and other.startswith(answer) for other in by_lower):
+        return by_lower[answer]
+    return None
+    
+def classify_with_llm(description, category_names):
+    """
+    One description, one streamed LLM call. Returns the category the model
+    named, or None if its answer is not one of ``category_names``. Network
+    errors are raised to the caller.
+    """
+    prompt = f"""
+    Categorize the following expense into one of the predefined categories.
+    Categories: [{", ".join(category_names)}]
+
+    User Input: "{description}"
+
+    Respond with only the category name as a plain text line.
+    """
+    by_lower={name.lower(): name for name in category_names}
+    response_text=""
+    with closing(get_ollama_client().generate_chunks(prompt, stop=["\n"], timeout=30)) as chunks:
+        for chunk in chunks:
+            response_text+=chunk
+            # Stop generating as soon as the answer is a known category
+            category=match_streamed_category(response_text, by_lower)
+            if category:
+                return category
+    category=by_lower.get(_clean_category_answer(response_text))
+    if category is None:
+        print("LLM Raw Response: ", repr(response_text.strip()))
+    return category
+    
+def _estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return len(text)//4+1
+
+def _batch_prompt(descriptions, category_names):
+    numbered="\n".join(f"{i}. {description}" for i, description in enumerate(descriptions, 1))
+    return f"""
+    Categorize each numbered expense into one of the predefined categories.
+    Categories: [{", ".join(category_names)}]
+
+    Expenses:
+    {numbered}
+
+    Respond with only a JSON array of {len(descriptions)} category names, one per expense, in order.
+    """
+
+def classification_batch_size(descriptions, category_names, context_window):
+    """
+    How many of ``descriptions`` fit in one prompt: the window left after
+    the instructions and category list, divided by the tokens one item
+    costs going in (its numbered line) and coming out (a quoted category).
+    """
+    if not descriptions:
+        return 0
+    base=_estimate_tokens(_batch_prompt([], category_names))
+    count=len(descriptions)
+    per_item=(max(_estimate_tokens(f"{count}. {d}\n") for d in descriptions)
+              +max(_estimate_tokens(f'"{name}", ') for name in category_names))
+    budget=context_window-base-CONTEXT_RESERVE_TOKENS
+    return max(1, min(BATCH_MAX_ITEMS, budget//per_item))
+
+def _parse_category_array(response_text, expected):
+    """The model's answers as a list of ``expected`` strings, or None"""
+    try:
+        answers=json.loads(response_text)
+    except (json.JSONDecodeError, TypeError):
+        match=re.search(r"\[.*\]", response_text or "", re.DOTALL)
+        if not match:
+            return None
+        try:
+            answers=json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+    if isinstance(answers, dict):
+        # JSON mode sometimes wraps the array: {"categories": [...]}
+        answers=next((value for value in answers.values() if isinstance(value, list)), None)
+    if not isinstance(answers, list) or len(answers)!=expected:
+        return None
+    return [answer if isinstance(answer, str) else "" for answer in answers]
+    
+def classify_expense_batch(descriptions, categories=None, retry_invalid=True):
+    """
+    Classifies many descriptions with as few LLM calls as possible. Returns
+    one category (or None when the model gave no usable answer) per
+    description and never asks the user, so it is safe for unattended
+    imports.
+    
+    Each call asks for a JSON array covering as many descriptions as the
+    model's context window holds. A reply that is not an array of the right
+    length (usually a truncated one) halves the batch size and the batch is
+    sent again; answers that are not known categories are retried one by
+    one with classify_with_llm.
+    """
+    if not descriptions:
+        return []
+    if categories is None:
+        categories=load_categories()
+    category_names=list(categories.keys())
+    by_lower={name.lower(): name for name in category_names}
+    client=get_ollama_client()
+    
+    results=[None]*len(descriptions)
+    invalid=[]
+    pending=list(range(len(descriptions)))
+    size=classification_batch_size(descriptions, category_names, client.context_window())
+    while pending:
+        batch, rest=pending[:size], pending[size:]
+        batch_descriptions=[descriptions[i] for i in batch]
+        try:
+            response=client.generate(_batch_prompt(batch_descriptions, category_names),
+                                     format="json", timeout=30+2*len(batch))
+            response.raise_for_status()
+            answers=_parse_category_array(response.json().get("response", ""), len(batch))
+        except Exception as e:
+            print(f"LLM batch categorization failed: {e}")
+            return results
+        
+        if answers is None:
+            if len(batch)>1:
+                size=max(1, len(batch)//2)
+                continue
+            answers=[""]
+        pending=rest
+        for i, answer in zip(batch, answers):
+            results[i]=by_lower.get(_clean_category_answer(answer))
+            if results[i] is None:
+                invalid.append(i)
+    
+    if retry_invalid:
+        for i in invalid:
+            try:
+                results[i]=classify_with_llm(descriptions[i], category_names)
+            except Exception as e:
+                print(f"LLM categorization failed: {e}")
+                break
+    return results
+    
 def extract_amount_from_description(text):
     """
     Extracts the first numeric amount from the given expense description
@@ -131,19 +304,14 @@ def extract_amount_from_description(text):
         return float(amt)
     return None
 
-def extract_description(user_prompt, amount):
-    """
-    Extracts a clean, user-style description from an expense sentence.
-    e.g. "I paid ₹300 for cab ride to office" -> "Cab ride to office"
-    """
-    
+def _strip_amount(user_prompt, amount):
     # Remove ₹ or numeric amount
+    if amount is None:
+        return user_prompt
     pattern=rf"(₹\s*{int(amount)}(?:\.00)?)|\b{int(amount)}(?:\.00)?\b"
-    text=re.sub(pattern, '', user_prompt, flags=re.IGNORECASE)
-    
-    # Parse with SpaCy
-    doc=nlp(text)
-    
+    return re.sub(pattern, '', user_prompt, flags=re.IGNORECASE)
+
+def _description_from_doc(doc, text):
     # Try to return the longest noun phrase
     noun_chunks=[chunk.text.strip() for chunk in doc.noun_chunks if len(chunk.text.strip())>2]
     if noun_chunks:
@@ -153,8 +321,68 @@ def extract_description(user_prompt, amount):
     text=re.sub(r'\b(i\s+)?(paid|spent|gave|used|added|bought|towards|for|on|as|in|from|to|at|my|the|a|an)\b', '', text, flags=re.IGNORECASE)
     text=re.sub(r'\s+', ' ', text).strip()
     return text.capitalize()
+
+def get_nlp():
+    """The spaCy pipeline, loaded on the first call"""
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            _nlp=spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+        return _nlp
+
+def warm_up_nlp():
+    """Loads spaCy ahead of the first expense; False if it cannot be loaded"""
+    try:
+        get_nlp()
+        return True
+    except (ImportError, OSError):
+        return False
+
+_FILLER_PREFIX=re.compile(
+    r"^(?:(?:i|we)\s+)?(?:(?:paid|spent|gave|used|added|bought|rs\.?|inr|rupees|₹)\s+)*"
+    r"(?:(?:for|on|towards|at|to|in|as)\s+)?", re.IGNORECASE)
+_FILLER_SUFFIX=re.compile(r"(?:\s+(?:rs\.?|inr|rupees|only|/-))+$", re.IGNORECASE)
+
+def _fast_description(text):
+    # Short inputs ("swiggy", "uber ride") need no parse: trim the filler
+    # around them and keep the rest as typed
+    if not FAST_DESCRIPTION_WORDS:
+        return None
+    text=re.sub(r"\s+", " ", text).strip(" .,:;-")
+    text=_FILLER_SUFFIX.sub("", _FILLER_PREFIX.sub("", text)).strip(" .,:;-")
+    if text and len(text.split())<=FAST_DESCRIPTION_WORDS:
+        return text.capitalize()
+    return None
+
+def extract_description(user_prompt, amount):
+    """
+    Extracts a clean, user-style description from an expense sentence.
+    e.g. "I paid ₹300 for cab ride to office" -> "Cab ride to office"
+    """
+    text=_strip_amount(user_prompt, amount)
+    fast=_fast_description(text)
+    if fast:
+        return fast
     
+    # Parse with SpaCy
+    return _description_from_doc(get_nlp()(text), text)
+
+def extract_descriptions(user_prompts, amounts=None, batch_size=256):
+    """
+    Batch form of extract_description: short texts take the regex path and
+    the rest go through one nlp.pipe pass, spread over NLP_PROCESSES
+    worker processes once there are enough of them to repay the start-up.
+    """
+    if amounts is None:
+        amounts=[None]*len(user_prompts)
+    texts=[_strip_amount(prompt, amount) for prompt, amount in zip(user_prompts, amounts)]
+    descriptions=[_fast_description(text) for text in texts]
     
-    
-    
-    
+    parse=[i for i, description in enumerate(descriptions) if description is None]
+    if parse:
+        n_process=NLP_PROCESSES if len(parse)>=NLP_MULTIPROCESS_MIN else 1
+        docs=get_nlp().pipe((texts[i] for i in parse), batch_size=batch_size, n_process=n_process)
+        for i, doc in zip(parse, docs):
+            descriptions[i]=_description_from_doc(doc, texts[i])
+    return descriptions
@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+
+from core.registry import JsonRegistry
+from core.storage import write_lock
+
+from memory.category_classifier import get_category_classifier, tokenize
+
+
+CATEGORY_MEMO_FILE = "memory/category_memo.json"
+
+# Merchants remembered; the least recently used one goes first
+CATEGORY_MEMO_SIZE = int(os.environ.get("SOLIN_CATEGORY_MEMO_SIZE", 1000))
+
+
+def memo_key(description):
+    """Order-free token key, so "UPI-SWIGGY-ORDER" and "swiggy" match"""
+    return " ".join(sorted(set(tokenize(description))))
+
+
+# ----------------------------------------
+# Merchant -> Category Memo
+# ----------------------------------------
+
+class CategoryMemo:
+    """Categories the user has confirmed, keyed by normalized description.
+
+    Filled by corrections (an overridden suggestion, or an entry moved to
+    another category) and consulted before the classifier or the LLM.
+    Every entry keeps a hit count and the time it was last used; beyond
+    ``size`` entries the least recently used are evicted. Hits only update
+    memory until the next ``record`` or ``flush``, so lookups stay free of
+    disk writes.
+    """
+
+    def __init__(self, path=CATEGORY_MEMO_FILE, size=CATEGORY_MEMO_SIZE):
+        self.path = path
+        self.size = size
+        self._registry = JsonRegistry(path)
+        self._touched = {}
+        self._lock = threading.Lock()
+
+    def get(self, description):
+        """Confirmed category for ``description``, or None"""
+        key = memo_key(description)
+        if not key:
+            return None
+        entry = self._registry.lookup(key)
+        if not entry:
+            return None
+        with self._lock:
+            hits, _ = self._touched.get(key, (0, 0))
+            self._touched[key] = (hits + 1, time.time())
+        return entry["category"]
+
+    def record(self, description, category):
+        """Remembers that ``description`` belongs to ``category``"""
+        key = memo_key(description)
+        if not key or not category:
+            return False
+        with self._lock, write_lock(self.path):
+            memo = self._registry.get() or {}
+            self._apply_touched(memo)
+            entry = memo.get(key)
+            if entry and entry.get("category") == category:
+                memo[key] = {**entry, "confirmed": entry.get("confirmed", 1) + 1,
+                             "last_used": time.time()}
+            else:
+                memo[key] = {"category": category, "hits": 0, "confirmed": 1,
+                             "last_used": time.time()}
+            self._registry.save(self._evict(memo))
+        return True
+
+    def flush(self):
+        """Writes pending hit counts; no-op when nothing was looked up"""
+        with self._lock:
+            if not self._touched:
+                return
+            with write_lock(self.path):
+                memo = self._registry.get() or {}
+                self._apply_touched(memo)
+                self._registry.save(self._evict(memo))
+
+    def _apply_touched(self, memo):
+        for key, (hits, last_used) in self._touched.items():
+            entry = memo.get(key)
+            if entry:
+                memo[key] = {**entry, "hits": entry.get("hits", 0) + hits,
+                             "last_used": max(entry.get("last_used", 0), last_used)}
+        self._touched = {}
+
+    def _evict(self, memo):
+        if len(memo) <= self.size:
+            return memo
+        recent = sorted(memo, key=lambda key: memo[key].get("last_used", 0), reverse=True)
+        return {key: memo[key] for key in recent[:self.size]}
+
+    def stats(self):
+        memo = self._registry.get() or {}
+        top = sorted(memo.items(), key=lambda item: item[1].get("hits", 0), reverse=True)[:10]
+        return {
+            "entries": len(memo),
+            "hits": sum(entry.get("hits", 0) for entry in memo.values()),
+            "top": {key: entry["category"] for key, entry in top}
+            }
+
+
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def get_category_memo():
+    """Process-wide category memo"""
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = CategoryMemo()
+        return _memo
+
+
+def remember_category(description, category, previous=None):
+    """Records a user-confirmed category for the memo and the classifier
+
+    ``previous`` is the category an existing expense was moved out of; the
+    classifier forgets that label so the move is not counted under both.
+    """
+    if get_category_memo().record(description, category):
+        classifier = get_category_classifier()
+        classifier.learn(category, description)
+        if previous and previous != category:
+            classifier.unlearn(previous, description)
@@ -1,63 +1,32 @@
-import os
-import json
+from core.storage import read_json, save_json, update_json, write_lock
+
+MEMORY_FILE = "memory/memory.json"
 
 # ----------------------------------------
 # Core Memory Operations
 # ----------------------------------------
 
 def remember(key, value):
-    # Define a path to the memory file
-    memory_file="memory/memory.json"
- 
-    # Load current memory (if file exists)
-    if os.path.exists(memory_file):
-        with open(memory_file, "r") as file:
-            data=json.load(file)
-    else:
-        data={}
-
-    # Update memory
-    data[key] = value 
-
-    # Save back to Json
-    with open(memory_file, "w") as file:
-        json.dump(data, file, indent=4)
+    # Load current memory (empty if the file does not exist yet), update it
+    # and save it back atomically while holding the writer lock
+    with update_json(MEMORY_FILE, default={}) as data:
+        data[key] = value 
         
 def recall(key):
-    # Define the memory file path
-    memory_file="memory/memory.json"
-    
-    # Check if the file exists
-    if not os.path.exists(memory_file):
-        return None
-    
-    # Load the file
-    with open(memory_file,"r") as file:
-        data=json.load(file)
+    # Load the file under a shared lock (empty if it does not exist)
+    data=read_json(MEMORY_FILE, default={})
     
     # Return the requested file
     return data.get(key)
         
 def forget(key):
-    memory_file="memory/memory.json"
-    
-    if not os.path.exists(memory_file):
-        return False
-    
-    with open(memory_file,"r") as file:
-        data=json.load(file)
+    with write_lock(MEMORY_FILE):
+        data=read_json(MEMORY_FILE, default={})
         
-    if key in data:
-        del data[key]
-        with open(memory_file, "w") as file:
-            json.dump(data, file, indent=4)
-        return True
+        if key in data:
+            del data[key]
+            save_json(MEMORY_FILE, data)
+            return True
     
-    else:
-        return False
-
-        
-            
-        
-        
-    
\ No newline at end of file
+        else:
+            return False
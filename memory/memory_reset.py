@@ -1,42 +1,35 @@
-import os
 from datetime import datetime
+from core.storage import read_lock, write_atomic, write_lock
 from tools.expense_tracker import reset_monthly_expense
 
+RESET_FILE = "memory/expense_reset.txt"
+
+def _last_reset_month():
+    with read_lock(RESET_FILE):
+        try:
+            with open(RESET_FILE, "r") as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return None
+
 def check_and_reset_monthly_expense():
     """Checks if a new month has started and resets the monthly expense if necessary."""
-    reset_file= "memory/expense_reset.txt"
     current_month= datetime.now().strftime("%Y-%m")
-    if not os.path.exists(reset_file):
-        with open(reset_file, "w") as file:
-            file.write(current_month)
-        
-        reset_monthly_expense()
-        
+    
+    # Held across the reset so two sessions starting together only reset once
+    with write_lock(RESET_FILE):
+        last_reset_month = _last_reset_month()
+        if last_reset_month == current_month:
+            return {
+                "triggered": False,
+                "message": "Reset already performed for this month."
+            }
+            
         result = reset_monthly_expense()
+        write_atomic(RESET_FILE, current_month)
         
         return {
             "triggered": True,
-            "first_time": True,
-            "result": result
-        }
-        
-    with open(reset_file, "r") as file:
-        last_reset_month = file.read().strip()
-            
-    if last_reset_month != current_month:
-        result=reset_monthly_expense()
-        with open(reset_file, "w") as file:
-            file.write(f"{current_month}")
-        return {
-            "triggered": True,
-            "first_time": False,
+            "first_time": last_reset_month is None,
             "result": result
             }
-    
-    return {
-        "triggered": False,
-        "message": "Reset already performed for this month."
-    }
-
-    
-        
\ No newline at end of file
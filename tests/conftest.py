@@ -0,0 +1,127 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import agents.ollama_client as ollama_client
+import memory.category_classifier as category_classifier
+import memory.category_memo as category_memo
+import tools.archive_query as archive_query
+import tools.expense_store as expense_store
+from memory.category_manager import default_categories
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Runs the test in an empty directory with a fresh ``memory/``
+
+    Every store path is relative to the working directory, so this keeps
+    the ledger, journal, rollups and archives of one test away from the
+    next. The process-wide store and archive engine are reset too.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "memory").mkdir()
+    monkeypatch.setattr(expense_store, "_store", None)
+    monkeypatch.setattr(archive_query, "_engine", None)
+    return tmp_path
+
+
+@pytest.fixture
+def store(workdir):
+    store = expense_store.ExpenseStore()
+    yield store
+    store.wait_for_compaction()
+
+
+@pytest.fixture
+def fresh_classifier(store, monkeypatch):
+    """Process-wide classifier and memo, over ``store`` and nothing else"""
+    monkeypatch.setattr(expense_store, "_store", store)
+    monkeypatch.setattr(category_classifier, "_classifier", None)
+    monkeypatch.setattr(category_memo, "_memo", None)
+    return category_classifier.get_category_classifier()
+
+
+@pytest.fixture
+def default_classifier(store, fresh_classifier):
+    store.save_categories(default_categories)
+    return fresh_classifier
+
+
+# ----------------------------------------
+# Ollama Stand-In
+# ----------------------------------------
+
+class OllamaStandIn(BaseHTTPRequestHandler):
+    """Answers the way Ollama does, from the server's ``answer(path, payload)``
+
+    ``answer`` returns a body, a list of bodies (sent as a chunked JSON-lines
+    stream, a callable in the list is run between lines) or ``(status, body)``.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, bodies):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for body in bodies:
+            if callable(body):
+                body()
+                continue
+            line = json.dumps(body).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        self.server.requests.append((self.path, None, self.client_address))
+        self._send(200, {"models": []})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, payload, self.client_address))
+        reply = self.server.answer(self.path, payload)
+        if isinstance(reply, tuple):
+            self._send(*reply)
+        elif isinstance(reply, list):
+            try:
+                self._stream(reply)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+        else:
+            self._send(200, reply)
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    """A local Ollama stand-in, and the process-wide client pointed at it
+
+    Tests set ``ollama.answer``; ``ollama.requests`` records every
+    ``(path, payload, client address)``.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaStandIn)
+    server.daemon_threads = True
+    server.requests = []
+    server.answer = lambda path, payload: {"done": True}
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    server.client = ollama_client.OllamaClient(base_url=f"http://127.0.0.1:{server.server_port}",
+                                               model="llama3.2")
+    monkeypatch.setattr(ollama_client, "_client", server.client)
+    yield server
+    server.client.close()
+    server.shutdown()
+    server.server_close()
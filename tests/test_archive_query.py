@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from tools.archive_query import ArchiveQueryEngine
+
+
+def expense(amount, description, date, time="09:00"):
+    return {"amount": amount, "description": description, "date": date, "time": time}
+
+
+@pytest.fixture
+def engine(workdir):
+    engine = ArchiveQueryEngine("archives")
+    engine.write_archive("2026-07", {"Food": [expense(10, "tea", "2026-07-20")]})
+    engine.write_archive("2026-08", {"Food": [expense(30, "lunch", "2026-08-02", "13:00"),
+                                              expense(20, "coffee", "2026-08-02", "08:00")],
+                                     "Bills": [expense(900, "rent", "2026-08-01")]})
+    engine.write_archive("2026-09", {"Bills": [expense(950, "rent", "2026-09-01")]})
+    engine.invalidate()
+    return engine
+
+
+@pytest.fixture
+def opened(engine, monkeypatch):
+    """Months whose archive body gets parsed"""
+    months = []
+    load = engine.load
+
+    def counting_load(year_month):
+        months.append(year_month)
+        return load(year_month)
+
+    monkeypatch.setattr(engine, "load", counting_load)
+    return months
+
+
+def test_only_months_overlapping_the_query_are_opened(engine, opened):
+    found = engine.entries_between("2026-08-01", "2026-08-31", ["Food"])
+    assert [entry["description"] for entry in found["Food"]] == ["lunch", "coffee"]
+    assert opened == ["2026-08"]
+
+    # September has no Food at all, which its summary already says
+    opened.clear()
+    assert engine.entries_between("2026-09-01", None, ["Food"]) == {}
+    assert opened == []
+
+
+def test_iter_entries_streams_oldest_first(engine):
+    assert [entry["description"] for _, entry in engine.iter_entries()] == [
+        "tea", "rent", "coffee", "lunch", "rent"]
+
+
+def test_whole_months_are_totalled_from_their_summaries(engine, opened):
+    assert engine.totals_between("2026-08-01", "2026-09-30") == {"Food": 50, "Bills": 1850}
+    assert opened == []
+    assert engine.totals_between("2026-08-02", "2026-08-31") == {"Food": 50}
+    assert opened == ["2026-08"]
+
+
+def test_cached_archives_are_bounded_and_dropped_when_the_file_changes(engine):
+    engine.cache_bytes = 1
+    for month in engine.months():
+        engine.load(month)
+    # Always keeps the most recent one, however small the budget
+    assert list(engine._cache) == ["2026-09"]
+
+    engine.cache_bytes = 2**20
+    assert engine.load("2026-07")["Food"][0]["amount"] == 10
+    path = engine.archive_path("2026-07")
+    with open(path, "w") as file:
+        file.write('{"Food": [{"amount": 15, "description": "tea", "date": "2026-07-20"}]}')
+    os.utime(path, ns=(1, 1))
+    assert engine.load("2026-07")["Food"][0]["amount"] == 15
+
+
+# ---------- Compressed Archives and Manifest ----------
+
+@pytest.mark.parametrize("archive_format, suffix", [("gzip", ".json.gz"), ("lzma", ".json.xz")])
+def test_compressed_archives_read_back_the_same(engine, archive_format, suffix):
+    original = engine.load("2026-08")
+    engine.write_archive("2026-08", original, archive_format)
+
+    assert sorted(name for name in os.listdir("archives") if not name.endswith(".lock")) == [
+        "expenses_2026-07.json", f"expenses_2026-08{suffix}", "expenses_2026-09.json",
+        "manifest.json", "summaries"]
+    engine.invalidate()
+    assert engine.load("2026-08") == original
+    assert engine.manifest()["months"]["2026-08"]["format"] == archive_format
+
+
+def test_upgrade_compresses_every_month_in_place(engine):
+    before = {month: engine.load(month) for month in engine.months()}
+    result = engine.upgrade("gzip")
+
+    assert result["upgraded_months"] == ["2026-07", "2026-08", "2026-09"]
+    assert engine.upgrade("gzip")["upgraded_months"] == []
+    engine.invalidate()
+    assert {month: engine.load(month) for month in engine.months()} == before
+
+
+def test_manifest_records_each_month_and_catches_tampering(engine):
+    months = engine.manifest()["months"]
+    assert list(months) == ["2026-07", "2026-08", "2026-09"]
+    assert (months["2026-08"]["entries"], months["2026-08"]["total"]) == (3, 950)
+    assert engine.verify() == []
+
+    with open(engine.archive_path("2026-09"), "a") as file:
+        file.write(" ")
+    os.remove(engine.archive_path("2026-07"))
+    assert engine.verify() == ["2026-07", "2026-09"]
+
+    os.remove(engine.manifest_path())
+    assert list(engine.rebuild_manifest()["months"]) == ["2026-08", "2026-09"]
+    assert engine.verify() == []
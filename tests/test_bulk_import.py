@@ -0,0 +1,46 @@
+import pytest
+
+from tools.archive_query import get_archive_engine
+from tools.bulk_import import import_expenses
+
+
+STATEMENT = """Txn Date,Narration,Debit,Credit,Category
+01/10/2026,Swiggy order,250.00,,Food
+01/10/2026,Swiggy order,250.00,,Food
+02/10/2026,Salary,,50000.00,
+03/10/2026,Electricity bill,1200.00,,Bills
+05/09/2026,Metro card,300.00,,Transport
+"""
+
+
+@pytest.fixture
+def statement(default_classifier, workdir):
+    path = workdir / "statement.csv"
+    path.write_text(STATEMENT)
+    return str(path)
+
+
+def test_reimporting_a_statement_adds_nothing(statement, store):
+    first = import_expenses(statement, clean_descriptions=False)
+    assert (first["imported"], first["duplicates"], first["skipped_credits"]) == (4, 0, 1)
+    # The same order twice in one statement is two expenses
+    assert [entry["amount"] for entry in store.entries("Food")] == [250, 250]
+
+    again = import_expenses(statement, clean_descriptions=False)
+    assert (again["imported"], again["duplicates"]) == (0, 4)
+    assert sum(len(entries) for entries in store.load().values()) == 4
+
+
+def test_rows_already_archived_are_skipped(statement, store):
+    get_archive_engine().write_archive("2026-09", {"Transport": [
+        {"id": "a1b2c3d4e5", "amount": 300, "description": "metro card",
+         "date": "2026-09-05", "time": "00:00"}]})
+
+    result = import_expenses(statement, clean_descriptions=False)
+    assert (result["imported"], result["duplicates"]) == (3, 1)
+    assert store.entries("Transport") == []
+
+
+def test_dry_run_writes_nothing(statement, store):
+    assert import_expenses(statement, clean_descriptions=False, dry_run=True)["imported"] == 4
+    assert store.load() == {}
@@ -0,0 +1,46 @@
+import pytest
+
+from memory.category_classifier import CLASSIFIER_THRESHOLD, CategoryClassifier
+from memory.category_memo import remember_category
+
+
+@pytest.fixture
+def classifier(store, fresh_classifier):
+    store.save_categories({"Food": "meals, restaurants", "Transport": "cab, metro, fuel"})
+    return fresh_classifier
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("swiggy", "Food"),
+    ("UPI-SWIGGY-ORDER", "Food"),
+    ("Uber ride", "Transport"),
+    ("netflix", "Entertainment"),
+    ("paid rent", "Bills"),
+    ])
+def test_one_keyword_hit_is_classified_without_the_llm(default_classifier, description, expected):
+    category, confidence = default_classifier.classify(description)
+    assert category == expected
+    assert confidence >= CLASSIFIER_THRESHOLD
+
+
+def test_keyword_shared_by_two_categories_stays_unsure(default_classifier):
+    # "health" is both a Health keyword and Insurance's "health cover"
+    _, confidence = default_classifier.classify("health")
+    assert confidence < CLASSIFIER_THRESHOLD
+
+
+def test_moved_expense_is_counted_only_under_its_new_category(store, classifier):
+    for _ in range(3):
+        store.add("Food", {"amount": 250, "description": "uber", "date": "2026-10-01",
+                           "time": "09:00"})
+    assert classifier.classify("uber")[0] == "Food"
+
+    # The user moves each one, as edit_expense does
+    for _ in range(3):
+        entry = store.entries("Food")[0]
+        store.move("Food", 0, "Transport")
+        remember_category(entry["description"], "Transport", "Food")
+
+    rebuilt = CategoryClassifier()
+    assert classifier.scores("uber") == pytest.approx(rebuilt.scores("uber"))
+    assert classifier.classify("uber")[0] == "Transport"
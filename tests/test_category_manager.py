@@ -0,0 +1,113 @@
+import os
+import re
+import sys
+import json
+import subprocess
+
+import memory.category_manager as category_manager
+from memory.category_manager import classification_batch_size, classify_expense_batch
+from memory.category_memo import get_category_memo
+
+
+def test_manual_pick_is_remembered_and_learned_once(default_classifier, monkeypatch):
+    def llm_down(description, categories):
+        raise ConnectionError("Ollama is not reachable")
+
+    monkeypatch.setattr(category_manager, "classify_with_llm", llm_down)
+    transport = list(category_manager.default_categories).index("Transport") + 1
+    monkeypatch.setattr("builtins.input", lambda prompt="": str(transport))
+
+    result = category_manager.expense_category_classification("blablacar")
+    assert (result["category"], result["source"]) == ("Transport", "user")
+
+    assert get_category_memo().get("blablacar") == "Transport"
+    assert default_classifier._history_docs.get("Transport") == 1
+    # The next time the memo answers without asking
+    assert category_manager.expense_category_classification("blablacar")["source"] == "memo"
+
+
+# ---------- Batched LLM Classification ----------
+
+def test_batches_follow_the_context_window():
+    names = list(category_manager.default_categories)
+    descriptions = [f"Lunch at cafe {i}" for i in range(60)]
+    assert 1 < classification_batch_size(descriptions, names, 512) < category_manager.BATCH_MAX_ITEMS
+    assert classification_batch_size(descriptions, names, 1024) == category_manager.BATCH_MAX_ITEMS
+    assert classification_batch_size(descriptions, names, 100) == 1
+    assert classification_batch_size([], names, 1024) == 0
+
+
+def test_a_truncated_reply_halves_the_batch_and_bad_answers_are_asked_again(ollama):
+    def answer(path, payload):
+        if path == "/api/show":
+            return {"parameters": "num_ctx 512"}
+        if "JSON array" not in payload["prompt"]:
+            return [{"response": "Transport", "done": False}, {"response": "", "done": True}]
+        batch = re.findall(r"^\s*\d+\. (.+)$", payload["prompt"], re.MULTILINE)
+        answers = ["Miscellaneous" if item == "Uber 7" else "Food" for item in batch]
+        # The first reply is cut off one answer short
+        return {"response": json.dumps(answers[:-1] if len(ollama.requests) == 2 else answers)}
+
+    ollama.answer = answer
+    descriptions = [f"Uber {i}" for i in range(60)]
+    results = classify_expense_batch(descriptions, category_manager.default_categories)
+
+    assert results == ["Transport" if i == 7 else "Food" for i in range(60)]
+    sizes = [len(re.findall(r"^\s*\d+\. ", payload["prompt"], re.MULTILINE))
+             for path, payload, _ in ollama.requests[1:] if "JSON array" in payload["prompt"]]
+    full = classification_batch_size(descriptions, list(category_manager.default_categories), 512)
+    assert sizes[:2] == [full, full // 2]
+    assert sum(sizes[1:]) == 60
+
+
+# ---------- Description Extraction ----------
+
+class Span:
+    def __init__(self, text):
+        self.text = text
+
+
+class Doc:
+    def __init__(self, text):
+        self.noun_chunks = [Span(text.split(" for ")[-1])]
+
+
+class Pipeline:
+    """Stands in for the spaCy pipeline, recording every batch it is given"""
+
+    def __init__(self):
+        self.batches = []
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.batches.append(texts)
+        return [Doc(text) for text in texts]
+
+
+def test_spacy_is_not_imported_with_the_module():
+    code = "import sys, memory.category_manager; print('spacy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert result.stdout.strip() == "False"
+
+
+def test_short_descriptions_skip_the_parser(monkeypatch):
+    def no_parser():
+        raise AssertionError("spaCy should not be needed")
+
+    monkeypatch.setattr(category_manager, "get_nlp", no_parser)
+    assert category_manager.extract_description("I paid ₹300 for swiggy", 300) == "Swiggy"
+    assert category_manager.extract_description("uber ride 250 rs", 250) == "Uber ride"
+
+
+def test_long_descriptions_are_parsed_in_one_pass(monkeypatch):
+    pipeline = Pipeline()
+    monkeypatch.setattr(category_manager, "get_nlp", lambda: pipeline)
+
+    descriptions = category_manager.extract_descriptions(
+        ["spent 40 on tea", "I paid 300 for a cab ride to the office",
+         "paid 1200 towards the electricity bill for the month of september"],
+        [40, 300, 1200])
+
+    assert descriptions == ["Tea", "A cab ride to the office", "The month of september"]
+    assert len(pipeline.batches) == 1 and len(pipeline.batches[0]) == 2
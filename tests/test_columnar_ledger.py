@@ -0,0 +1,42 @@
+import pytest
+
+from tools.columnar_ledger import ColumnarLedger
+
+
+def expense(amount, description, date):
+    return {"amount": amount, "description": description, "date": date, "time": "09:00"}
+
+
+def test_columns_follow_every_write_without_a_rebuild(store):
+    for day in range(1, 9):
+        store.add("Food", expense(10 * day, f"meal {day}", f"2026-10-0{day}"))
+        store.add("Bills", expense(100 * day, "electricity", f"2026-09-1{day}"))
+    store.add("Social", expense(500, "gift", "2026-10-09"))
+    columns = store.columns()
+
+    store.update("Food", 2, "amount", 7.5)
+    store.update_by_id(store.entries("Bills")[0]["id"], "date", "2026-10-05")
+    store.move("Food", 0, "Snacks")
+    store.remove_by_id(store.entries("Food")[3]["id"])
+    store.remove("Bills", 4)
+    store.clear_category("Social")
+
+    assert store.columns() is columns
+    rebuilt = ColumnarLedger.from_expenses(store.load())
+    assert len(columns) == len(rebuilt) == 14
+    assert columns.last_date() == rebuilt.last_date()
+    for by in ("category", "day", "month"):
+        assert store.aggregate(by) == pytest.approx(
+            getattr(rebuilt, f"totals_by_{by}")(), abs=1e-9)
+
+
+def test_removing_a_row_moves_the_last_one_into_its_place():
+    ledger = ColumnarLedger()
+    for entry_id, amount in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        ledger.append("Food", {"id": entry_id, "amount": amount, "date": "2026-10-01"})
+
+    assert ledger.remove("a")
+    assert not ledger.remove("a")
+    assert list(ledger.amounts) == [3.0, 2.0]
+    assert ledger.remove("c")
+    assert list(ledger.amounts) == [2.0]
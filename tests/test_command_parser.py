@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.command_parser import parse_command
+
+
+def test_add_expense_keeps_the_users_casing_and_resolves_day_and_time():
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    assert parse_command("Spent 250 on Lunch yesterday at 1:30 pm.") == {
+        "action": "add_expenses",
+        "params": {"amount": 250.0, "description": "Lunch", "date": yesterday, "time": "13:30",
+                   "user_input": "Spent 250 on Lunch yesterday at 1:30 pm"}
+        }
+
+
+def test_add_expense_reads_currency_and_thousands_separators():
+    params = parse_command("add rs 1,200 for Electricity bill")["params"]
+    assert (params["amount"], params["description"]) == (1200.0, "Electricity bill")
+    assert "date" not in params and "time" not in params
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("open my expense tracker", {"action": "start_expense_tracker", "params": {}}),
+    ("show expenses for last week", {"action": "view_expenses", "params": {"period": "last week"}}),
+    ("view expenses on 2026-09-30",
+     {"action": "view_expenses", "params": {"from_date": "2026-09-30", "to_date": "2026-09-30"}}),
+    ("show my budget for Food",
+     {"action": "view_budget", "params": {"mode": "specific", "category": "Food"}}),
+    ("delete entry 3 from Food",
+     {"action": "delete_expense", "params": {"entry_choice": 3, "cat_choice": "Food"}}),
+    ("delete expense [0123456789]", {"action": "delete_expense", "params": {"entry_id": "0123456789"}}),
+    ("delete entry id 0123456789", {"action": "delete_expense", "params": {"entry_id": "0123456789"}}),
+    ("remove item 3fa9c01b2e", {"action": "delete_expense", "params": {"entry_id": "3fa9c01b2e"}}),
+    ("What is the time", {"action": "show_current_datetime", "params": {}}),
+    ])
+def test_everyday_commands_skip_the_llm(command, expected):
+    assert parse_command(command) == expected
+
+
+def test_a_ten_digit_number_is_not_an_entry_id():
+    assert parse_command("delete entry 9876543210") == {
+        "action": "delete_expense", "params": {"entry_choice": 9876543210}}
+
+
+@pytest.mark.parametrize("command", [
+    # A bare hour is ambiguous, an unknown period or invalid date unparseable
+    "paid 40 for tea at 9",
+    "show expenses for my birthday",
+    "view expenses on 2026-02-30",
+    "spent 0 on nothing",
+    "what did I spend the most on this year",
+    ])
+def test_commands_the_rules_cannot_settle_go_to_the_llm(command):
+    assert parse_command(command) is None
@@ -0,0 +1,39 @@
+import pytest
+
+from tools.archive_query import get_archive_engine
+from tools.expense_tracker import expense_status, monthly_summary, query_expenses, view_expenses
+
+
+@pytest.fixture
+def archives_only(workdir):
+    """Past months archived, but no live ledger (a fresh checkout)"""
+    get_archive_engine().write_archive("2025-06", {
+        "Food": [{"id": "a1b2c3d4e5", "amount": 120, "description": "lunch",
+                  "date": "2025-06-03", "time": "13:00"}],
+        "Bills": [{"id": "f6a7b8c9d0", "amount": 900, "description": "electricity",
+                   "date": "2025-06-10", "time": "10:00"}]
+        })
+
+
+def test_queries_see_archives_without_a_live_ledger(archives_only):
+    result = query_expenses("2024-01-01", "2025-12-31")
+    assert (result["count"], result["total_expense"]) == (2, 1020)
+
+
+def test_status_and_summary_see_archives_without_a_live_ledger(archives_only):
+    status = expense_status()
+    assert status["success"]
+    assert (status["total_entries"], status["archived_months"]) == (2, 1)
+    assert monthly_summary()["months"]["2025-06"] == {"Bills": 900, "Food": 120}
+
+
+def test_viewing_everything_includes_archived_months(archives_only):
+    result = view_expenses(all=True)
+    assert sorted(result["expenses"]) == ["Bills", "Food"]
+    assert result["total_expense"] == 1020
+    assert view_expenses(all=True, include_archives=False)["expenses"] == {}
+
+
+def test_nothing_logged_anywhere_reports_no_expenses(workdir):
+    assert expense_status() == {"success": False, "message": "No expenses found."}
+    assert query_expenses("2024-01-01", "2025-12-31")["count"] == 0
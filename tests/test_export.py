@@ -0,0 +1,51 @@
+import csv
+import json
+
+import pytest
+
+from tools.archive_query import get_archive_engine
+from tools.export import export_expenses
+
+
+@pytest.fixture
+def history(store):
+    get_archive_engine().write_archive("2026-09", {"Food": [
+        {"id": "a1b2c3d4e5", "amount": 120, "description": "lunch",
+         "date": "2026-09-03", "time": "13:00"}]})
+    store.add("Food", {"amount": 30, "description": "tea, with milk", "date": "2026-10-02",
+                       "time": "09:00"})
+    store.add("Bills", {"amount": 900, "description": "rent", "date": "2026-10-01",
+                        "time": "10:00"})
+    return store
+
+
+def test_csv_export_lists_archives_then_the_ledger_by_date(history):
+    result = export_expenses("out.csv")
+    assert (result["success"], result["format"], result["rows"]) == (True, "csv", 3)
+
+    with open("out.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["source"], row["category"], row["description"]) for row in rows] == [
+        ("archive", "Food", "lunch"), ("ledger", "Bills", "rent"),
+        ("ledger", "Food", "tea, with milk")]
+    assert rows[2]["id"] == history.entries("Food")[0]["id"]
+
+
+def test_jsonl_export_applies_the_filters(history):
+    result = export_expenses("out.jsonl", start_date="2026-10-01", categories="food")
+    assert (result["format"], result["rows"]) == ("jsonl", 1)
+
+    with open("out.jsonl") as file:
+        rows = [json.loads(line) for line in file]
+    assert [(row["category"], row["amount"], row["date"]) for row in rows] == [
+        ("Food", 30, "2026-10-02")]
+
+
+def test_an_empty_export_is_just_the_header(workdir):
+    assert export_expenses("out.csv")["rows"] == 0
+    with open("out.csv") as file:
+        assert file.read() == "id,date,time,category,amount,description,source\n"
+
+
+def test_unknown_formats_are_refused(workdir):
+    assert not export_expenses("out.xlsx", export_format="xlsx")["success"]
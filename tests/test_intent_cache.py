@@ -0,0 +1,51 @@
+from agents.intent_cache import IntentCache, prompt_fingerprint
+
+
+FINGERPRINT = prompt_fingerprint("You are Solin.", "llama3.2")
+SUMMARY = {"action": "monthly_summary", "params": {"month": "2026-10"}}
+
+
+def test_rephrasings_hit_and_callers_get_their_own_copy(workdir):
+    cache = IntentCache("intent_cache.json")
+    assert cache.put("Summary for 2026-10", FINGERPRINT, SUMMARY, seconds=2.0)
+
+    cached = cache.get("  summary   FOR 2026-10! ", FINGERPRINT)
+    assert cached == SUMMARY
+    cached["params"]["month"] = "2026-11"
+    assert cache.get("summary for 2026-10", FINGERPRINT) == SUMMARY
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"]) == (2, 1)
+
+
+def test_another_session_reads_the_file_but_not_under_a_new_prompt(workdir):
+    IntentCache("intent_cache.json").put("summary for 2026-10", FINGERPRINT, SUMMARY)
+
+    cache = IntentCache("intent_cache.json")
+    assert cache.get("summary for 2026-10", FINGERPRINT) == SUMMARY
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("summary for 2026-10",
+                     prompt_fingerprint("You are Solin v2.", "llama3.2")) is None
+
+
+def test_dates_the_user_never_typed_are_not_cached(workdir):
+    cache = IntentCache("intent_cache.json")
+    today = {"action": "view_expenses", "params": {"date": "2026-10-18"}}
+    assert not cache.put("what did I spend today", FINGERPRINT, today)
+    assert not cache.put("hello", FINGERPRINT, "Hi there!")
+    assert cache.get("what did I spend today", FINGERPRINT) is None
+
+
+def test_expired_and_surplus_entries_are_dropped(workdir, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("agents.intent_cache.time.time", lambda: now[0])
+    cache = IntentCache("intent_cache.json", memory_entries=1, disk_entries=2, ttl=60)
+    for month in ("07", "08", "09"):
+        now[0] += 1
+        cache.put(f"summary for 2026-{month}", FINGERPRINT,
+                  {"action": "monthly_summary", "params": {"month": f"2026-{month}"}})
+
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.get("summary for 2026-07", FINGERPRINT) is None
+    assert cache.get("summary for 2026-08", FINGERPRINT) is not None
+    now[0] += 60
+    assert cache.get("summary for 2026-09", FINGERPRINT) is None
@@ -0,0 +1,77 @@
+import time
+import threading
+
+import pytest
+
+import agents.intent_cache as intent_cache
+import agents.llm_agent as llm_agent
+from agents.llm_agent import DictExtractor, interpret_command, load_system_prompt
+
+
+@pytest.fixture
+def agent(workdir, ollama, monkeypatch):
+    """interpret_command against the stand-in, with an empty intent cache"""
+    monkeypatch.setattr(intent_cache, "_intent_cache",
+                        intent_cache.IntentCache("memory/intent_cache.json"))
+    return ollama
+
+
+def reply(text):
+    return [{"message": {"content": text}, "done": False},
+            {"message": {"content": ""}, "done": True, "prompt_eval_count": 12}]
+
+
+def test_every_command_sends_the_same_system_message(agent):
+    agent.answer = lambda path, payload: reply('{"action": "help", "params": {}}')
+    interpret_command("what can you help me with")
+    interpret_command("how do budgets work")
+
+    sent = [payload["messages"] for _, payload, _ in agent.requests]
+    assert sent[0][0] == sent[1][0] and sent[0][0]["role"] == "system"
+    assert [messages[1:] for messages in sent] == [
+        [{"role": "user", "content": "what can you help me with"}],
+        [{"role": "user", "content": "how do budgets work"}]]
+
+
+def test_system_prompt_is_reread_only_when_the_file_changes(workdir, monkeypatch):
+    path = workdir / "system_prompts.md"
+    path.write_text("You are Solin.\n")
+    monkeypatch.setattr(llm_agent, "SYSTEM_PROMPT_FILE", str(path))
+    monkeypatch.setattr(llm_agent, "_system_prompt_cache",
+                        {"signature": None, "text": None, "fingerprints": {}})
+
+    text, fingerprint = load_system_prompt("llama3.2")
+    assert load_system_prompt("llama3.2")[0] is text
+    assert load_system_prompt("phi3")[1] != fingerprint
+
+    path.write_text("You are Solin, briefly.\n")
+    changed, changed_fingerprint = load_system_prompt("llama3.2")
+    assert changed.startswith("You are Solin, briefly.")
+    assert changed_fingerprint != fingerprint
+
+
+def test_reading_stops_at_the_end_of_the_first_object(agent):
+    release = threading.Event()
+    agent.answer = lambda path, payload: [
+        {"message": {"content": '{"action": "monthly_'}, "done": False},
+        {"message": {"content": 'summary", "params": {}}'}, "done": False},
+        lambda: release.wait(5),
+        {"message": {"content": " Hope that helps!"}, "done": False},
+        {"message": {"content": ""}, "done": True}]
+
+    started = time.perf_counter()
+    try:
+        assert interpret_command("monthly summary please") == {"action": "monthly_summary",
+                                                               "params": {}}
+        assert time.perf_counter() - started < 2
+    finally:
+        release.set()
+
+
+def test_braces_inside_strings_do_not_end_the_object():
+    extractor = DictExtractor()
+    assert extractor.feed('Sure! {"action": "add_expenses", "params": {"description": "') is None
+    assert extractor.feed('a } b"}}') == {"action": "add_expenses",
+                                          "params": {"description": "a } b"}}
+    assert extractor.done
+    assert extractor.feed(' {"ignored": true}') == extractor.result
@@ -0,0 +1,64 @@
+import time
+import threading
+
+import pytest
+
+import agents.ollama_client as ollama_client
+from agents.ollama_client import CircuitBreaker, OllamaUnavailable
+
+
+def test_calls_share_one_connection_and_keep_the_model_loaded(ollama):
+    ollama.answer = lambda path, payload: {"response": "Food", "done": True}
+    for _ in range(3):
+        assert ollama.client.generate("Category of: lunch").json()["response"] == "Food"
+
+    assert len({address for _, _, address in ollama.requests}) == 1
+    assert {payload["keep_alive"] for _, payload, _ in ollama.requests} == {"30m"}
+
+
+def test_context_window_is_looked_up_once_and_capped_by_training(ollama):
+    ollama.answer = lambda path, payload: {"parameters": "stop <eot>\nnum_ctx 16384",
+                                           "model_info": {"llama.context_length": 8192}}
+    assert ollama.client.context_window() == 8192
+    assert ollama.client.context_window() == 8192
+    assert [path for path, _, _ in ollama.requests] == ["/api/show"]
+
+    ollama.answer = lambda path, payload: {"parameters": "", "model_info": {}}
+    assert ollama.client.context_window("phi3") == 2048
+
+
+def test_an_open_breaker_fails_fast_until_the_probe_succeeds():
+    healthy = threading.Event()
+    breaker = CircuitBreaker(healthy.is_set, threshold=2, probe_interval=0.02,
+                             max_probe_interval=0.02)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.1)
+    assert breaker.state == "open"
+    healthy.set()
+    for _ in range(100):
+        if breaker.allow():
+            break
+        time.sleep(0.01)
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+
+
+def test_server_errors_open_the_breaker_and_stop_the_retries(ollama, monkeypatch):
+    monkeypatch.setattr(ollama_client, "OLLAMA_BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(ollama.client.breaker, "probe", lambda: False)
+    ollama.answer = lambda path, payload: (503, {"error": "model is loading"})
+
+    def attempt(timeout):
+        response = ollama.client.generate("Category of: lunch", timeout=timeout)
+        response.raise_for_status()
+
+    with pytest.raises(OllamaUnavailable):
+        ollama.client.retrying(attempt, attempts=5)
+    # Three 503s open the breaker; the fourth attempt never reaches the server
+    assert len(ollama.requests) == 3
+    with pytest.raises(OllamaUnavailable):
+        ollama.client.generate("Category of: lunch")
+    assert len(ollama.requests) == 3
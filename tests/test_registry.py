@@ -0,0 +1,42 @@
+import json
+import os
+
+import core.registry as registry_module
+from core.registry import CategoryRegistry, JsonRegistry
+
+
+def write(path, data, mtime_ns):
+    with open(path, "w") as file:
+        json.dump(data, file)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_file_is_parsed_once_and_reread_when_it_changes(workdir, monkeypatch):
+    reads = []
+    read_json = registry_module.read_json
+    monkeypatch.setattr(registry_module, "read_json",
+                        lambda path: reads.append(path) or read_json(path))
+    registry = JsonRegistry("budgets.json")
+    assert registry.get() is None
+
+    write("budgets.json", {"Food": 3000}, 10**18)
+    assert registry.lookup("Food") == 3000
+    registry.get()["Food"] = 0
+    assert registry.get() == {"Food": 3000}
+    assert len(reads) == 1
+
+    # Edited by hand: same size, only the mtime tells
+    write("budgets.json", {"Food": 4000}, 2 * 10**18)
+    assert registry.lookup("Food") == 4000
+    assert len(reads) == 2
+
+
+def test_category_names_are_found_regardless_of_case(workdir):
+    registry = CategoryRegistry("categories.json")
+    registry.save({"Food": "Meals", "Bills": "Rent"})
+    assert registry.find("  fOOd ") == "Food"
+    assert registry.find("Travel") is None
+
+    write("categories.json", {"Travel": "Trains"}, 10**18)
+    assert registry.find("travel") == "Travel"
+    assert registry.find("food") is None
@@ -0,0 +1,90 @@
+import json
+import os
+
+import tools.expense_store as expense_store
+from tools.expense_store import ExpenseStore, get_store
+from tools.expense_tracker import set_budget
+from tools.sqlite_store import SQLiteExpenseStore, migrate_json_to_sqlite
+
+
+def legacy_ledger(directory):
+    """A pre-ID ``expenses.json`` in ``directory``; returns its path and bytes"""
+    os.makedirs(directory)
+    path = os.path.join(directory, "expenses.json")
+    raw = json.dumps({"Food": [{"amount": 30, "description": "coffee",
+                                "date": "2026-10-02", "time": "09:00"}]}).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(raw)
+    return path, raw
+
+
+def test_migration_reads_only_the_given_ledger(workdir):
+    # Something in the default ledger's journal that must not leak in
+    ExpenseStore().add("Transport", {"amount": 90, "description": "metro",
+                                     "date": "2026-10-01", "time": "08:00"})
+    path, raw = legacy_ledger("other")
+
+    result = migrate_json_to_sqlite(db_file="other.db", expense_file=path,
+                                    budgets_file="other/budgets.json",
+                                    categories_file="other/categories.json",
+                                    archive_dir="other/archives")
+
+    assert result["imported_entries"] == 1
+    assert SQLiteExpenseStore("other.db").categories() == ["Food"]
+    # No IDs written back, no journal, checkpoint or rollups created
+    written = [name for name in os.listdir("other") if not name.endswith(".lock")]
+    assert written == ["expenses.json"]
+    with open(path, "rb") as file:
+        assert file.read() == raw
+
+
+def test_migration_keeps_legacy_entry_ids(workdir):
+    path, _ = legacy_ledger("other")
+    json_ids = [entry["id"] for entry in ExpenseStore(expense_file=path, read_only=True)
+                .load()["Food"]]
+
+    migrate_json_to_sqlite(db_file="other.db", expense_file=path,
+                           archive_dir="other/archives")
+
+    assert [entry["id"] for entry in SQLiteExpenseStore("other.db").entries("Food")] == json_ids
+
+
+def test_migration_gives_archived_entries_stable_ids(workdir):
+    path, _ = legacy_ledger("other")
+    os.makedirs("other/archives")
+    with open("other/archives/expenses_2026-09.json", "w") as file:
+        json.dump({"Food": [{"amount": 30, "description": "coffee", "date": "2026-09-02",
+                             "time": "09:00"}]}, file)
+
+    ids = []
+    for run in range(2):
+        migrate_json_to_sqlite(db_file="other.db", expense_file=path,
+                               archive_dir="other/archives", force=bool(run))
+        archived = SQLiteExpenseStore("other.db").archived_entries("2026-09")
+        ids.append(archived["Food"][0]["id"])
+
+    assert ids[0] and ids[0] == ids[1]
+
+
+def test_new_database_starts_with_the_default_categories(workdir, monkeypatch):
+    with open("memory/categories.json", "w") as file:
+        json.dump({"Food": "Meals, Swiggy", "Bills": "Electricity, rent"}, file)
+    monkeypatch.setattr(expense_store, "_store", SQLiteExpenseStore("memory/solin.db"))
+
+    assert set_budget("Food", 3000)["success"]
+    assert get_store().load_budgets() == {"Food": 3000, "Bills": 0}
+
+
+def test_migration_replaces_the_seeded_categories(workdir):
+    with open("memory/categories.json", "w") as file:
+        json.dump({"Food": "Meals, Swiggy"}, file)
+    path, _ = legacy_ledger("other")
+    with open("other/categories.json", "w") as file:
+        json.dump({"Food": "Meals", "Travel": "Trains"}, file)
+    SQLiteExpenseStore("other.db").load()
+
+    assert migrate_json_to_sqlite(db_file="other.db", expense_file=path,
+                                  categories_file="other/categories.json",
+                                  archive_dir="other/archives")["success"]
+    assert SQLiteExpenseStore("other.db").load_categories() == {"Food": "Meals",
+                                                                "Travel": "Trains"}
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import core.storage as storage
+from core.storage import GroupCommitLog
+
+
+def counting_fsync(monkeypatch, delay=0.0):
+    """Replaces os.fsync in core.storage; returns the list of calls"""
+    calls = []
+    real_fsync = storage.os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        time.sleep(delay)
+        real_fsync(fd)
+
+    monkeypatch.setattr(storage.os, "fsync", fsync)
+    return calls
+
+
+def test_concurrent_store_writes_share_fsyncs(store, monkeypatch):
+    store.add("Food", {"amount": 1, "description": "warm up", "date": "2026-10-01",
+                       "time": "08:00"})
+    calls = counting_fsync(monkeypatch, delay=0.02)
+    writers = 8
+
+    def write(n):
+        store.add("Food", {"amount": n, "description": f"item {n}", "date": "2026-10-01",
+                           "time": "09:00"})
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.entries("Food")) == writers + 1
+    assert len(calls) < writers
+
+
+def test_deferred_only_holds_back_the_calling_thread(tmp_path, monkeypatch):
+    log = GroupCommitLog(str(tmp_path / "journal.jsonl"))
+    calls = counting_fsync(monkeypatch)
+    inside, done = threading.Event(), threading.Event()
+
+    def batch():
+        with log.deferred():
+            log.append(b"a\n")
+            log.append(b"b\n")
+            inside.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=batch, daemon=True)
+    thread.start()
+    assert inside.wait(5)
+    assert calls == []
+
+    # Another thread's append is synced right away
+    log.append(b"c\n")
+    assert len(calls) == 1
+
+    done.set()
+    thread.join(5)
+    # Everything the batch wrote was already covered by that fsync
+    assert len(calls) == 1
+    assert (tmp_path / "journal.jsonl").read_bytes() == b"a\nb\nc\n"
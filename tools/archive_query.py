@@ -0,0 +1,462 @@
+import os
+import re
+import sys
+import gzip
+import lzma
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from core.storage import write_atomic, write_lock
+
+
+ARCHIVE_DIR = "memory/archives"
+SUMMARY_DIR_NAME = "summaries"
+
+# Parsed archives are kept in an LRU bounded by their uncompressed size
+ARCHIVE_CACHE_BYTES = int(os.environ.get("SOLIN_ARCHIVE_CACHE_BYTES", 16 * 2**20))
+
+# File suffix per archive format. "json" is the original indented layout;
+# the compressed formats hold compact JSON.
+ARCHIVE_FORMATS = {"json": ".json", "gzip": ".json.gz", "lzma": ".json.xz"}
+
+# Format used for newly written archives
+ARCHIVE_FORMAT = os.environ.get("SOLIN_ARCHIVE_FORMAT", "json").lower()
+if ARCHIVE_FORMAT not in ARCHIVE_FORMATS:
+    ARCHIVE_FORMAT = "json"
+
+MANIFEST_NAME = "manifest.json"
+
+ARCHIVE_PATTERN = re.compile(r"^expenses_(\d{4}-\d{2})\.json(?:\.gz|\.xz)?$")
+
+
+def encode_archive(archive, archive_format):
+    if archive_format == "json":
+        return json.dumps(archive, indent=4, ensure_ascii=False).encode("utf-8")
+    data = json.dumps(archive, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if archive_format == "gzip":
+        return gzip.compress(data, mtime=0)
+    return lzma.compress(data)
+
+
+def read_archive_bytes(path):
+    """Uncompressed JSON bytes of an archive file in any supported format"""
+    with open(path, "rb") as file:
+        data = file.read()
+    if path.endswith(".gz"):
+        return gzip.decompress(data)
+    if path.endswith(".xz"):
+        return lzma.decompress(data)
+    return data
+
+
+def archive_format_of(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".xz"):
+        return "lzma"
+    return "json"
+
+
+def _amount(entry):
+    try:
+        return float(entry.get("amount", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def summarize_archive(archive):
+    """Per-category totals, entry count and date span of one monthly archive"""
+    categories = {}
+    entries_count = 0
+    total = 0.0
+    min_date = None
+    max_date = None
+
+    for category, entries in archive.items():
+        category_total = 0.0
+        for entry in entries:
+            amount = _amount(entry)
+            category_total += amount
+            entry_date = entry.get("date")
+            if entry_date:
+                if not min_date or entry_date < min_date:
+                    min_date = entry_date
+                if not max_date or entry_date > max_date:
+                    max_date = entry_date
+        categories[category] = {"total": category_total, "count": len(entries)}
+        entries_count += len(entries)
+        total += category_total
+
+    return {
+        "entries": entries_count,
+        "total": total,
+        "categories": categories,
+        "min_date": min_date,
+        "max_date": max_date
+        }
+
+
+# ----------------------------------------
+# Lazy Archive Query Engine
+# ----------------------------------------
+
+class ArchiveQueryEngine:
+    """Answers queries over ``memory/archives`` without loading every month.
+
+    Only archives whose month overlaps the requested period are opened.
+    Parsed archives live in an LRU cache bounded by ``cache_bytes`` (measured
+    as the uncompressed JSON size) and are dropped when the file changes.
+    Archives may be plain indented JSON or gzip/lzma-compressed compact JSON;
+    ``manifest.json`` lists each month's file, entry count, total and
+    checksum. A summary sidecar per month in ``archives/summaries/`` answers
+    aggregate-only questions without parsing the archive body.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, cache_bytes=ARCHIVE_CACHE_BYTES):
+        self.archive_dir = archive_dir
+        self.summary_dir = os.path.join(archive_dir, SUMMARY_DIR_NAME)
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.RLock()
+
+    # ---------- Discovery ----------
+
+    def archive_path(self, year_month):
+        """Path of the month's archive in whichever format exists on disk,
+        or where a new archive would be written in ``ARCHIVE_FORMAT``"""
+        for fmt in ARCHIVE_FORMATS:
+            path = self._format_path(year_month, fmt)
+            if os.path.exists(path):
+                return path
+        return self._format_path(year_month, ARCHIVE_FORMAT)
+
+    def _format_path(self, year_month, archive_format):
+        suffix = ARCHIVE_FORMATS[archive_format]
+        return os.path.join(self.archive_dir, f"expenses_{year_month}{suffix}")
+
+    def summary_path(self, year_month):
+        return os.path.join(self.summary_dir, f"expenses_{year_month}.json")
+
+    def manifest_path(self):
+        return os.path.join(self.archive_dir, MANIFEST_NAME)
+
+    def months(self, start_date=None, end_date=None):
+        """Archived months (YYYY-MM) overlapping [start_date, end_date]"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        start_month = start_date[:7] if start_date else None
+        end_month = end_date[:7] if end_date else None
+
+        months = set()
+        for name in os.listdir(self.archive_dir):
+            match = ARCHIVE_PATTERN.match(name)
+            if not match:
+                continue
+            month = match.group(1)
+            if start_month and month < start_month:
+                continue
+            if end_month and month > end_month:
+                continue
+            months.add(month)
+        return sorted(months)
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    # ---------- Archive Bodies ----------
+
+    def load(self, year_month):
+        """Parsed ``{category: [entries]}`` for one month, served from the LRU"""
+        path = self.archive_path(year_month)
+        if not os.path.exists(path):
+            return {}
+        signature = self._signature(path)
+
+        with self._lock:
+            cached = self._cache.get(year_month)
+            if cached and cached[0] == signature:
+                self._cache.move_to_end(year_month)
+                return cached[2]
+
+        raw = read_archive_bytes(path)
+        archive = json.loads(raw.decode("utf-8"))
+
+        with self._lock:
+            self._evict(year_month)
+            # Budget by the uncompressed size, whatever the file format
+            self._cache[year_month] = (signature, len(raw), archive)
+            self._cached_bytes += len(raw)
+            while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+                self._evict(next(iter(self._cache)))
+        return archive
+
+    def _evict(self, year_month):
+        cached = self._cache.pop(year_month, None)
+        if cached:
+            self._cached_bytes -= cached[1]
+
+    def invalidate(self, year_month=None):
+        """Forgets the cached body of one month, or of every month"""
+        with self._lock:
+            if year_month is None:
+                self._cache.clear()
+                self._cached_bytes = 0
+            else:
+                self._evict(year_month)
+
+    def write_archive(self, year_month, archive, archive_format=None):
+        """Atomically saves one month in ``archive_format`` and refreshes its
+        summary sidecar and manifest entry. Returns the path written."""
+        archive_format = archive_format or ARCHIVE_FORMAT
+        path = self._format_path(year_month, archive_format)
+        write_atomic(path, encode_archive(archive, archive_format))
+
+        # Only one format per month may exist, or reads become ambiguous
+        for fmt in ARCHIVE_FORMATS:
+            other_path = self._format_path(year_month, fmt)
+            if fmt != archive_format and os.path.exists(other_path):
+                os.remove(other_path)
+
+        self.invalidate(year_month)
+        summary = self.write_summary(year_month, archive)
+        self._update_manifest(year_month, path, archive_format, summary)
+        return path
+
+    def upgrade(self, archive_format="gzip"):
+        """Rewrites every archive not already in ``archive_format``"""
+        upgraded = []
+        bytes_before = 0
+        bytes_after = 0
+        for month in self.months():
+            path = self.archive_path(month)
+            if archive_format_of(path) == archive_format:
+                continue
+            bytes_before += os.path.getsize(path)
+            archive = self.load(month)
+            new_path = self.write_archive(month, archive, archive_format)
+            bytes_after += os.path.getsize(new_path)
+            upgraded.append(month)
+        return {
+            "upgraded_months": upgraded,
+            "format": archive_format,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after
+            }
+
+    # ---------- Manifest ----------
+
+    def manifest(self):
+        """Contents of ``manifest.json``, or an empty manifest"""
+        path = self.manifest_path()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    return json.load(file)
+            except (OSError, ValueError):
+                pass
+        return {"version": 1, "months": {}}
+
+    def _update_manifest(self, year_month, path, archive_format, summary):
+        with self._lock, write_lock(self.manifest_path()):
+            manifest = self.manifest()
+            with open(path, "rb") as file:
+                checksum = hashlib.sha256(file.read()).hexdigest()
+            manifest["months"][year_month] = {
+                "file": os.path.basename(path),
+                "format": archive_format,
+                "entries": summary["entries"],
+                "total": summary["total"],
+                "bytes": os.path.getsize(path),
+                "sha256": checksum
+                }
+            manifest["months"] = dict(sorted(manifest["months"].items()))
+            write_atomic(self.manifest_path(),
+                         json.dumps(manifest, indent=4).encode("utf-8"))
+
+    def rebuild_manifest(self):
+        """Recreates ``manifest.json`` from the archive files on disk"""
+        with self._lock, write_lock(self.manifest_path()):
+            write_atomic(self.manifest_path(), json.dumps(
+                {"version": 1, "months": {}}, indent=4).encode("utf-8"))
+            for month in self.months():
+                path = self.archive_path(month)
+                self._update_manifest(month, path, archive_format_of(path), self.summary(month))
+        return self.manifest()
+
+    def verify(self):
+        """Months whose file is missing or no longer matches its checksum"""
+        mismatched = []
+        for month, info in self.manifest()["months"].items():
+            path = os.path.join(self.archive_dir, info["file"])
+            if not os.path.exists(path):
+                mismatched.append(month)
+                continue
+            with open(path, "rb") as file:
+                if hashlib.sha256(file.read()).hexdigest() != info["sha256"]:
+                    mismatched.append(month)
+        return mismatched
+
+    # ---------- Summary Sidecars ----------
+
+    def summary(self, year_month):
+        """Summary for one month, rebuilt if the sidecar is missing or stale"""
+        path = self.archive_path(year_month)
+        if not os.path.exists(path):
+            return None
+        mtime_ns, size = self._signature(path)
+
+        summary_path = self.summary_path(year_month)
+        if os.path.exists(summary_path):
+            try:
+                with open(summary_path, "r", encoding="utf-8") as file:
+                    summary = json.load(file)
+                if summary.get("source_mtime_ns") == mtime_ns and summary.get("source_size") == size:
+                    return summary
+            except (OSError, ValueError):
+                pass
+
+        return self.write_summary(year_month, self.load(year_month))
+
+    def write_summary(self, year_month, archive):
+        """Writes the sidecar for ``archive``, which was just saved for that month"""
+        mtime_ns, size = self._signature(self.archive_path(year_month))
+        summary = summarize_archive(archive)
+        summary["month"] = year_month
+        summary["source_mtime_ns"] = mtime_ns
+        summary["source_size"] = size
+
+        write_atomic(self.summary_path(year_month),
+                     json.dumps(summary, indent=4, ensure_ascii=False))
+        return summary
+
+    # ---------- Queries ----------
+
+    def entries_between(self, start_date=None, end_date=None, categories=None,
+                        min_amount=None, max_amount=None):
+        """``{category: [entries]}`` across every archive overlapping the range"""
+        wanted = set(categories) if categories is not None else None
+        filtered = {}
+
+        for month in self._matching_months(start_date, end_date, wanted):
+            for category, entries in self.load(month).items():
+                if wanted is not None and category not in wanted:
+                    continue
+                matching_entries = [
+                    entry for entry in entries
+                    if (not start_date or (entry.get("date") or "") >= start_date)
+                    and (not end_date or (entry.get("date") or "") <= end_date)
+                    and (min_amount is None or _amount(entry) >= min_amount)
+                    and (max_amount is None or _amount(entry) <= max_amount)]
+                if matching_entries:
+                    filtered.setdefault(category, []).extend(matching_entries)
+        return filtered
+
+    def iter_entries(self, start_date=None, end_date=None, categories=None):
+        """Yields ``(category, entry)`` over the archives, oldest first
+
+        Months are opened one at a time and each month's matches are sorted
+        by date and time, so memory stays bounded by a single archive.
+        """
+        wanted = set(categories) if categories is not None else None
+
+        for month in self._matching_months(start_date, end_date, wanted):
+            matching = []
+            for category, entries in self.load(month).items():
+                if wanted is not None and category not in wanted:
+                    continue
+                for entry in entries:
+                    date = entry.get("date") or ""
+                    if (start_date and date < start_date) or (end_date and date > end_date):
+                        continue
+                    matching.append((date, entry.get("time") or "", category, entry))
+            matching.sort(key=lambda item: item[:2])
+            for _, _, category, entry in matching:
+                yield category, entry
+
+    def _matching_months(self, start_date, end_date, wanted):
+        """Months whose summary says they can hold matches for the filters"""
+        for month in self.months(start_date, end_date):
+            summary = self.summary(month)
+            if not summary or not summary["entries"]:
+                continue
+            if start_date and summary["max_date"] and summary["max_date"] < start_date:
+                continue
+            if end_date and summary["min_date"] and summary["min_date"] > end_date:
+                continue
+            if wanted is not None and not wanted & set(summary["categories"]):
+                continue
+            yield month
+
+    def status(self):
+        """Entry count, total, categories and last date over all archives,
+        answered from the summary sidecars alone"""
+        months = self.months()
+        entries_count = 0
+        total = 0.0
+        categories = set()
+        last_date = None
+
+        for month in months:
+            summary = self.summary(month)
+            if not summary:
+                continue
+            entries_count += summary["entries"]
+            total += summary["total"]
+            categories.update(summary["categories"])
+            if summary["max_date"] and (not last_date or summary["max_date"] > last_date):
+                last_date = summary["max_date"]
+
+        return {
+            "months": months,
+            "entries": entries_count,
+            "total": total,
+            "categories": sorted(categories),
+            "last_entry_date": last_date
+            }
+
+    def totals_between(self, start_date=None, end_date=None):
+        """``{category: total}`` over archives in range; whole months come
+        straight from the sidecars, partial months are parsed"""
+        totals = {}
+        for month in self.months(start_date, end_date):
+            summary = self.summary(month)
+            if not summary:
+                continue
+            whole_month = ((not start_date or (summary["min_date"] or "") >= start_date)
+                           and (not end_date or (summary["max_date"] or "") <= end_date))
+            if whole_month:
+                for category, stats in summary["categories"].items():
+                    totals[category] = totals.get(category, 0.0) + stats["total"]
+                continue
+
+            for category, entries in self.entries_between(
+                    max(start_date or "", f"{month}-01"), min(end_date or "9999", f"{month}-31")).items():
+                totals[category] = totals.get(category, 0.0) + sum(_amount(e) for e in entries)
+        return totals
+
+
+_engine = None
+
+
+def get_archive_engine():
+    """Returns the process-wide ArchiveQueryEngine"""
+    global _engine
+    if _engine is None:
+        _engine = ArchiveQueryEngine()
+    return _engine
+
+
+if __name__ == "__main__":
+    # python -m tools.archive_query upgrade [gzip|lzma|json]
+    if len(sys.argv) > 1 and sys.argv[1] == "upgrade":
+        target_format = sys.argv[2] if len(sys.argv) > 2 else "gzip"
+        print(get_archive_engine().upgrade(target_format))
+    elif len(sys.argv) > 1 and sys.argv[1] == "verify":
+        print(get_archive_engine().verify() or "All archives match the manifest.")
+    else:
+        print("Usage: python -m tools.archive_query upgrade [gzip|lzma|json] | verify")
@@ -0,0 +1,259 @@
+import os
+import csv
+import sys
+import json
+import time
+from datetime import datetime
+
+from tools.expense_store import get_store
+
+
+# Header aliases seen in bank and UPI statement exports (matched lower-case)
+DATE_COLUMNS = ("date", "txn date", "transaction date", "value date", "posting date")
+TIME_COLUMNS = ("time", "txn time", "transaction time")
+AMOUNT_COLUMNS = ("amount", "debit", "debit amount", "withdrawal", "withdrawal amt",
+                  "withdrawal amount", "dr", "amount (inr)", "amount(inr)")
+CREDIT_COLUMNS = ("credit", "credit amount", "deposit", "deposit amt", "deposit amount", "cr")
+TYPE_COLUMNS = ("type", "dr/cr", "cr/dr", "transaction type", "txn type")
+DESCRIPTION_COLUMNS = ("description", "narration", "remarks", "particulars", "details",
+                       "transaction details", "merchant", "payee", "note", "text")
+CATEGORY_COLUMNS = ("category",)
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y",
+                "%d %b %Y", "%d-%b-%Y", "%d %b %y", "%d-%b-%y", "%d %B %Y",
+                "%Y/%m/%d", "%d.%m.%Y")
+
+# Rows held before one batched NLP pass and one batched classification
+CHUNK_ROWS = 500
+
+DEFAULT_CATEGORY = "Uncategorized"
+
+
+# ----------------------------------------
+# Reading
+# ----------------------------------------
+
+def iter_rows(path):
+    """Streams dict rows with lower-cased keys from a CSV or JSONL file"""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield {str(key).strip().lower(): value for key, value in json.loads(line).items()}
+        return
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        for row in csv.DictReader(file):
+            yield {(key or "").strip().lower(): value for key, value in row.items()}
+
+
+def _pick(row, columns):
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_date(value):
+    """ISO date for the common statement formats, or None"""
+    value = str(value or "").strip()
+    if not value:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    # Timestamps such as "2025-07-01 14:32:10" or "2025-07-01T14:32"
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _parse_amount(value, extract_amount):
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return abs(float(value))
+    return extract_amount(str(value))
+
+
+def _dedupe_key(category, entry):
+    return (category, round(float(entry["amount"]), 2), entry["description"].strip().lower(),
+            entry["date"], entry["time"])
+
+
+# ----------------------------------------
+# Bulk Import
+# ----------------------------------------
+
+def import_expenses(path, default_category=DEFAULT_CATEGORY, clean_descriptions=True,
+                    dry_run=False):
+    """Imports a bank/UPI statement (CSV or JSONL) in one write
+
+    Rows are streamed and processed in chunks: amounts and descriptions go
+    through the existing extractors in one batched spaCy pass, distinct
+    descriptions without a category are looked up in the category memo or
+    classified locally (only the uncertain ones go to the LLM, in batches),
+    and rows already in the ledger or archives (or repeated from a previous
+    import) are skipped. Everything left is committed with one store write.
+    Never prompts; rows the classifier cannot place go to ``default_category``.
+    """
+    # Deferred: category_manager pulls in the classifiers and the Ollama client
+    from memory.category_manager import (
+        classify_expense_batch,
+        extract_amount_from_description,
+        extract_descriptions,
+        learn_category
+        )
+    from memory.category_classifier import CLASSIFIER_THRESHOLD, get_category_classifier
+    from memory.category_memo import get_category_memo
+
+    if not os.path.exists(path):
+        return {"success": False, "error": f"File '{path}' not found."}
+
+    started = time.perf_counter()
+    store = get_store()
+    categories = store.load_categories() or {}
+
+    stats = {"rows_read": 0, "skipped_credits": 0, "invalid_rows": 0,
+             "duplicates": 0, "classified": 0, "from_memo": 0, "classified_locally": 0,
+             "unclassified": 0}
+    pending = []
+    classifications = {}
+    classifier = get_category_classifier()
+    memo = get_category_memo()
+    # Where each distinct description's category came from: "memo" or "local"
+    sources = {}
+
+    def process(chunk):
+        amounts = [row["amount"] for row in chunk]
+        texts = [row["text"] for row in chunk]
+        descriptions = (extract_descriptions(texts, amounts) if clean_descriptions else texts)
+        for row, description in zip(chunk, descriptions):
+            row["description"] = description or row["text"].strip()
+
+        # Classify each distinct description once
+        unknown = sorted({row["description"] for row in chunk
+                          if not row["category"] and row["description"] not in classifications})
+        uncertain = []
+        for description in unknown:
+            remembered = memo.get(description)
+            if remembered in categories:
+                classifications[description] = remembered
+                sources[description] = "memo"
+                continue
+            category, confidence = classifier.classify(description)
+            if category in categories and confidence >= CLASSIFIER_THRESHOLD:
+                classifications[description] = category
+                sources[description] = "local"
+            else:
+                uncertain.append(description)
+        # Batch sizes follow the model's context window
+        for description, category in zip(uncertain, classify_expense_batch(uncertain, categories)):
+            classifications[description] = category
+
+        for row in chunk:
+            category = row["category"]
+            if not category:
+                category = classifications.get(row["description"])
+                stats["classified" if category else "unclassified"] += 1
+                source = sources.get(row["description"])
+                stats["from_memo"] += source == "memo"
+                stats["classified_locally"] += source == "local"
+            pending.append((category or default_category, {
+                "amount": row["amount"],
+                "description": row["description"],
+                "date": row["date"],
+                "time": row["time"]
+                }))
+
+    chunk = []
+    for row in iter_rows(path):
+        stats["rows_read"] += 1
+
+        row_type = str(_pick(row, TYPE_COLUMNS) or "").strip().lower()
+        if row_type in ("cr", "credit") or (_pick(row, CREDIT_COLUMNS) and not _pick(row, AMOUNT_COLUMNS)):
+            stats["skipped_credits"] += 1
+            continue
+
+        text = str(_pick(row, DESCRIPTION_COLUMNS) or "")
+        amount = (_parse_amount(_pick(row, AMOUNT_COLUMNS), extract_amount_from_description)
+                  or extract_amount_from_description(text))
+        date = parse_date(_pick(row, DATE_COLUMNS))
+        if not amount or not date or not text.strip():
+            stats["invalid_rows"] += 1
+            continue
+
+        category = _pick(row, CATEGORY_COLUMNS)
+        if category:
+            category = store.resolve_category(str(category)) or str(category).strip()
+
+        chunk.append({"text": text, "amount": amount, "date": date,
+                      "time": str(_pick(row, TIME_COLUMNS) or "00:00").strip()[:5],
+                      "category": category})
+        if len(chunk) >= CHUNK_ROWS:
+            process(chunk)
+            chunk = []
+    if chunk:
+        process(chunk)
+
+    # Skip rows already logged (live or archived), as a multiset so genuine
+    # repeats within one statement survive while a re-import is a no-op.
+    new_items = []
+    if pending:
+        first_date = min(entry["date"] for _, entry in pending)
+        last_date = max(entry["date"] for _, entry in pending)
+        seen = {}
+        for logged in (store.entries_between(first_date, last_date),
+                       store.archived_entries_between(first_date, last_date)):
+            for category, entries in logged.items():
+                for entry in entries:
+                    try:
+                        key = _dedupe_key(category, entry)
+                    except (KeyError, TypeError, ValueError, AttributeError):
+                        continue
+                    seen[key] = seen.get(key, 0) + 1
+        for category, entry in pending:
+            key = _dedupe_key(category, entry)
+            if seen.get(key):
+                seen[key] -= 1
+                stats["duplicates"] += 1
+                continue
+            new_items.append((category, entry))
+
+    if new_items and not dry_run:
+        store.add_many(new_items)
+        for category, entry in new_items:
+            if category in categories:
+                learn_category(category, entry["description"])
+    memo.flush()
+
+    elapsed = time.perf_counter() - started
+    imported_by_category = {}
+    for category, entry in new_items:
+        imported_by_category[category] = imported_by_category.get(category, 0.0) + entry["amount"]
+
+    return {
+        "success": True,
+        "file": path,
+        "dry_run": dry_run,
+        **stats,
+        "imported": len(new_items),
+        "imported_amount": round(sum(entry["amount"] for _, entry in new_items), 2),
+        "imported_by_category": {category: round(total, 2)
+                                 for category, total in imported_by_category.items()},
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(stats["rows_read"] / elapsed, 1) if elapsed else None
+        }
+
+
+if __name__ == "__main__":
+    # python -m tools.bulk_import statement.csv [--dry-run]
+    if len(sys.argv) < 2:
+        print("Usage: python -m tools.bulk_import <file.csv|file.jsonl> [--dry-run]")
+    else:
+        print(import_expenses(sys.argv[1], dry_run="--dry-run" in sys.argv))
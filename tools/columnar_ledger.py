@@ -0,0 +1,180 @@
+from array import array
+from datetime import date as date_cls
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array module loops are the fallback
+    np = None
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ----------------------------------------
+# Columnar Ledger
+# ----------------------------------------
+
+class ColumnarLedger:
+    """Array-backed, column-per-field copy of the expense ledger.
+
+    Amounts live in a float64 array, dates as integer day ordinals (0 for a
+    missing or malformed date), categories as small-int codes into an
+    interned table and descriptions as codes into a string pool. Aggregations
+    over these columns are vectorised with NumPy when it is installed.
+
+    Row order carries no meaning, so ``remove`` moves the last row into the
+    freed one and an edit is a ``remove`` plus an ``append``; both are O(1).
+    Interned names and descriptions are kept after their last row goes.
+    """
+
+    def __init__(self):
+        self.amounts = array("d")
+        self.days = array("i")
+        self.category_codes = array("H")
+        self.description_codes = array("I")
+        self.entry_ids = []
+        self._rows = {}
+        self.category_names = []
+        self.descriptions = []
+        self._category_lookup = {}
+        self._description_lookup = {}
+        self._day_lookup = {}
+
+    @classmethod
+    def from_expenses(cls, expenses):
+        """Builds the columns from a ``{category: [entries]}`` ledger"""
+        ledger = cls()
+        for category, entries in expenses.items():
+            ledger._intern_category(category)
+            for entry in entries:
+                ledger.append(category, entry)
+        return ledger
+
+    def __len__(self):
+        return len(self.amounts)
+
+    # ---------- Building ----------
+
+    def _intern_category(self, category):
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.category_names)
+            self.category_names.append(category)
+            self._category_lookup[category] = code
+        return code
+
+    def _intern_description(self, description):
+        description = description or ""
+        code = self._description_lookup.get(description)
+        if code is None:
+            code = len(self.descriptions)
+            self.descriptions.append(description)
+            self._description_lookup[description] = code
+        return code
+
+    def _day_ordinal(self, date):
+        ordinal = self._day_lookup.get(date)
+        if ordinal is None:
+            try:
+                ordinal = date_cls.fromisoformat(date).toordinal()
+            except (TypeError, ValueError):
+                ordinal = 0
+            self._day_lookup[date] = ordinal
+        return ordinal
+
+    def append(self, category, entry):
+        entry_id = entry.get("id")
+        if entry_id is not None:
+            self._rows[entry_id] = len(self.amounts)
+        self.entry_ids.append(entry_id)
+        self.amounts.append(_to_float(entry.get("amount", 0)))
+        self.days.append(self._day_ordinal(entry.get("date")))
+        self.category_codes.append(self._intern_category(category))
+        self.description_codes.append(self._intern_description(entry.get("description")))
+
+    def remove(self, entry_id):
+        """Drops the row of ``entry_id``; False if there is none"""
+        row = self._rows.pop(entry_id, None)
+        if row is None:
+            return False
+        columns = (self.amounts, self.days, self.category_codes, self.description_codes,
+                   self.entry_ids)
+        last = len(self.amounts) - 1
+        if row != last:
+            for column in columns:
+                column[row] = column[last]
+            moved_id = self.entry_ids[row]
+            if moved_id is not None:
+                self._rows[moved_id] = row
+        for column in columns:
+            column.pop()
+        return True
+
+    def memory_bytes(self):
+        """Approximate bytes held by the columns and the interned pools"""
+        columns = sum(column.itemsize * len(column) for column in
+                      (self.amounts, self.days, self.category_codes, self.description_codes))
+        pools = sum(len(text.encode("utf-8")) for text in self.descriptions)
+        pools += sum(len(name.encode("utf-8")) for name in self.category_names)
+        return columns + pools
+
+    # ---------- Aggregations ----------
+
+    def total(self):
+        if np is not None and len(self):
+            return float(np.frombuffer(self.amounts, dtype=np.float64).sum())
+        return sum(self.amounts)
+
+    def last_date(self):
+        """Latest entry date as YYYY-MM-DD, or None"""
+        if not len(self):
+            return None
+        if np is not None:
+            latest = int(np.frombuffer(self.days, dtype=np.int32).max())
+        else:
+            latest = max(self.days)
+        return date_cls.fromordinal(latest).isoformat() if latest else None
+
+    def totals_by_category(self):
+        if np is not None and len(self):
+            sums = np.bincount(np.frombuffer(self.category_codes, dtype=np.uint16),
+                               weights=np.frombuffer(self.amounts, dtype=np.float64),
+                               minlength=len(self.category_names))
+            sums = sums.tolist()
+        else:
+            sums = [0.0] * len(self.category_names)
+            for code, amount in zip(self.category_codes, self.amounts):
+                sums[code] += amount
+        return dict(zip(self.category_names, sums))
+
+    def _totals_by_ordinal(self):
+        if np is not None and len(self):
+            days = np.frombuffer(self.days, dtype=np.int32)
+            unique_days, inverse = np.unique(days, return_inverse=True)
+            sums = np.bincount(inverse, weights=np.frombuffer(self.amounts, dtype=np.float64))
+            return dict(zip(unique_days.tolist(), sums.tolist()))
+
+        sums = {}
+        for day, amount in zip(self.days, self.amounts):
+            sums[day] = sums.get(day, 0.0) + amount
+        return sums
+
+    def totals_by_day(self):
+        """``{YYYY-MM-DD: total}``; undated entries are reported under ''"""
+        totals = {}
+        for ordinal, total in sorted(self._totals_by_ordinal().items()):
+            day = date_cls.fromordinal(ordinal).isoformat() if ordinal else ""
+            totals[day] = total
+        return totals
+
+    def totals_by_month(self):
+        """``{YYYY-MM: total}``, folded from the (few) distinct days"""
+        totals = {}
+        for day, total in self.totals_by_day().items():
+            month = day[:7]
+            totals[month] = totals.get(month, 0.0) + total
+        return totals
@@ -0,0 +1,1032 @@
+import os
+import json
+import hashlib
+import uuid
+import bisect
+import heapq
+import threading
+from contextlib import contextmanager
+from itertools import repeat
+
+from core.registry import CategoryRegistry, JsonRegistry, normalize_name
+from core.storage import GroupCommitLog, holds_lock, write_atomic, write_lock, read_lock
+
+from tools.archive_query import ARCHIVE_DIR, ArchiveQueryEngine, get_archive_engine
+from tools.columnar_ledger import ColumnarLedger
+from tools.rollups import ROLLUPS_FILE, RollupTables
+
+
+EXPENSE_FILE = "memory/expenses.json"
+BUDGETS_FILE = "memory/budgets.json"
+CATEGORIES_FILE = "memory/categories.json"
+JOURNAL_FILE = "memory/expenses_journal.jsonl"
+CHECKPOINT_FILE = "memory/expenses_journal.checkpoint"
+
+# Number of journal records after which the snapshot is rewritten
+COMPACT_EVERY = 500
+
+# Running totals closer than this (in rupees) count as consistent
+TOTALS_TOLERANCE = 0.005
+
+
+def _archive_key(entry):
+    """Content identity, for archived entries written before IDs existed"""
+    return (entry.get("amount"), entry.get("description"),
+            entry.get("date"), entry.get("time"))
+
+
+def new_entry_id():
+    """Short random ID handed to every new expense entry"""
+    return uuid.uuid4().hex[:10]
+
+
+def _legacy_entry_id(*identity):
+    """Deterministic ID for an entry logged before IDs existed
+
+    Derived from where the entry sits in the snapshot (or the journal seq
+    that added it), so every process loading the same files agrees on it.
+    """
+    return hashlib.sha1(json.dumps(identity, ensure_ascii=False, default=str)
+                        .encode("utf-8")).hexdigest()[:10]
+
+
+def _amount(entry):
+    try:
+        return float(entry.get("amount", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ----------------------------------------
+# Resident Expense Store
+# ----------------------------------------
+
+class ExpenseStore:
+    """Keeps the expense ledger resident in memory for the whole process.
+
+    ``memory/expenses.json`` is the snapshot. Every mutation is applied in
+    memory and appended as one small JSON line to the journal, so the cost of
+    a write does not depend on the size of the ledger. On load the journal is
+    replayed on top of the snapshot, and once it grows past ``COMPACT_EVERY``
+    records it is folded back into the snapshot by a background thread.
+
+    Several processes may share the ledger. Writers hold an exclusive lock
+    on ``expenses.json.lock`` and first replay whatever other processes
+    appended to the journal since we last looked; readers notice a changed
+    journal and catch up the same way under a shared lock.
+    """
+
+    def __init__(self, expense_file=EXPENSE_FILE, journal_file=JOURNAL_FILE,
+                 checkpoint_file=CHECKPOINT_FILE, compact_every=COMPACT_EVERY,
+                 rollups_file=ROLLUPS_FILE, archive_dir=ARCHIVE_DIR, read_only=False):
+        self.expense_file = expense_file
+        self.journal_file = journal_file
+        self.checkpoint_file = checkpoint_file
+        self.rollups_file = rollups_file
+        self.archive_dir = archive_dir
+        self.compact_every = compact_every
+        # A read-only store never writes or compacts (e.g. the source of a
+        # migration); legacy entries still get their deterministic IDs
+        self.read_only = read_only
+        self._archive_engine = None
+        self._expenses = None
+        self._exists = False
+        self._seq = 0
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._category_totals = {}
+        self._month_totals = {}
+        self._grand_total = 0.0
+        self._date_index = {}
+        self._columns = None
+        self._rollups = None
+        self._journal = GroupCommitLog(journal_file)
+        # Journal ticket a thread still has to sync once its write block ends
+        self._unsynced = threading.local()
+        self._journal_signature = None
+        # True while the journal ends in a record torn by a crashed writer
+        self._journal_torn = False
+        self._category_index = None
+        self._ids = {}
+        # entry id -> index in its category's list
+        self._positions = {}
+        self._budgets = JsonRegistry(BUDGETS_FILE)
+        self._registry = CategoryRegistry(CATEGORIES_FILE)
+
+    # ---------- Loading ----------
+
+    def load(self):
+        """Parses the snapshot and replays the journal once per process
+
+        Afterwards only journal records appended by other processes are
+        replayed, or the whole ledger is reloaded if one of them compacted.
+        """
+        if self._expenses is not None and self._read_signature() == self._journal_signature:
+            return self._expenses
+
+        with read_lock(self.expense_file), self._lock:
+            signature = self._read_signature()
+            if self._expenses is not None:
+                if signature == self._journal_signature:
+                    return self._expenses
+                if (self._journal_signature and signature
+                        and signature[0] == self._journal_signature[0]
+                        and signature[1] > self._journal_signature[1]):
+                    self._catch_up(self._journal_signature[1])
+                    return self._expenses
+
+            expenses = {}
+            snapshot_digest = None
+            if os.path.exists(self.expense_file):
+                with open(self.expense_file, "rb") as file:
+                    raw = file.read()
+                snapshot_digest = hashlib.sha256(raw).hexdigest()
+                expenses = json.loads(raw.decode("utf-8")) if raw.strip() else {}
+                self._exists = True
+
+            self._expenses = expenses
+            self._category_index = None
+            migrated = self._assign_missing_ids()
+            self._rebuild_totals()
+            self._rebuild_date_index()
+            self._columns = None
+            self._seq = self._checkpoint_seq(snapshot_digest)
+            self._journal_records = 0
+            self._load_rollups({"seq": self._seq, "sha256": snapshot_digest})
+
+            self._catch_up(0)
+            if migrated and not self.read_only:
+                # Persist the IDs given to pre-existing entries
+                self.compact()
+        return self._expenses
+
+    def _catch_up(self, offset):
+        """Replays journal records from byte ``offset`` that are newer than ours"""
+        # Lookups made while replaying must not start another catch-up
+        self._journal_signature = self._read_signature()
+        consumed = offset
+        for record, consumed in self._read_journal(offset):
+            if record is None or record["seq"] <= self._seq:
+                continue
+            self._apply_record(record)
+            self._seq = record["seq"]
+            self._journal_records += 1
+            self._exists = True
+
+        signature = self._read_signature()
+        self._journal_signature = signature and (signature[0], consumed)
+        if self._journal_records >= self.compact_every and not self.read_only:
+            self.compact()
+
+    def _read_signature(self):
+        """``(inode, size)`` of the journal; a new inode means it was compacted"""
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size)
+
+    def reload(self):
+        """Drops the resident copy and loads the ledger from disk again"""
+        self.wait_for_compaction()
+        with self._lock:
+            self._expenses = None
+        return self.load()
+
+    def exists(self):
+        """True once the ledger has been created on disk"""
+        self.load()
+        return self._exists
+
+    def _checkpoint_seq(self, snapshot_digest):
+        """Returns the last journal seq already folded into the snapshot"""
+        if not snapshot_digest or not os.path.exists(self.checkpoint_file):
+            return 0
+        try:
+            with open(self.checkpoint_file, "r") as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return 0
+
+        # The checkpoint is written before the snapshot is swapped in, so it
+        # remembers the previous snapshot as well in case we crashed between.
+        for candidate in (checkpoint.get("current"), checkpoint.get("previous")):
+            if candidate and candidate.get("sha256") == snapshot_digest:
+                return candidate.get("seq", 0)
+        return 0
+
+    def _assign_missing_ids(self):
+        """Gives snapshot entries without an ID one; returns how many"""
+        migrated = 0
+        for category, entries in self._expenses.items():
+            for position, entry in enumerate(entries):
+                if "id" not in entry:
+                    entry["id"] = _legacy_entry_id(
+                        "snapshot", category, position, entry.get("amount"),
+                        entry.get("description"), entry.get("date"), entry.get("time"))
+                    migrated += 1
+        return migrated
+
+    def _load_rollups(self, stamp):
+        """Uses the persisted rollups if they match the snapshot, else rebuilds
+
+        Rollups cover archived months as well, so a rebuild folds in every
+        archive file on top of the live snapshot.
+        """
+        rollups, rollups_stamp = RollupTables.load(self.rollups_file)
+        if rollups is None or rollups_stamp != stamp:
+            engine = self._archives()
+            ledgers = [self._expenses] + [engine.load(month) for month in engine.months()]
+            rollups = RollupTables.build(ledgers)
+        self._rollups = rollups
+
+    def _read_journal(self, offset=0):
+        """Yields ``(record, end_offset)`` for each journal line
+
+        ``record`` is None for a blank line or one that cannot be parsed,
+        which is skipped rather than ending the replay. Callers hold at least
+        the shared lock, so no writer is mid-append: an unterminated last line
+        was left by a writer that crashed, and the next append starts on a
+        fresh line after it instead of being glued on.
+        """
+        self._journal_torn = False
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                offset += len(line)
+                self._journal_torn = not line.endswith(b"\n")
+                record = None
+                if line.strip():
+                    try:
+                        record = json.loads(line.decode("utf-8"))
+                    except ValueError:
+                        pass
+                    if not isinstance(record, dict):
+                        print(f"Ignoring corrupt journal record in {self.journal_file}")
+                        record = None
+                yield record, offset
+
+    # ---------- Reads ----------
+
+    @property
+    def expenses(self):
+        return self.load()
+
+    def categories(self):
+        return list(self.load().keys())
+
+    def has_category(self, category):
+        return category in self.load()
+
+    def find_category(self, category):
+        """Case-insensitive lookup of an existing category name"""
+        expenses = self.load()
+        with self._lock:
+            if self._category_index is None:
+                self._category_index = {}
+                for existing_category in expenses:
+                    self._category_index.setdefault(normalize_name(existing_category),
+                                                    existing_category)
+            return self._category_index.get(normalize_name(category))
+
+    def entries(self, category):
+        return self.load().get(category, [])
+
+    def locate(self, entry_id):
+        """``(category, 0-based index)`` of the entry with ``entry_id``, or None"""
+        self.load()
+        with self._lock:
+            hit = self._ids.get(entry_id)
+            if hit is None:
+                return None
+            return hit[0], self._positions[entry_id]
+
+    def get_by_id(self, entry_id):
+        """``(category, entry)`` for ``entry_id``, or None"""
+        self.load()
+        hit = self._ids.get(entry_id)
+        return (hit[0], dict(hit[1])) if hit else None
+
+    def entries_on(self, date):
+        """Returns ``{category: [entries]}`` for entries logged on ``date``"""
+        return self.entries_between(date, date)
+
+    def entries_between(self, start_date=None, end_date=None, categories=None,
+                        min_amount=None, max_amount=None):
+        """Returns ``{category: [entries]}`` dated within [start_date, end_date]
+
+        Dates are inclusive YYYY-MM-DD strings and either end may be left
+        open. Each category is searched with bisect on its date index, so the
+        cost is O(log N + k) per category.
+        """
+        self.load()
+        if categories is None:
+            categories = self._date_index.keys()
+
+        filtered = {}
+        for category in categories:
+            if category not in self._date_index:
+                continue
+            dates, entries = self._date_index[category]
+            lo = bisect.bisect_left(dates, start_date) if start_date else 0
+            hi = bisect.bisect_right(dates, end_date) if end_date else len(dates)
+            matching_entries = entries[lo:hi]
+
+            if min_amount is not None or max_amount is not None:
+                matching_entries = [
+                    entry for entry in matching_entries
+                    if (min_amount is None or _amount(entry) >= min_amount)
+                    and (max_amount is None or _amount(entry) <= max_amount)]
+            if matching_entries:
+                filtered[category] = matching_entries
+        return filtered
+
+    def iter_entries(self, start_date=None, end_date=None, categories=None):
+        """Yields ``(category, entry)`` within [start_date, end_date] in date order
+
+        Streams a k-way merge of the per-category date indexes, so callers
+        can walk the ledger without building a ``{category: [entries]}``.
+        """
+        self.load()
+        if categories is None:
+            categories = list(self._date_index.keys())
+
+        streams = []
+        for category in categories:
+            if category not in self._date_index:
+                continue
+            dates, entries = self._date_index[category]
+            lo = bisect.bisect_left(dates, start_date) if start_date else 0
+            hi = bisect.bisect_right(dates, end_date) if end_date else len(dates)
+            if lo < hi:
+                # Slice now so later writes cannot shift what we yield
+                streams.append(zip(dates[lo:hi], repeat(category), entries[lo:hi]))
+
+        for _, category, entry in heapq.merge(*streams, key=lambda item: item[0]):
+            yield category, entry
+
+    def category_total(self, category):
+        self.load()
+        return self._category_totals.get(category, 0.0)
+
+    def month_total(self, year_month, category=None):
+        """Total spent in ``year_month`` (YYYY-MM), optionally for one category"""
+        self.load()
+        if category is not None:
+            return self._month_totals.get((category, year_month), 0.0)
+        return sum(total for (_, month), total in self._month_totals.items()
+                   if month == year_month)
+
+    def grand_total(self):
+        self.load()
+        return self._grand_total
+
+    def status(self):
+        """Entry count, category count, total spent and latest entry date"""
+        columns = self.columns()
+        return {
+            "total_entries": len(columns),
+            "total_categories": len(self.load()),
+            "total_amount_spent": self._grand_total,
+            "last_entry_date": columns.last_date()
+            }
+
+    def rollup(self, granularity="month", start=None, end=None, categories=None):
+        """Materialized ``{bucket: {category: {sum, count, min, max}}}``
+
+        ``granularity`` is "day" or "month" and ``start``/``end`` are
+        inclusive keys of that granularity. Archived months are included.
+        """
+        if granularity not in ("day", "month"):
+            raise ValueError(f"Cannot roll up by '{granularity}'")
+        with read_lock(self.expense_file), self._lock:
+            self.load()
+            return self._rollups.query(granularity, start, end, categories)
+
+    def columns(self):
+        """Columnar copy of the ledger for vectorised aggregation
+
+        Built on first use and kept current by every write after that. Only
+        archiving, which rewrites the whole ledger anyway, and deleting a
+        category drop it, to be rebuilt on the next call.
+        """
+        expenses = self.load()
+        with self._lock:
+            if self._columns is None:
+                self._columns = ColumnarLedger.from_expenses(expenses)
+            return self._columns
+
+    def aggregate(self, by="category"):
+        """Totals grouped by category, day or month"""
+        columns = self.columns()
+        if by == "category":
+            return columns.totals_by_category()
+        if by == "day":
+            return columns.totals_by_day()
+        if by == "month":
+            return columns.totals_by_month()
+        raise ValueError(f"Cannot aggregate by '{by}'")
+
+    # ---------- Writes ----------
+
+    def add(self, category, entry):
+        """Logs ``entry``, giving it a fresh ``id`` unless it already has one"""
+        with self._writing():
+            self.load()
+            self._assign_id(entry)
+            self._commit({"op": "add", "category": category, "entry": entry})
+        return entry
+
+    def add_many(self, items):
+        """Logs ``(category, entry)`` pairs as one journal record
+
+        The whole batch is a single append and fsync, and since a torn
+        record is ignored on replay it lands either completely or not at all.
+        """
+        items = [[category, entry] for category, entry in items]
+        if not items:
+            return []
+        with self._writing():
+            self.load()
+            for _, entry in items:
+                self._assign_id(entry)
+            self._commit({"op": "add_many", "items": items})
+        return [entry for _, entry in items]
+
+    def _assign_id(self, entry):
+        if "id" not in entry:
+            entry_id = new_entry_id()
+            while entry_id in self._ids:
+                entry_id = new_entry_id()
+            entry["id"] = entry_id
+
+    def update(self, category, index, field, value):
+        """Sets ``field`` on the entry at 0-based ``index`` in ``category``"""
+        return self._commit({"op": "update", "category": category,
+                             "index": index, "field": field, "value": value})
+
+    def move(self, category, index, new_category):
+        """Moves the entry at 0-based ``index`` to ``new_category``"""
+        return self._commit({"op": "move", "category": category,
+                             "index": index, "new_category": new_category})
+
+    def remove(self, category, index):
+        return self._commit({"op": "remove", "category": category, "index": index})
+
+    # ID-addressed writes journal the ID rather than a position, and take
+    # the entry out of its list by swapping the last one into its slot, so
+    # none of them depends on the size of the category.
+
+    def update_by_id(self, entry_id, field, value):
+        return self._commit_by_id({"op": "update", "id": entry_id,
+                                   "field": field, "value": value})
+
+    def move_by_id(self, entry_id, new_category):
+        return self._commit_by_id({"op": "move", "id": entry_id, "new_category": new_category})
+
+    def remove_by_id(self, entry_id):
+        return self._commit_by_id({"op": "remove", "id": entry_id})
+
+    def _commit_by_id(self, record):
+        """Commits ``record`` if its entry still exists, else returns None"""
+        with self._writing():
+            self.load()
+            hit = self._ids.get(record["id"])
+            if hit is None:
+                return None
+            record["category"] = hit[0]
+            return self._commit(record)
+
+    def clear_category(self, category):
+        self._commit({"op": "clear", "category": category})
+
+    def delete_category(self, category):
+        self._commit({"op": "delete_category", "category": category})
+
+    # ---------- Running Totals ----------
+
+    def _count(self, category, entry, sign=1):
+        """Adds (sign=1) or removes (sign=-1) one entry from the running totals"""
+        amount = sign * _amount(entry)
+        month_key = (category, (entry.get("date") or "")[:7])
+        self._category_totals[category] = self._category_totals.get(category, 0.0) + amount
+        self._month_totals[month_key] = self._month_totals.get(month_key, 0.0) + amount
+        self._grand_total += amount
+
+    def _track(self, category, entry):
+        self._count(category, entry)
+        self._index_add(category, entry)
+        self._rollups.add(category, entry)
+        if self._columns is not None:
+            self._columns.append(category, entry)
+        if "id" in entry:
+            self._ids[entry["id"]] = (category, entry)
+
+    def _untrack(self, category, entry):
+        self._count(category, entry, -1)
+        self._ids.pop(entry.get("id"), None)
+        if self._columns is not None:
+            self._columns.remove(entry.get("id"))
+        # Out of the index first so the rollup rescan no longer sees it
+        self._index_remove(category, entry)
+        self._rollups.remove(category, entry, self._bucket_amounts)
+
+    def _bucket_amounts(self, day, category):
+        """Amounts still logged for ``day`` in ``category``, archives included"""
+        live = self.entries_between(day, day, [category]).get(category, [])
+        archived = self._archives().entries_between(day, day, [category]).get(category, [])
+        return [_amount(entry) for entry in live + archived]
+
+    def _compute_totals(self):
+        category_totals = {}
+        month_totals = {}
+        grand_total = 0.0
+        for category, entries in self._expenses.items():
+            category_totals[category] = 0.0
+            for entry in entries:
+                amount = _amount(entry)
+                month_key = (category, (entry.get("date") or "")[:7])
+                category_totals[category] += amount
+                month_totals[month_key] = month_totals.get(month_key, 0.0) + amount
+                grand_total += amount
+        return category_totals, month_totals, grand_total
+
+    def _rebuild_totals(self):
+        (self._category_totals,
+         self._month_totals,
+         self._grand_total) = self._compute_totals()
+
+    # ---------- Category Lists ----------
+
+    def _append_entry(self, category, entry):
+        entries = self._expenses.setdefault(category, [])
+        if "id" in entry:
+            self._positions[entry["id"]] = len(entries)
+        entries.append(entry)
+
+    def _pop_entry(self, category, index):
+        """Removes the entry at ``index``; later entries keep their order"""
+        entries = self._expenses[category]
+        entry = entries.pop(index)
+        self._positions.pop(entry.get("id"), None)
+        for position in range(index, len(entries)):
+            if "id" in entries[position]:
+                self._positions[entries[position]["id"]] = position
+        return entry
+
+    def _swap_remove(self, entry_id):
+        """Removes the entry with ``entry_id`` in O(1); returns ``(category, entry)``
+
+        The category's last entry takes over the freed slot.
+        """
+        category, entry = self._ids[entry_id]
+        entries = self._expenses[category]
+        position = self._positions.pop(entry_id)
+        last = entries.pop()
+        if last is not entry:
+            entries[position] = last
+            self._positions[last["id"]] = position
+        return category, entry
+
+    # ---------- Date Index ----------
+
+    def _rebuild_date_index(self):
+        """Sorts every category by date; ties keep their insertion order
+
+        Also rebuilds the ``id -> (category, entry)`` and ``id -> position``
+        indexes.
+        """
+        self._date_index = {}
+        self._ids = {}
+        self._positions = {}
+        for category, entries in self._expenses.items():
+            for position, entry in enumerate(entries):
+                if "id" in entry:
+                    self._ids[entry["id"]] = (category, entry)
+                    self._positions[entry["id"]] = position
+        for category, entries in self._expenses.items():
+            ordered = sorted(entries, key=lambda entry: entry.get("date") or "")
+            self._date_index[category] = ([entry.get("date") or "" for entry in ordered],
+                                          ordered)
+
+    def _index_add(self, category, entry):
+        dates, entries = self._date_index.setdefault(category, ([], []))
+        date = entry.get("date") or ""
+        position = bisect.bisect_right(dates, date)
+        dates.insert(position, date)
+        entries.insert(position, entry)
+
+    def _index_remove(self, category, entry):
+        dates, entries = self._date_index[category]
+        date = entry.get("date") or ""
+        for position in range(bisect.bisect_left(dates, date),
+                              bisect.bisect_right(dates, date)):
+            if entries[position] is entry:
+                del dates[position]
+                del entries[position]
+                return
+
+    def check_totals(self, repair=False):
+        """Rebuilds the totals from scratch and reports any drift
+
+        With ``repair=True`` the running totals are replaced by the rebuilt
+        ones afterwards.
+        """
+        with read_lock(self.expense_file), self._lock:
+            self.load()
+            category_totals, month_totals, grand_total = self._compute_totals()
+            drift = {"categories": {}, "months": {}, "grand_total": None}
+
+            for category in set(category_totals) | set(self._category_totals):
+                expected = category_totals.get(category, 0.0)
+                running = self._category_totals.get(category, 0.0)
+                if abs(expected - running) > TOTALS_TOLERANCE:
+                    drift["categories"][category] = {"running": running, "expected": expected}
+
+            for month_key in set(month_totals) | set(self._month_totals):
+                expected = month_totals.get(month_key, 0.0)
+                running = self._month_totals.get(month_key, 0.0)
+                if abs(expected - running) > TOTALS_TOLERANCE:
+                    drift["months"]["/".join(month_key)] = {"running": running,
+                                                            "expected": expected}
+
+            if abs(grand_total - self._grand_total) > TOTALS_TOLERANCE:
+                drift["grand_total"] = {"running": self._grand_total, "expected": grand_total}
+
+            consistent = not (drift["categories"] or drift["months"] or drift["grand_total"])
+            if repair and not consistent:
+                self._category_totals = category_totals
+                self._month_totals = month_totals
+                self._grand_total = grand_total
+
+        return {"consistent": consistent, "repaired": repair and not consistent, "drift": drift}
+
+    # ---------- Monthly Archival ----------
+
+    def archive_before(self, current_month, archive_dir=None):
+        """Moves entries from months other than ``current_month`` to archives
+
+        The ledger is partitioned in one pass by slicing YYYY-MM off each
+        date. Each month is merged into its existing archive, skipping
+        entries that are already there, so re-running after a crash never
+        duplicates or drops data. Archives are written atomically, and
+        months with nothing new are not rewritten.
+
+        Dropping the archived entries from the ledger is itself a journal
+        record, so other processes sharing the ledger replay the same cut.
+
+        Returns the archived months and the archive files written.
+        """
+        with write_lock(self.expense_file):
+            _, monthly_archives = self._partition(self.load(), current_month)
+            if not monthly_archives:
+                return {"archived_months": [], "archived_files": []}
+
+            engine = (self._archives() if archive_dir in (None, self.archive_dir)
+                      else ArchiveQueryEngine(archive_dir))
+            archived_files = []
+
+            for year_month in sorted(monthly_archives):
+                archive = {category: list(entries)
+                           for category, entries in engine.load(year_month).items()}
+                if not self._merge_into_archive(archive, monthly_archives[year_month]):
+                    continue
+
+                archived_files.append(engine.write_archive(year_month, archive))
+
+            self._commit({"op": "archive", "current_month": current_month})
+        self._sync_unsynced()
+
+        # Fold the now much smaller ledger into a fresh snapshot
+        self.compact(background=False)
+        return {
+            "archived_months": sorted(monthly_archives),
+            "archived_files": archived_files
+            }
+
+    @staticmethod
+    def _partition(expenses, current_month):
+        """Splits the ledger into ``(retained, {YYYY-MM: {category: [entries]}})``"""
+        monthly_archives = {}
+        retained = {}
+        for category, entries in expenses.items():
+            current_month_entries = []
+            for entry in entries:
+                date = entry.get("date") or ""
+                year_month = date[:7]
+                # Undated or malformed entries stay in the live ledger
+                if year_month == current_month or len(year_month) != 7 or year_month[4] != "-":
+                    current_month_entries.append(entry)
+                else:
+                    monthly_archives.setdefault(year_month, {}).setdefault(category, []).append(entry)
+            retained[category] = current_month_entries
+        return retained, monthly_archives
+
+    @staticmethod
+    def _merge_into_archive(archive, incoming):
+        """Adds ``incoming`` entries not already in ``archive``; True if any were"""
+        changed = False
+        for category, entries in incoming.items():
+            existing = archive.setdefault(category, [])
+            # Entries are matched by ID, so an identical expense logged
+            # again later is kept. Archived entries without an ID (written
+            # before IDs existed) fall back to a content multiset, so a
+            # replay of them is still skipped while genuine repeats survive.
+            ids = set()
+            legacy = {}
+            for entry in existing:
+                if entry.get("id"):
+                    ids.add(entry["id"])
+                else:
+                    key = _archive_key(entry)
+                    legacy[key] = legacy.get(key, 0) + 1
+            for entry in entries:
+                entry_id = entry.get("id")
+                if entry_id and entry_id in ids:
+                    continue
+                key = _archive_key(entry)
+                if legacy.get(key):
+                    legacy[key] -= 1
+                    continue
+                existing.append(entry)
+                if entry_id:
+                    ids.add(entry_id)
+                changed = True
+        return changed
+
+    def _archives(self):
+        """Archive engine for ``archive_dir`` (the shared one for the default)"""
+        if self.archive_dir == ARCHIVE_DIR:
+            return get_archive_engine()
+        if self._archive_engine is None:
+            self._archive_engine = ArchiveQueryEngine(self.archive_dir)
+        return self._archive_engine
+
+    def archived_entries_between(self, start_date=None, end_date=None, categories=None,
+                                 min_amount=None, max_amount=None):
+        """Like ``entries_between`` but over the monthly archive files"""
+        return self._archives().entries_between(start_date, end_date, categories,
+                                                    min_amount, max_amount)
+
+    def iter_archived_entries(self, start_date=None, end_date=None, categories=None):
+        """Like ``iter_entries`` but over the monthly archive files"""
+        return self._archives().iter_entries(start_date, end_date, categories)
+
+    def archive_status(self):
+        """Entry count, total, categories and last date across all archives"""
+        return self._archives().status()
+
+    def has_archives(self):
+        """True if any month has been archived (a directory listing, no parsing)"""
+        return bool(self._archives().months())
+
+    # ---------- Budgets and Categories ----------
+
+    # Both files are cached in memory and only re-read when they change
+
+    def load_budgets(self):
+        """Returns the budgets dict, or None if no budgets were ever set"""
+        return self._budgets.get()
+
+    def save_budgets(self, budgets):
+        self._budgets.save(budgets)
+
+    def load_categories(self):
+        """Returns the category registry, or None if it is missing"""
+        return self._registry.get()
+
+    def save_categories(self, categories):
+        self._registry.save(categories)
+
+    def resolve_category(self, category):
+        """Registered spelling of ``category`` regardless of case, or None"""
+        return self._registry.find(category)
+
+    # ---------- Journal ----------
+
+    def _apply_record(self, record):
+        """Applies one journal record to the in-memory ledger"""
+        expenses = self._expenses
+        op = record["op"]
+        category = record.get("category")
+
+        if category not in expenses or op == "delete_category" or op == "move":
+            self._category_index = None
+
+        if op == "add":
+            if "id" not in record["entry"]:
+                # Added by a version that did not assign IDs yet
+                record["entry"]["id"] = _legacy_entry_id("journal", record.get("seq"))
+            self._append_entry(category, record["entry"])
+            self._track(category, record["entry"])
+            return record["entry"]
+        if op == "add_many":
+            for item_category, entry in record["items"]:
+                self._append_entry(item_category, entry)
+                self._track(item_category, entry)
+            return None
+        if op == "update":
+            if "id" in record:
+                category, entry = self._ids[record["id"]]
+            else:
+                entry = expenses[category][record["index"]]
+            self._untrack(category, entry)
+            entry[record["field"]] = record["value"]
+            self._track(category, entry)
+            return entry
+        if op == "move":
+            if "id" in record:
+                category, moved_entry = self._swap_remove(record["id"])
+            else:
+                moved_entry = self._pop_entry(category, record["index"])
+            self._append_entry(record["new_category"], moved_entry)
+            self._untrack(category, moved_entry)
+            self._track(record["new_category"], moved_entry)
+            return moved_entry
+        if op == "remove":
+            if "id" in record:
+                category, deleted_entry = self._swap_remove(record["id"])
+            else:
+                deleted_entry = self._pop_entry(category, record["index"])
+            self._untrack(category, deleted_entry)
+            return deleted_entry
+        if op == "clear":
+            cleared_entries = expenses[category]
+            expenses[category] = []
+            self._date_index[category] = ([], [])
+            for entry in cleared_entries:
+                self._count(category, entry, -1)
+                self._ids.pop(entry.get("id"), None)
+                self._positions.pop(entry.get("id"), None)
+                if self._columns is not None:
+                    self._columns.remove(entry.get("id"))
+                self._rollups.remove(category, entry, self._bucket_amounts)
+            return None
+        if op == "delete_category":
+            self._date_index.pop(category, None)
+            # Rare; rebuilt on next use so the name leaves the columns too
+            self._columns = None
+            for entry in expenses.pop(category):
+                self._count(category, entry, -1)
+                self._ids.pop(entry.get("id"), None)
+                self._positions.pop(entry.get("id"), None)
+                self._rollups.remove(category, entry, self._bucket_amounts)
+            self._category_totals.pop(category, None)
+            return None
+        if op == "archive":
+            # The rollups keep these entries: archiving is not deletion
+            self._expenses, _ = self._partition(expenses, record["current_month"])
+            self._rebuild_totals()
+            self._rebuild_date_index()
+            self._columns = None
+            return None
+        raise ValueError(f"Unknown journal operation '{op}'")
+
+    def _commit(self, record):
+        """The single write path: apply in memory, then append to the journal"""
+        if self.read_only:
+            raise RuntimeError(f"'{self.expense_file}' was opened read-only")
+        with write_lock(self.expense_file), self._lock:
+            # Catches up with any other process before claiming the next seq
+            self.load()
+            result = self._apply_record(record)
+            self._seq += 1
+            record["seq"] = self._seq
+            ticket = self._append(record)
+            self._journal_records += 1
+            self._exists = True
+
+        # Wait for durability outside the locks, so writers arriving
+        # meanwhile append too and share the next fsync
+        if ticket is not None:
+            self._unsynced.ticket = ticket
+            if not holds_lock(self.expense_file):
+                self._sync_unsynced()
+        if self._journal_records >= self.compact_every:
+            self.compact()
+        return result
+
+    def _append(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        if self._journal_torn:
+            # Never glue a record onto the torn one
+            line = b"\n" + line
+            self._journal_torn = False
+        ticket = self._journal.write(line)
+        signature = self._read_signature()
+        self._journal_signature = (signature[0], self._journal_signature[1] + len(line)
+                                   if self._journal_signature else signature[1])
+        return ticket
+
+    @contextmanager
+    def _writing(self):
+        """Write locks for a mutation made of several steps
+
+        The journal fsync is waited for only after the locks are released.
+        """
+        try:
+            with write_lock(self.expense_file), self._lock:
+                yield
+        finally:
+            if not holds_lock(self.expense_file):
+                self._sync_unsynced()
+
+    def _sync_unsynced(self):
+        ticket = getattr(self._unsynced, "ticket", None)
+        if ticket is not None:
+            self._unsynced.ticket = None
+            self._journal.sync(ticket)
+
+    @contextmanager
+    def batch(self):
+        """Group commit: writes inside the block share one journal fsync"""
+        with self._journal.deferred():
+            yield self
+
+    # ---------- Compaction ----------
+
+    def compact(self, background=True):
+        """Folds the journal into a fresh snapshot of expenses.json"""
+        if self.read_only:
+            return
+        if background:
+            with self._lock:
+                if self._compactor and self._compactor.is_alive():
+                    return
+                self._compactor = threading.Thread(target=self._compact,
+                                                   name="expense-compactor",
+                                                   daemon=True)
+                self._compactor.start()
+        else:
+            self.wait_for_compaction()
+            self._compact()
+
+    def wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor and compactor.is_alive():
+            compactor.join()
+
+    def _compact(self):
+        # Only one process compacts at a time; the checkpoint lock guards it
+        with write_lock(self.checkpoint_file):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        # Serialise under the lock so the snapshot matches an exact seq, then
+        # do the slow disk work without blocking further writes.
+        with write_lock(self.expense_file), self._lock:
+            snapshot = json.dumps(self.load(), indent=4, ensure_ascii=False).encode("utf-8")
+            seq = self._seq
+            journal_offset = self._journal_signature[1] if self._journal_signature else 0
+            digest = hashlib.sha256(snapshot).hexdigest()
+            rollups = self._rollups.to_json({"seq": seq, "sha256": digest}).encode("utf-8")
+        previous = None
+        if os.path.exists(self.expense_file):
+            with open(self.expense_file, "rb") as file:
+                previous_digest = hashlib.sha256(file.read()).hexdigest()
+            previous = {"seq": self._checkpoint_seq(previous_digest),
+                        "sha256": previous_digest}
+
+        # Rollups first: if we crash before the snapshot is swapped in their
+        # stamp will not match and they are rebuilt on the next load.
+        write_atomic(self.rollups_file, rollups)
+        write_atomic(self.checkpoint_file, json.dumps(
+            {"current": {"seq": seq, "sha256": digest}, "previous": previous}))
+        write_atomic(self.expense_file, snapshot)
+
+        # Keep only the records appended while the snapshot was being written
+        with write_lock(self.expense_file), self._lock:
+            self.load()
+            consumed = self._journal_signature[1] if self._journal_signature else 0
+            tail = b""
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, "rb") as file:
+                    file.seek(journal_offset)
+                    tail = file.read()
+            write_atomic(self.journal_file, tail)
+            self._journal_torn = bool(tail) and not tail.endswith(b"\n")
+            self._journal_records = tail.count(b"\n")
+            signature = self._read_signature()
+            self._journal_signature = (signature[0], consumed - journal_offset)
+            self._exists = True
+
+
+# Which backend get_store() hands out: "json" (default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("SOLIN_STORAGE_BACKEND", "json").lower()
+
+_store = None
+
+
+def get_store():
+    """Returns the process-wide expense store, creating it on first use"""
+    global _store
+    if _store is None:
+        if STORAGE_BACKEND == "sqlite":
+            from tools.sqlite_store import SQLiteExpenseStore
+            _store = SQLiteExpenseStore()
+        else:
+            _store = ExpenseStore()
+    return _store
@@ -1,8 +1,10 @@
-import os
-import json
 from datetime import datetime
 from typing import Optional
 
+from memory.category_memo import remember_category
+from tools.archive_query import ARCHIVE_FORMATS, get_archive_engine
+from tools.expense_store import get_store
+
 
 
 
@@ -10,27 +12,30 @@ from typing import Optional
 # Expense Management
 # ----------------------------------------
 
+def _merge_expenses(live, archived):
+    """Combines live and archived ``{category: [entries]}`` results"""
+    merged={category: list(entries) for category, entries in archived.items()}
+    for category, entries in live.items():
+        merged.setdefault(category, []).extend(entries)
+    return merged
+
+def _nothing_logged(store, include_archives=True):
+    """True when neither the live ledger nor (optionally) the archives hold anything
+
+    A fresh checkout or a just-reset ledger may have no live expenses.json
+    while past months are still queryable from their archives.
+    """
+    return not store.exists() and not (include_archives and store.has_archives())
+
 def add_expenses(category, amount, description, date=None, time=None):
     """Adds daily expenses to an expense tracker file"""
     
-    expense_file="memory/expenses.json"
-    budgets_file="memory/budgets.json"
-    
-    if not os.path.exists(expense_file):
-        with open(expense_file, "w") as file:
-            json.dump({}, file, indent=4, ensure_ascii=False)
-            expenses={}
-    else:
-        with open(expense_file,"r") as file:
-            expenses=json.load(file)
+    store=get_store()
             
     if not date:
         date=datetime.now().strftime("%Y-%m-%d")
     if not time:
         time=datetime.now().strftime("%H:%M")
-    
-    if category not in expenses:
-        expenses[category]=[]
         
     expense={
         "amount": amount,
@@ -39,32 +44,19 @@ def add_expenses(category, amount, description, date=None, time=None):
         "time": time
     }
     
-    expenses[category].append(expense)
+    store.add(category, expense)
         
-    with open(expense_file, "w") as file:
-        json.dump(expenses, file, indent=4, ensure_ascii=False)
-        
-    if os.path.exists(budgets_file):
-        with open(budgets_file, "r") as file:
-            budgets=json.load(file)
-    else:
-        budgets={}
+    budgets=store.load_budgets() or {}
     
-    categorical_expenditure=0
-    tot_expenditure=0
-    
-    for items in expenses[category]:
-        categorical_expenditure+=items.get("amount", 0)
-    
-    for entries in expenses.values():
-        for entry in entries:
-            tot_expenditure+=entry.get("amount", 0)
+    categorical_expenditure=store.category_total(category)
+    tot_expenditure=store.grand_total()
         
     budget_limit=budgets.get(category, 0)
     
     #print("[DEBUG] Successfully prepared result for return")
     
     return {
+        "id": expense["id"],
         "category": category,
         "amount": amount,
         "description": description,
@@ -83,29 +75,27 @@ def add_expenses(category, amount, description, date=None, time=None):
 def view_expenses(date: Optional[str]=None,
                   all: bool = False,
                   category: Optional[str]=None,
-                  mode: str = "view"):
+                  mode: str = "view",
+                  include_archives: bool = True):
     
     """Displays the logged expenses in the expense tracker"""
     
     print(f"🧪 Received: date={date}, all={all}")
     
-    expenses_file="memory/expenses.json"
+    store=get_store()
     
-    if not os.path.exists(expenses_file):
+    if _nothing_logged(store, include_archives):
         return {
             "expenses": {},
             "total_expense": 0.0,
             "date": date or datetime.now().strftime("%Y-%m-%d")
             }
     
-    with open(expenses_file, "r", encoding="utf-8") as file:
-        expenses=json.load(file)
-        
     if mode=="preview" and category:
-        if category not in expenses:
+        if not store.has_category(category):
             return {"success": False, "error": f"Category '{category}' not found."}
         
-        entries=expenses[category]
+        entries=store.entries(category)
         
         # Optional date filter
         if date:
@@ -114,6 +104,7 @@ def view_expenses(date: Optional[str]=None,
         preview_list=[
             {
                 "index": idx+1,
+                "id": e.get("id"),
                 "amount": e.get("amount"),
                 "description": e.get("description"),
                 "date": e.get("date"),
@@ -138,9 +129,15 @@ def view_expenses(date: Optional[str]=None,
     
     if all:
        
-        for category, entries in expenses.items():
-            filtered[category]=entries
-            total+=sum(e.get("amount", 0) for e in entries)
+        for category, entries in store.expenses.items():
+            filtered[category]=list(entries)
+        total=store.grand_total()
+        if include_archives:
+            archived=store.archived_entries_between()
+            filtered=_merge_expenses(filtered, archived)
+            for entries in archived.values():
+                for entry in entries:
+                    total+=entry.get("amount", 0)
         return {
             "status": "success",
             "expenses": filtered,
@@ -148,12 +145,12 @@ def view_expenses(date: Optional[str]=None,
             "date": "ALL"
             }
        
-    for category, entries in expenses.items():
-        matching_entries=[entry for entry in entries if entry.get("date")==date]
-        if matching_entries:
-            filtered[category]=matching_entries
-            for entry in matching_entries:
-                 total+=entry.get("amount", 0)
+    filtered=store.entries_on(date)
+    if include_archives:
+        filtered=_merge_expenses(filtered, store.archived_entries_between(date, date))
+    for entries in filtered.values():
+        for entry in entries:
+             total+=entry.get("amount", 0)
     return {
          "success": "success",
          "date": date,
@@ -161,21 +158,56 @@ def view_expenses(date: Optional[str]=None,
          "total_expense": round(total, 2)
          }
                 
+def query_expenses(start_date: Optional[str]=None,
+                   end_date: Optional[str]=None,
+                   categories: Optional[list]=None,
+                   min_amount: Optional[float]=None,
+                   max_amount: Optional[float]=None,
+                   include_archives: bool = True):
+    """Returns the logged expenses within a date range, category set and amount bounds"""
+    store=get_store()
+    
+    if _nothing_logged(store, include_archives):
+        return {
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "expenses": {},
+            "total_expense": 0.0,
+            "count": 0
+            }
+    
+    if isinstance(categories, str):
+        categories=[categories]
+    
+    filtered=store.entries_between(start_date, end_date, categories, min_amount, max_amount)
+    if include_archives:
+        filtered=_merge_expenses(filtered, store.archived_entries_between(
+            start_date, end_date, categories, min_amount, max_amount))
+    
+    total=0.0
+    count=0
+    for entries in filtered.values():
+        count+=len(entries)
+        total+=sum(e.get("amount", 0) for e in entries)
+        
+    return {
+        "success": True,
+        "start_date": start_date,
+        "end_date": end_date,
+        "expenses": filtered,
+        "total_expense": round(total, 2),
+        "count": count
+        }
+                
 def edit_expense(category, entry_choice, field_choice, new_value):
     """Lets the user edit his logged expenses"""
-    expense_file="memory/expenses.json"
+    store=get_store()
     
-    if not os.path.exists(expense_file):
+    if _nothing_logged(store):
         return {"success": False, "error": "No expenses logged yet."}
-    
-    with open(expense_file, "r") as file:
-        expenses=json.load(file)
         
-    matched_category=None
-    for existing_category in expenses:
-        if existing_category.lower()==category.lower():
-            matched_category=existing_category
-            break
+    matched_category=store.find_category(category)
     
     if not matched_category:
         print(f"Cannot proceed: Category '{category}' not found.")
@@ -183,40 +215,32 @@ def edit_expense(category, entry_choice, field_choice, new_value):
     
     category=matched_category
     
-    if entry_choice<1 or entry_choice>len(expenses[category]):
+    if entry_choice<1 or entry_choice>len(store.entries(category)):
         return {"success": False, "error": "Invalid entry choice"}
     
     valid_fields=["amount", "description", "date", "time", "category"]
     if field_choice not in valid_fields:
         return {"success": False, "error": "Invalid field choice"}
-        
-    entry = expenses[category][entry_choice-1]
     
     if field_choice == "amount":
         try:
             new_value = float(new_value)
         except ValueError:
             return {"success": False, "error": "Invalid amount entered."}
-        entry["amount"]=new_value
+        store.update(category, entry_choice-1, "amount", new_value)
         
     elif field_choice == "category":
         new_category = new_value.strip()
-        # Remove entry from current category
-        moved_entry = expenses[category].pop(entry_choice-1)
-        
-        # Add entry to new category
-        if new_category not in expenses:
-            expenses[new_category] = []
-        expenses[new_category].append(moved_entry)
+        description = store.entries(category)[entry_choice-1].get("description")
+        # Move entry from current category to the new one
+        store.move(category, entry_choice-1, new_category)
+        remember_category(description, new_category, category)
         
     else:
-        entry[field_choice]=new_value
+        store.update(category, entry_choice-1, field_choice, new_value)
         
     # If old category becomes empty, optionally keep or clean it (your choice)
     # Example: if not expenses[category]: del expenses[category]
-    
-    with open(expense_file, "w") as file:
-        json.dump(expenses, file, indent=4)
         
     return {
         "success": True,
@@ -226,30 +250,66 @@ def edit_expense(category, entry_choice, field_choice, new_value):
         "new_value": new_value
         }
     
+def edit_expense_by_id(entry_id, field_choice, new_value):
+    """Edits one logged expense addressed by its stable ID"""
+    store=get_store()
+    
+    if _nothing_logged(store):
+        return {"success": False, "error": "No expenses logged yet."}
+    
+    valid_fields=["amount", "description", "date", "time", "category"]
+    if field_choice not in valid_fields:
+        return {"success": False, "error": "Invalid field choice"}
+    
+    if field_choice == "amount":
+        try:
+            new_value = float(new_value)
+        except ValueError:
+            return {"success": False, "error": "Invalid amount entered."}
+    
+    # One hash lookup; no preview of the category is needed
+    located=store.get_by_id(entry_id)
+    if located is None:
+        return {"success": False, "error": f"No expense with ID '{entry_id}'."}
+    category=located[0]
+        
+    if field_choice == "category":
+        entry=store.move_by_id(entry_id, new_value.strip())
+        if entry is not None:
+            remember_category(located[1].get("description"), new_value.strip(), category)
+    else:
+        entry=store.update_by_id(entry_id, field_choice, new_value)
+        
+    if entry is None:
+        return {"success": False, "error": f"No expense with ID '{entry_id}'."}
+    
+    return {
+        "success": True,
+        "id": entry_id,
+        "category": category,
+        "field_choice": field_choice,
+        "new_value": new_value,
+        "entry": entry
+        }
+    
 def delete_expense(cat_choice, entry_choice, confirm=False):
     """Deletes a specific expense entry"""
-    expense_file="memory/expenses.json"
+    store=get_store()
     
-    if not os.path.exists(expense_file):
+    if _nothing_logged(store):
         return {"success": False, "error": "No expenses logged yet."}
     
-    with open(expense_file, "r") as file:
-        expenses=json.load(file)
-    
-    if cat_choice not in expenses:
+    if not store.has_category(cat_choice):
         return {"success": False, "error": f"Category '{cat_choice}' not found."}
     print(f"Sir, here are the logged expenses under '{cat_choice}':")
     
-    if entry_choice < 1 or entry_choice > len(expenses[cat_choice]):
+    if entry_choice < 1 or entry_choice > len(store.entries(cat_choice)):
         return {"success": False, "error": "Invalid entry index."}
     
     if not confirm:
         return {"success": False, "confirmation_required": True}
         
-    deleted_entry=expenses[cat_choice].pop(entry_choice-1)
-    
-    with open(expense_file, "w") as file:
-        json.dump(expenses, file, indent=4)
+    deleted_entry=store.remove(cat_choice, entry_choice-1)
         
     return {
          "success": True,
@@ -258,34 +318,53 @@ def delete_expense(cat_choice, entry_choice, confirm=False):
          "entry_choice": entry_choice
         }
     
+def delete_expense_by_id(entry_id, confirm=False):
+    """Deletes one logged expense addressed by its stable ID"""
+    store=get_store()
+    
+    if _nothing_logged(store):
+        return {"success": False, "error": "No expenses logged yet."}
+    
+    located=store.get_by_id(entry_id)
+    if located is None:
+        return {"success": False, "error": f"No expense with ID '{entry_id}'."}
+    
+    if not confirm:
+        return {"success": False, "confirmation_required": True, "entry": located[1]}
+    
+    deleted_entry=store.remove_by_id(entry_id)
+    if deleted_entry is None:
+        return {"success": False, "error": f"No expense with ID '{entry_id}'."}
+    
+    return {
+        "success": True,
+        "deleted_entry": deleted_entry,
+        "cat_choice": located[0],
+        "id": entry_id
+        }
+    
 def manage_category_deletion(cat_choice, action):
     """Manages the deletion of a category from the expense tracker"""
     
-    expense_file="memory/expenses.json"
+    store=get_store()
     
-    if not os.path.exists(expense_file):
+    if _nothing_logged(store):
         return {"success": False, "error": "No expenses logged yet."}
-    
-    with open(expense_file, "r") as file:
-        expenses=json.load(file)
         
-    if cat_choice not in expenses:
+    if not store.has_category(cat_choice):
         return {"success": False, "error": f"Category '{cat_choice}' not found."}
     
     if action == "clear":
-        if not expenses[cat_choice]:
+        if not store.entries(cat_choice):
             return {"success": False, "error": f"Category '{cat_choice}' is already empty."}
-        expenses[cat_choice] = []
+        store.clear_category(cat_choice)
         action_taken = "cleared"
         
     elif action == "delete":
-        del expenses[cat_choice]
+        store.delete_category(cat_choice)
         action_taken = "deleted"
     else:
         return {"success": False, "error": "Invalid action. Must be 'clear' or 'delete'."}
-    
-    with open(expense_file, "w") as file:
-        json.dump(expenses, file, indent=4)
         
     return {
         "success": True,
@@ -293,35 +372,131 @@ def manage_category_deletion(cat_choice, action):
         "action": action_taken
         }
         
-def expense_status():
-    """Returns a status summary of all expense logs"""
-    expense_file = "memory/expenses.json"
+def expense_status(include_archives: bool = True):
+    """Returns a status summary of all expense logs, archives included"""
+    store=get_store()
     
-    if not os.path.exists(expense_file):
+    if _nothing_logged(store, include_archives):
         return {"success": False, "message": "No expenses found."}
     
-    with open(expense_file, "r") as file:
-        expenses=json.load(file)
+    status=store.status()
+    latest_date=status["last_entry_date"]
+    total_entries=status["total_entries"]
+    total_categories=status["total_categories"]
+    total_amount_spent=status["total_amount_spent"]
+    archived_months=0
+    archived_entries=0
+    archived_amount_spent=0.0
+    
+    if include_archives:
+        # Lifetime figures come from the monthly rollups, which already
+        # cover archived months; the archive bodies are never opened.
+        lifetime=store.rollup("month")
+        lifetime_categories=set(store.categories())
+        lifetime_entries=0
+        lifetime_amount_spent=0.0
+        for buckets in lifetime.values():
+            for cat, stats in buckets.items():
+                lifetime_categories.add(cat)
+                lifetime_entries+=stats["count"]
+                lifetime_amount_spent+=stats["sum"]
+                
+        archived=store.archive_status()
+        archived_months=len(archived["months"])
+        archived_entries=lifetime_entries-total_entries
+        archived_amount_spent=lifetime_amount_spent-total_amount_spent
+        total_entries=lifetime_entries
+        total_amount_spent=lifetime_amount_spent
+        total_categories=len(lifetime_categories)
+        if archived["last_entry_date"] and (not latest_date or archived["last_entry_date"]>latest_date):
+            latest_date=archived["last_entry_date"]
         
-    total_entries=0
-    total_categories=len(expenses)
-    total_amount_spent=0.0
-    latest_date=None
-    
-    for entries in expenses.values():
-        for entry in entries:
-            total_entries+=1
-            total_amount_spent+=entry.get("amount",0.0)
-            entry_date=entry.get("date")
-            if entry_date:
-                if not latest_date or entry_date>latest_date:
-                    latest_date=entry_date
     return {
         "success": True,
         "last_entry_date": latest_date,
         "total_entries": total_entries,
         "total_categories": total_categories,
-        "total_amount_spent": round(total_amount_spent, 2)
+        "total_amount_spent": round(total_amount_spent, 2),
+        "archived_months": archived_months,
+        "archived_entries": archived_entries,
+        "archived_amount_spent": round(archived_amount_spent, 2)
+        }
+
+def expense_breakdown(by="category"):
+    """Returns total spend grouped by category, day or month"""
+    store=get_store()
+    
+    if _nothing_logged(store):
+        return {"success": False, "message": "No expenses found."}
+    
+    if by not in ["category", "day", "month"]:
+        return {"success": False, "error": "Invalid grouping. Use 'category', 'day' or 'month'."}
+    
+    totals=store.aggregate(by)
+    
+    return {
+        "success": True,
+        "by": by,
+        "totals": {key: round(value, 2) for key, value in totals.items()}
+        }
+    
+def monthly_summary(months=24, categories=None):
+    """Returns spend per category per month over the last ``months`` months"""
+    store=get_store()
+    
+    if _nothing_logged(store):
+        return {"success": False, "message": "No expenses found."}
+    
+    try:
+        months=int(months)
+    except (TypeError, ValueError):
+        return {"success": False, "error": "Number of months must be a whole number."}
+    if months<1:
+        return {"success": False, "error": "Number of months must be at least 1."}
+    
+    today=datetime.now()
+    end_month=today.strftime("%Y-%m")
+    month_index=today.year*12+today.month-1-(months-1)
+    start_month=f"{month_index//12:04d}-{month_index%12+1:02d}"
+    
+    if isinstance(categories, str):
+        categories=[categories]
+    
+    # Served from the materialized monthly rollups, not the raw entries
+    rollup=store.rollup("month", start_month, end_month, categories)
+    
+    summary={}
+    category_totals={}
+    total=0.0
+    for month, buckets in rollup.items():
+        summary[month]={cat: round(stats["sum"], 2) for cat, stats in buckets.items()}
+        for cat, stats in buckets.items():
+            category_totals[cat]=category_totals.get(cat, 0.0)+stats["sum"]
+            total+=stats["sum"]
+    
+    return {
+        "success": True,
+        "start_month": start_month,
+        "end_month": end_month,
+        "months": summary,
+        "category_totals": {cat: round(amount, 2) for cat, amount in category_totals.items()},
+        "total_expense": round(total, 2)
+        }
+    
+def verify_expense_totals(repair=False):
+    """Rebuilds the running expense totals from scratch and reports any drift"""
+    store=get_store()
+    
+    if _nothing_logged(store):
+        return {"success": False, "message": "No expenses found."}
+    
+    result=store.check_totals(repair=repair)
+    
+    return {
+        "success": True,
+        "consistent": result["consistent"],
+        "repaired": result["repaired"],
+        "drift": result["drift"]
         }
     
     
@@ -331,37 +506,31 @@ def expense_status():
         
 def set_budget(category, budget):
     """Sets a budget for the specified category"""
-    categories_file="memory/categories.json"
-    budget_file="memory/budgets.json"
+    store=get_store()
     
     # Load category keys
-    if not os.path.exists(categories_file):
+    categories=store.load_categories()
+    if categories is None:
         return {"success": False, "error": "No categories defined. Please add categories first."}
-    
-    with open(categories_file, "r") as file:
-        categories=json.load(file)
         
     budget_categories=set(categories.keys())
     
+    # Accept any capitalisation of a registered category
+    category=store.resolve_category(category) or category
     if category not in categories:
         return {"success": False,
                 "error": f"'{category}' is not a valid category. Valid categories are: {', '.join(budget_categories)}"
                }
     
     # if budgets.json is missing    
-    if not os.path.exists(budget_file):
+    budgets=store.load_budgets()
+    if budgets is None:
         budgets={cat: 0 for cat in budget_categories}
-        with open(budget_file, "w") as file:
-            json.dump(budgets, file, indent=4)
-    else:
-        with open(budget_file, "r") as file:
-            budgets=json.load(file)
     
     action = "updated" if category in budgets and budgets[category]!=0 else "set"
     budgets[category] = budget
     
-    with open(budget_file, "w") as file:
-        json.dump(budgets, file, indent=4)
+    store.save_budgets(budgets)
         
     return {
         "success": True,
@@ -372,20 +541,37 @@ def set_budget(category, budget):
         }
     
 def view_budget(mode="all", category=None):
-    """Returns budget data for all or a specific category, based on mode."""
-    budget_file="memory/budgets.json"
+    """Returns budget data for all or a specific category, based on mode.
+
+    Utilization is this month's spend against each budget, read from the
+    monthly rollups.
+    """
+    store=get_store()
+    budgets=store.load_budgets()
     
-    if not os.path.exists(budget_file):
+    if budgets is None:
         return {"error": "No budgets have been set yet."}
-        
-    with open(budget_file, "r") as file:
-        budgets=json.load(file)
+    
+    current_month=datetime.now().strftime("%Y-%m")
+    spent=store.rollup("month", current_month, current_month).get(current_month, {})
+    
+    def utilization(cat):
+        budget=budgets[cat]
+        amount_spent=round(spent.get(cat, {}).get("sum", 0.0), 2)
+        return {
+            "budget": budget,
+            "spent": amount_spent,
+            "remaining": round(budget-amount_spent, 2),
+            "percent_used": round(amount_spent/budget*100, 1) if budget else None
+            }
     
     if mode=="all":
         total_categories = len(budgets)
         return {
             "mode": "all",
+            "month": current_month,
             "budgets": budgets,
+            "utilization": {cat: utilization(cat) for cat in budgets},
             "total_categories": total_categories
             }
     
@@ -393,8 +579,10 @@ def view_budget(mode="all", category=None):
         if category in budgets:
             return {
                 "mode": "specific",
+                "month": current_month,
                 "category": category,
-                "budget": budgets[category]
+                "budget": budgets[category],
+                **{key: value for key, value in utilization(category).items() if key!="budget"}
                 }
         else:
             return {
@@ -406,13 +594,11 @@ def view_budget(mode="all", category=None):
     
 def delete_budget_category(cat_choice, confirm=False):
     """Deletes a budget category if it exists and confirmation is True."""
-    budget_file="memory/budgets.json"
+    store=get_store()
+    budgets=store.load_budgets()
     
-    if not os.path.exists(budget_file):
+    if budgets is None:
         return {"success": False, "error": "No budgets have been set yet."}
-    
-    with open(budget_file, "r") as file:
-        budgets=json.load(file)
         
     if cat_choice not in budgets:
         return {"success": False, "error": f"Category '{cat_choice}' not found in your budgets."}
@@ -422,8 +608,7 @@ def delete_budget_category(cat_choice, confirm=False):
     
     deleted_value = budgets.pop(cat_choice)
     
-    with open(budget_file, "w") as file:
-        json.dump(budgets, file, indent=4)
+    store.save_budgets(budgets)
         
     return {
         "success": True,
@@ -434,67 +619,40 @@ def delete_budget_category(cat_choice, confirm=False):
 # ----------------------------------------
 # Monthly Reset and Archival
 # ----------------------------------------
+
+def compress_archives(archive_format="gzip"):
+    """Rewrites the monthly archives in a compressed format, in place"""
+    if archive_format not in ARCHIVE_FORMATS:
+        return {"success": False,
+                "error": f"Invalid format. Use one of: {', '.join(ARCHIVE_FORMATS)}"}
+    
+    result=get_archive_engine().upgrade(archive_format)
+    
+    return {
+        "success": True,
+        "format": archive_format,
+        "upgraded_months": result["upgraded_months"],
+        "bytes_before": result["bytes_before"],
+        "bytes_after": result["bytes_after"]
+        }
     
 def reset_monthly_expense():
     """Resets the expense every month"""
-    expense_file="memory/expenses.json"
+    store=get_store()
     
-    if not os.path.exists(expense_file):
+    if _nothing_logged(store):
         return {
             "success": False,
             "error": "No expenses logged yet."
         }
     
-    with open(expense_file, "r") as file:
-        expenses=json.load(file)
-        
-    monthly_archives={}
-    
-    for categories, entries in expenses.items():
-        for entry in entries:
-            date=entry.get("date", "")
-            year_month=datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m")
-            
-            if year_month not in monthly_archives:
-                monthly_archives[year_month] = {}
-                
-            if categories not in monthly_archives[year_month]:
-                monthly_archives[year_month][categories] = []
-                
-            monthly_archives[year_month][categories].append(entry)
-    
     current_month=datetime.now().strftime("%Y-%m")
-    archived_files = []
-            
-    for date in monthly_archives:
-               
-        if date==current_month:
-            continue
-        
-        archive_file=f"memory/archives/expenses_{date}.json"
-        
-        if not os.path.exists(os.path.dirname(archive_file)):
-            os.makedirs(os.path.dirname(archive_file))
-        
-        with open(archive_file, "w") as file:
-            json.dump(monthly_archives[date], file, indent=4)
-            archived_files.append(archive_file)
-            
-    for category in expenses:
-        current_month_entries=[]
-        for entry in expenses[category]:
-            entry_date=entry.get("date", "")[:7]
-            if entry_date == current_month:
-                current_month_entries.append(entry)
-        expenses[category]=current_month_entries
-                
-    with open(expense_file, "w") as file:
-        json.dump(expenses, file, indent=4)
+    archived=store.archive_before(current_month)
         
     return {
         "success": True,
-        "archived_months": [f.split("_")[-1][:-5] for f in archived_files],
-        "archived_files": archived_files,
+        "archived_months": archived["archived_months"],
+        "archived_files": archived["archived_files"],
         "retained_month": current_month
     }
 
@@ -0,0 +1,114 @@
+import io
+import os
+import csv
+import sys
+import json
+import time
+from datetime import datetime
+
+from core.storage import open_atomic
+from tools.expense_store import get_store
+
+
+EXPORT_DIR = "memory/exports"
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_FIELDS = ("id", "date", "time", "category", "amount", "description", "source")
+
+
+# ----------------------------------------
+# Streaming Export
+# ----------------------------------------
+
+def iter_export_rows(start_date=None, end_date=None, categories=None, include_archives=True):
+    """Yields one flat dict per expense: archived months first, then the live ledger
+
+    Both sources are generators, so nothing beyond one archive month is
+    held in memory however large the history is.
+    """
+    store = get_store()
+    sources = []
+    if include_archives:
+        sources.append(("archive", store.iter_archived_entries(start_date, end_date, categories)))
+    sources.append(("ledger", store.iter_entries(start_date, end_date, categories)))
+
+    for source, entries in sources:
+        for category, entry in entries:
+            yield {
+                "id": entry.get("id"),
+                "date": entry.get("date"),
+                "time": entry.get("time"),
+                "category": category,
+                "amount": entry.get("amount"),
+                "description": entry.get("description"),
+                "source": source
+                }
+
+
+def iter_export_lines(export_format="csv", **filters):
+    """Yields the export as text lines (header first for CSV)"""
+    if export_format == "jsonl":
+        for row in iter_export_rows(**filters):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for row in iter_export_rows(**filters):
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+    yield buffer.getvalue()
+
+
+def export_expenses(path=None, export_format=None, start_date=None, end_date=None,
+                    categories=None, include_archives=True):
+    """Writes the filtered ledger (and archives) to ``path`` as CSV or JSONL
+
+    The format defaults to the file extension. Rows are streamed to a temp
+    file that replaces ``path`` only once the export is complete.
+    """
+    if export_format is None:
+        export_format = "jsonl" if path and path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    export_format = export_format.lower()
+    if export_format not in EXPORT_FORMATS:
+        return {"success": False, "error": f"Unsupported export format '{export_format}'."}
+
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(EXPORT_DIR, f"expenses_{stamp}.{export_format}")
+
+    if isinstance(categories, str):
+        categories = [categories]
+    if categories is not None:
+        store = get_store()
+        categories = [store.find_category(category) or store.resolve_category(category) or category
+                      for category in categories]
+
+    started = time.perf_counter()
+    rows = 0
+    with open_atomic(path, "w", newline="") as file:
+        for line in iter_export_lines(export_format, start_date=start_date, end_date=end_date,
+                                      categories=categories, include_archives=include_archives):
+            file.write(line)
+            rows += 1
+    if export_format == "csv":
+        rows -= 1
+
+    return {
+        "success": True,
+        "path": path,
+        "format": export_format,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 3)
+        }
+
+
+if __name__ == "__main__":
+    # python -m tools.export out.csv [start_date] [end_date]
+    if len(sys.argv) < 2:
+        print("Usage: python -m tools.export <out.csv|out.jsonl> [start_date] [end_date]")
+    else:
+        args = sys.argv[1:] + [None, None]
+        print(export_expenses(args[0], start_date=args[1], end_date=args[2]))
@@ -0,0 +1,145 @@
+import os
+import json
+
+
+ROLLUPS_FILE = "memory/rollups.json"
+
+
+def _amount(entry):
+    try:
+        return float(entry.get("amount", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _new_bucket(amount):
+    return {"sum": amount, "count": 1, "min": amount, "max": amount}
+
+
+# ----------------------------------------
+# Materialized Rollups
+# ----------------------------------------
+
+class RollupTables:
+    """Per day x category and per month x category spend statistics.
+
+    Each bucket holds ``sum``, ``count``, ``min`` and ``max``. Buckets are
+    updated as entries are added or removed and cover archived months too,
+    since archiving is not deletion. Removing an entry only needs a rescan
+    when it held the bucket's min or max.
+    """
+
+    def __init__(self, daily=None, monthly=None):
+        self.daily = daily or {}
+        self.monthly = monthly or {}
+
+    @classmethod
+    def build(cls, ledgers):
+        """Builds the tables from an iterable of ``{category: [entries]}``"""
+        rollups = cls()
+        for expenses in ledgers:
+            for category, entries in expenses.items():
+                for entry in entries:
+                    rollups.add(category, entry)
+        return rollups
+
+    @classmethod
+    def load(cls, path=ROLLUPS_FILE):
+        """Returns ``(rollups, stamp)`` from disk, or ``(None, None)``
+
+        The stamp is the ``{"seq", "sha256"}`` of the snapshot the tables
+        were written alongside.
+        """
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None, None
+        return cls(data.get("daily"), data.get("monthly")), data.get("stamp")
+
+    def to_json(self, stamp):
+        return json.dumps({"stamp": stamp, "daily": self.daily, "monthly": self.monthly},
+                          separators=(",", ":"), ensure_ascii=False)
+
+    # ---------- Maintenance ----------
+
+    def add(self, category, entry):
+        amount = _amount(entry)
+        day = entry.get("date") or ""
+        for table, key in ((self.daily, day), (self.monthly, day[:7])):
+            buckets = table.setdefault(key, {})
+            bucket = buckets.get(category)
+            if bucket is None:
+                buckets[category] = _new_bucket(amount)
+            else:
+                bucket["sum"] += amount
+                bucket["count"] += 1
+                bucket["min"] = min(bucket["min"], amount)
+                bucket["max"] = max(bucket["max"], amount)
+
+    def remove(self, category, entry, remaining_amounts):
+        """Takes one entry out of its day and month buckets
+
+        ``remaining_amounts(day, category)`` must return the amounts still
+        logged for that day and category; it is only called when the removed
+        entry held the day bucket's min or max.
+        """
+        amount = _amount(entry)
+        day = entry.get("date") or ""
+        month = day[:7]
+
+        day_bucket = self.daily.get(day, {}).get(category)
+        if day_bucket is not None:
+            if day_bucket["count"] <= 1:
+                del self.daily[day][category]
+                if not self.daily[day]:
+                    del self.daily[day]
+            else:
+                day_bucket["sum"] -= amount
+                day_bucket["count"] -= 1
+                if amount <= day_bucket["min"] or amount >= day_bucket["max"]:
+                    amounts = remaining_amounts(day, category) or [day_bucket["sum"]]
+                    day_bucket["min"] = min(amounts)
+                    day_bucket["max"] = max(amounts)
+
+        month_bucket = self.monthly.get(month, {}).get(category)
+        if month_bucket is not None:
+            if month_bucket["count"] <= 1:
+                del self.monthly[month][category]
+                if not self.monthly[month]:
+                    del self.monthly[month]
+            else:
+                month_bucket["sum"] -= amount
+                month_bucket["count"] -= 1
+                if amount <= month_bucket["min"] or amount >= month_bucket["max"]:
+                    # Fold the (at most 31) day buckets of this month
+                    day_buckets = [self.daily[key][category] for key in
+                                   (f"{month}-{day_of_month:02d}" for day_of_month in range(1, 32))
+                                   if category in self.daily.get(key, {})]
+                    if day_buckets:
+                        month_bucket["min"] = min(b["min"] for b in day_buckets)
+                        month_bucket["max"] = max(b["max"] for b in day_buckets)
+
+    # ---------- Queries ----------
+
+    def query(self, granularity="month", start=None, end=None, categories=None):
+        """``{bucket: {category: stats}}`` for days or months in [start, end]
+
+        ``start`` and ``end`` are inclusive keys of the same granularity
+        (YYYY-MM-DD or YYYY-MM).
+        """
+        table = self.daily if granularity == "day" else self.monthly
+        wanted = set(categories) if categories is not None else None
+        result = {}
+        for key in sorted(table):
+            if start and key < start:
+                continue
+            if end and key > end:
+                continue
+            buckets = {category: dict(stats) for category, stats in table[key].items()
+                       if wanted is None or category in wanted}
+            if buckets:
+                result[key] = buckets
+        return result
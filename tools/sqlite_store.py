@@ -0,0 +1,712 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from tools.archive_query import ARCHIVE_DIR, ArchiveQueryEngine
+from tools.expense_store import (
+    ExpenseStore,
+    _legacy_entry_id,
+    new_entry_id,
+    EXPENSE_FILE,
+    BUDGETS_FILE,
+    CATEGORIES_FILE,
+    JOURNAL_FILE,
+    CHECKPOINT_FILE
+    )
+from tools.rollups import ROLLUPS_FILE
+
+
+DB_FILE = os.environ.get("SOLIN_SQLITE_DB", "memory/solin.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id          INTEGER PRIMARY KEY,
+    category    TEXT    NOT NULL,
+    position    INTEGER NOT NULL,
+    amount      REAL    NOT NULL DEFAULT 0,
+    description TEXT,
+    date        TEXT,
+    time        TEXT,
+    year_month  TEXT,
+    entry_id    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses (category, date);
+CREATE INDEX IF NOT EXISTS idx_expenses_year_month ON expenses (year_month);
+CREATE INDEX IF NOT EXISTS idx_expenses_category_position ON expenses (category, position);
+
+CREATE TABLE IF NOT EXISTS expense_categories (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS archived_expenses (
+    id          INTEGER PRIMARY KEY,
+    category    TEXT    NOT NULL,
+    amount      REAL    NOT NULL DEFAULT 0,
+    description TEXT,
+    date        TEXT,
+    time        TEXT,
+    year_month  TEXT,
+    entry_id    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_archived_year_month ON archived_expenses (year_month);
+CREATE INDEX IF NOT EXISTS idx_archived_category_date ON archived_expenses (category, date);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    category TEXT PRIMARY KEY,
+    budget   REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    name        TEXT PRIMARY KEY,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+ENTRY_COLUMNS = "amount, description, date, time, entry_id"
+
+
+def _row_to_entry(row):
+    return {
+        "amount": row["amount"],
+        "description": row["description"],
+        "date": row["date"],
+        "time": row["time"],
+        "id": row["entry_id"]
+        }
+
+
+def _entry_filter(start_date=None, end_date=None, categories=None, min_amount=None,
+                  max_amount=None, by_month=False):
+    """``(where, args)`` for the usual entry filters, or None if no category
+    can match. ``by_month`` also bounds ``year_month`` so the archive table's
+    month index can be used."""
+    clauses = []
+    args = []
+    if start_date:
+        clauses.append("date >= ?")
+        args.append(start_date)
+        if by_month:
+            clauses.append("year_month >= ?")
+            args.append(start_date[:7])
+    if end_date:
+        clauses.append("date <= ?")
+        args.append(end_date)
+        if by_month:
+            clauses.append("year_month <= ?")
+            args.append(end_date[:7])
+    if categories is not None:
+        categories = list(categories)
+        if not categories:
+            return None
+        clauses.append(f"category IN ({', '.join('?' for _ in categories)})")
+        args.extend(categories)
+    if min_amount is not None:
+        clauses.append("amount >= ?")
+        args.append(min_amount)
+    if max_amount is not None:
+        clauses.append("amount <= ?")
+        args.append(max_amount)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), args
+
+
+# ----------------------------------------
+# SQLite Expense Store
+# ----------------------------------------
+
+class SQLiteExpenseStore:
+    """Expense store backed by one local SQLite database.
+
+    Exposes the same interface as ``ExpenseStore`` so the expense tracker
+    functions do not care which backend is active. Date, category and month
+    lookups are answered by indexed queries instead of Python loops.
+    Categories are kept in ``expense_categories`` so that an emptied category
+    still shows up, matching the JSON ledger.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self._conn = None
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+
+    # ---------- Loading ----------
+
+    def load(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.db_file)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            # WAL lets other sessions keep reading while one of them writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate_entry_ids(self._conn)
+            self._seed_categories(self._conn)
+        return self._conn
+
+    def _seed_categories(self, conn):
+        """Fills a new database's category registry from categories.json, once
+
+        The JSON backend reads its default categories from that shipped file;
+        without them a fresh SQLite install could not even set a budget.
+        """
+        with conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'categories_seeded'").fetchone():
+                return
+            conn.execute("INSERT INTO meta (key, value) VALUES ('categories_seeded', '1')")
+            if conn.execute("SELECT 1 FROM categories LIMIT 1").fetchone():
+                return
+            if os.path.exists(CATEGORIES_FILE):
+                with open(CATEGORIES_FILE, "r", encoding="utf-8") as file:
+                    categories = json.load(file)
+                conn.executemany("INSERT INTO categories (name, description) VALUES (?, ?)",
+                                 categories.items())
+
+    def _migrate_entry_ids(self, conn):
+        """Adds and back-fills ``entry_id`` on databases created before IDs"""
+        with conn:
+            for table in ("expenses", "archived_expenses"):
+                columns = [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+                if "entry_id" not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN entry_id TEXT")
+                conn.execute(f"UPDATE {table} SET entry_id = lower(hex(randomblob(5))) "
+                             "WHERE entry_id IS NULL")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_entry_id "
+                         "ON expenses (entry_id)")
+
+    @contextmanager
+    def _transaction(self):
+        """Commits on exit, unless inside ``batch()`` which commits once at the end"""
+        conn = self.load()
+        if self._batch_depth:
+            yield conn
+        else:
+            with conn:
+                yield conn
+
+    @contextmanager
+    def batch(self):
+        """Group commit: writes inside the block share one transaction"""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                if self._batch_depth == 1:
+                    with self.load():
+                        yield self
+                else:
+                    yield self
+            finally:
+                self._batch_depth -= 1
+
+    def reload(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        return self.load()
+
+    def exists(self):
+        row = self.load().execute(
+            "SELECT value FROM meta WHERE key = 'created'").fetchone()
+        return row is not None
+
+    def _mark_created(self, conn):
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created', '1')")
+
+    # ---------- Reads ----------
+
+    @property
+    def expenses(self):
+        expenses = {name: [] for name in self.categories()}
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM expenses ORDER BY category, position")
+        for row in rows:
+            expenses.setdefault(row["category"], []).append(_row_to_entry(row))
+        return expenses
+
+    def categories(self):
+        rows = self.load().execute("SELECT name FROM expense_categories ORDER BY rowid")
+        return [row["name"] for row in rows]
+
+    def has_category(self, category):
+        row = self.load().execute(
+            "SELECT 1 FROM expense_categories WHERE name = ?", (category,)).fetchone()
+        return row is not None
+
+    def find_category(self, category):
+        row = self.load().execute(
+            "SELECT name FROM expense_categories WHERE lower(name) = lower(?)",
+            (category,)).fetchone()
+        return row["name"] if row else None
+
+    def entries(self, category):
+        rows = self.load().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM expenses WHERE category = ? ORDER BY position",
+            (category,))
+        return [_row_to_entry(row) for row in rows]
+
+    def locate(self, entry_id):
+        """``(category, 0-based index)`` of the entry with ``entry_id``, or None"""
+        row = self.load().execute(
+            "SELECT category, (SELECT COUNT(*) FROM expenses AS earlier "
+            "WHERE earlier.category = e.category AND earlier.position < e.position) AS position "
+            "FROM expenses AS e WHERE entry_id = ?", (entry_id,)).fetchone()
+        return (row["category"], row["position"]) if row else None
+
+    def get_by_id(self, entry_id):
+        row = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM expenses WHERE entry_id = ?",
+            (entry_id,)).fetchone()
+        return (row["category"], _row_to_entry(row)) if row else None
+
+    def entries_on(self, date):
+        return self.entries_between(date, date)
+
+    def entries_between(self, start_date=None, end_date=None, categories=None,
+                        min_amount=None, max_amount=None):
+        query = _entry_filter(start_date, end_date, categories, min_amount, max_amount)
+        if query is None:
+            return {}
+        where, args = query
+
+        filtered = {}
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM expenses {where} "
+            "ORDER BY category, date, position", args)
+        for row in rows:
+            filtered.setdefault(row["category"], []).append(_row_to_entry(row))
+        return filtered
+
+    def iter_entries(self, start_date=None, end_date=None, categories=None):
+        """Yields ``(category, entry)`` in date order straight off the cursor"""
+        query = _entry_filter(start_date, end_date, categories)
+        if query is None:
+            return
+        where, args = query
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM expenses {where} "
+            "ORDER BY date, time, id", args)
+        for row in rows:
+            yield row["category"], _row_to_entry(row)
+
+    def category_total(self, category):
+        row = self.load().execute(
+            "SELECT TOTAL(amount) AS total FROM expenses WHERE category = ?",
+            (category,)).fetchone()
+        return row["total"]
+
+    def month_total(self, year_month, category=None):
+        if category is not None:
+            row = self.load().execute(
+                "SELECT TOTAL(amount) AS total FROM expenses "
+                "WHERE year_month = ? AND category = ?", (year_month, category)).fetchone()
+        else:
+            row = self.load().execute(
+                "SELECT TOTAL(amount) AS total FROM expenses WHERE year_month = ?",
+                (year_month,)).fetchone()
+        return row["total"]
+
+    def grand_total(self):
+        row = self.load().execute(
+            "SELECT TOTAL(amount) AS total FROM expenses").fetchone()
+        return row["total"]
+
+    def aggregate(self, by="category"):
+        group = {"category": "category", "day": "date", "month": "year_month"}.get(by)
+        if group is None:
+            raise ValueError(f"Cannot aggregate by '{by}'")
+        rows = self.load().execute(
+            f"SELECT {group} AS bucket, TOTAL(amount) AS total FROM expenses "
+            f"GROUP BY {group} ORDER BY {group}")
+        return {row["bucket"]: row["total"] for row in rows}
+
+    def rollup(self, granularity="month", start=None, end=None, categories=None):
+        """Same shape as ``ExpenseStore.rollup``, grouped by SQLite on demand
+
+        The (category, date) and year_month indexes keep this an index scan
+        over live and archived rows.
+        """
+        group = {"day": "COALESCE(date, '')", "month": "year_month"}.get(granularity)
+        if group is None:
+            raise ValueError(f"Cannot roll up by '{granularity}'")
+
+        clauses = []
+        args = []
+        if start:
+            clauses.append(f"{group} >= ?")
+            args.append(start)
+        if end:
+            clauses.append(f"{group} <= ?")
+            args.append(end)
+        if categories is not None:
+            categories = list(categories)
+            if not categories:
+                return {}
+            clauses.append(f"category IN ({', '.join('?' for _ in categories)})")
+            args.extend(categories)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = self.load().execute(
+            f"SELECT bucket, category, TOTAL(amount) AS sum, COUNT(*) AS count, "
+            f"MIN(amount) AS min, MAX(amount) AS max FROM ("
+            f"SELECT {group} AS bucket, category, amount FROM expenses{where} "
+            f"UNION ALL "
+            f"SELECT {group} AS bucket, category, amount FROM archived_expenses{where}) "
+            f"GROUP BY bucket, category ORDER BY bucket, category",
+            args + args)
+        result = {}
+        for row in rows:
+            result.setdefault(row["bucket"], {})[row["category"]] = {
+                "sum": row["sum"], "count": row["count"],
+                "min": row["min"], "max": row["max"]}
+        return result
+
+    def check_totals(self, repair=False):
+        """Totals are aggregated by SQLite on demand, so they cannot drift"""
+        return {"consistent": True, "repaired": False,
+                "drift": {"categories": {}, "months": {}, "grand_total": None}}
+
+    def status(self):
+        conn = self.load()
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, TOTAL(amount) AS spent, "
+            "MAX(date) AS last_date FROM expenses").fetchone()
+        total_categories = conn.execute(
+            "SELECT COUNT(*) AS n FROM expense_categories").fetchone()["n"]
+        return {
+            "total_entries": row["entries"],
+            "total_categories": total_categories,
+            "total_amount_spent": row["spent"],
+            "last_entry_date": row["last_date"]
+            }
+
+    # ---------- Writes ----------
+
+    def _row_id(self, conn, category, index):
+        row = conn.execute(
+            "SELECT id FROM expenses WHERE category = ? ORDER BY position "
+            "LIMIT 1 OFFSET ?", (category, index)).fetchone()
+        if row is None:
+            raise IndexError(f"No entry {index + 1} in category '{category}'")
+        return row["id"]
+
+    def _next_position(self, conn, category):
+        row = conn.execute(
+            "SELECT COALESCE(MAX(position), 0) + 1 AS position FROM expenses "
+            "WHERE category = ?", (category,)).fetchone()
+        return row["position"]
+
+    def _insert(self, conn, category, entry):
+        conn.execute("INSERT OR IGNORE INTO expense_categories (name) VALUES (?)",
+                     (category,))
+        date = entry.get("date") or ""
+        entry.setdefault("id", new_entry_id())
+        conn.execute(
+            "INSERT INTO expenses (category, position, amount, description, date, time, "
+            "year_month, entry_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (category, self._next_position(conn, category), entry.get("amount", 0),
+             entry.get("description"), entry.get("date"), entry.get("time"), date[:7],
+             entry["id"]))
+
+    def add(self, category, entry):
+        with self._lock, self._transaction() as conn:
+            self._insert(conn, category, entry)
+            self._mark_created(conn)
+        return entry
+
+    def add_many(self, items):
+        """Inserts ``(category, entry)`` pairs in one transaction"""
+        entries = []
+        with self._lock, self._transaction() as conn:
+            for category, entry in items:
+                self._insert(conn, category, entry)
+                entries.append(entry)
+            if entries:
+                self._mark_created(conn)
+        return entries
+
+    def update(self, category, index, field, value):
+        with self._lock, self._transaction() as conn:
+            return self._update_row(conn, self._row_id(conn, category, index), field, value)
+
+    def move(self, category, index, new_category):
+        with self._lock, self._transaction() as conn:
+            return self._move_row(conn, self._row_id(conn, category, index), new_category)
+
+    def remove(self, category, index):
+        with self._lock, self._transaction() as conn:
+            return self._remove_row(conn, self._row_id(conn, category, index))
+
+    # The unique entry_id index makes these single indexed lookups
+
+    def _row_for_entry_id(self, conn, entry_id):
+        row = conn.execute("SELECT id FROM expenses WHERE entry_id = ?", (entry_id,)).fetchone()
+        return row["id"] if row else None
+
+    def update_by_id(self, entry_id, field, value):
+        with self._lock, self._transaction() as conn:
+            row_id = self._row_for_entry_id(conn, entry_id)
+            return self._update_row(conn, row_id, field, value) if row_id else None
+
+    def move_by_id(self, entry_id, new_category):
+        with self._lock, self._transaction() as conn:
+            row_id = self._row_for_entry_id(conn, entry_id)
+            return self._move_row(conn, row_id, new_category) if row_id else None
+
+    def remove_by_id(self, entry_id):
+        with self._lock, self._transaction() as conn:
+            row_id = self._row_for_entry_id(conn, entry_id)
+            return self._remove_row(conn, row_id) if row_id else None
+
+    def _update_row(self, conn, row_id, field, value):
+        if field not in ("amount", "description", "date", "time"):
+            raise ValueError(f"Unknown field '{field}'")
+        conn.execute(f"UPDATE expenses SET {field} = ? WHERE id = ?", (value, row_id))
+        if field == "date":
+            conn.execute("UPDATE expenses SET year_month = ? WHERE id = ?",
+                         ((value or "")[:7], row_id))
+        row = conn.execute(f"SELECT {ENTRY_COLUMNS} FROM expenses WHERE id = ?",
+                           (row_id,)).fetchone()
+        return _row_to_entry(row)
+
+    def _move_row(self, conn, row_id, new_category):
+        conn.execute("INSERT OR IGNORE INTO expense_categories (name) VALUES (?)",
+                     (new_category,))
+        conn.execute("UPDATE expenses SET category = ?, position = ? WHERE id = ?",
+                     (new_category, self._next_position(conn, new_category), row_id))
+        row = conn.execute(f"SELECT {ENTRY_COLUMNS} FROM expenses WHERE id = ?",
+                           (row_id,)).fetchone()
+        return _row_to_entry(row)
+
+    def _remove_row(self, conn, row_id):
+        row = conn.execute(f"SELECT {ENTRY_COLUMNS} FROM expenses WHERE id = ?",
+                           (row_id,)).fetchone()
+        conn.execute("DELETE FROM expenses WHERE id = ?", (row_id,))
+        return _row_to_entry(row)
+
+    def clear_category(self, category):
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM expenses WHERE category = ?", (category,))
+
+    def delete_category(self, category):
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM expenses WHERE category = ?", (category,))
+            conn.execute("DELETE FROM expense_categories WHERE name = ?", (category,))
+
+    # ---------- Monthly Archival ----------
+
+    def archive_before(self, current_month, archive_dir=ARCHIVE_DIR):
+        """Moves entries from other months into ``archived_expenses``"""
+        with self._lock, self._transaction() as conn:
+            months = [row["year_month"] for row in conn.execute(
+                "SELECT DISTINCT year_month FROM expenses WHERE year_month != ? "
+                "ORDER BY year_month", (current_month,))]
+            conn.execute(
+                "INSERT INTO archived_expenses (category, amount, description, date, time, "
+                "year_month, entry_id) "
+                "SELECT category, amount, description, date, time, year_month, entry_id FROM expenses "
+                "WHERE year_month != ? ORDER BY category, position", (current_month,))
+            conn.execute("DELETE FROM expenses WHERE year_month != ?", (current_month,))
+        return {"archived_months": months, "archived_files": []}
+
+    def archived_entries(self, year_month):
+        """Returns ``{category: [entries]}`` archived for ``year_month``"""
+        archived = {}
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM archived_expenses "
+            "WHERE year_month = ? ORDER BY id", (year_month,))
+        for row in rows:
+            archived.setdefault(row["category"], []).append(_row_to_entry(row))
+        return archived
+
+    def iter_archived_entries(self, start_date=None, end_date=None, categories=None):
+        query = _entry_filter(start_date, end_date, categories, by_month=True)
+        if query is None:
+            return
+        where, args = query
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM archived_expenses {where} "
+            "ORDER BY date, time, id", args)
+        for row in rows:
+            yield row["category"], _row_to_entry(row)
+
+    def archived_entries_between(self, start_date=None, end_date=None, categories=None,
+                                 min_amount=None, max_amount=None):
+        query = _entry_filter(start_date, end_date, categories, min_amount, max_amount,
+                              by_month=True)
+        if query is None:
+            return {}
+        where, args = query
+
+        archived = {}
+        rows = self.load().execute(
+            f"SELECT category, {ENTRY_COLUMNS} FROM archived_expenses {where} "
+            "ORDER BY category, date, id", args)
+        for row in rows:
+            archived.setdefault(row["category"], []).append(_row_to_entry(row))
+        return archived
+
+    def has_archives(self):
+        return self.load().execute(
+            "SELECT 1 FROM archived_expenses LIMIT 1").fetchone() is not None
+
+    def archive_status(self):
+        conn = self.load()
+        months = [row["year_month"] for row in conn.execute(
+            "SELECT DISTINCT year_month FROM archived_expenses ORDER BY year_month")]
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, TOTAL(amount) AS total, MAX(date) AS last_date "
+            "FROM archived_expenses").fetchone()
+        categories = [r["category"] for r in conn.execute(
+            "SELECT DISTINCT category FROM archived_expenses ORDER BY category")]
+        return {
+            "months": months,
+            "entries": row["entries"],
+            "total": row["total"],
+            "categories": categories,
+            "last_entry_date": row["last_date"]
+            }
+
+    # ---------- Budgets and Categories ----------
+
+    def load_budgets(self):
+        conn = self.load()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'budgets'").fetchone() is None:
+            return None
+        rows = conn.execute("SELECT category, budget FROM budgets ORDER BY rowid")
+        return {row["category"]: row["budget"] for row in rows}
+
+    def save_budgets(self, budgets):
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM budgets")
+            conn.executemany("INSERT INTO budgets (category, budget) VALUES (?, ?)",
+                             budgets.items())
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('budgets', '1')")
+
+    def load_categories(self):
+        rows = self.load().execute("SELECT name, description FROM categories ORDER BY rowid")
+        categories = {row["name"]: row["description"] for row in rows}
+        return categories or None
+
+    def save_categories(self, categories):
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM categories")
+            conn.executemany("INSERT INTO categories (name, description) VALUES (?, ?)",
+                             categories.items())
+
+    def resolve_category(self, category):
+        row = self.load().execute(
+            "SELECT name FROM categories WHERE lower(name) = lower(?) ORDER BY rowid",
+            (" ".join(category.split()),)).fetchone()
+        return row["name"] if row else None
+
+
+# ----------------------------------------
+# One-shot JSON -> SQLite Migration
+# ----------------------------------------
+
+def migrate_json_to_sqlite(db_file=DB_FILE,
+                           expense_file=EXPENSE_FILE,
+                           budgets_file=BUDGETS_FILE,
+                           categories_file=CATEGORIES_FILE,
+                           archive_dir=ARCHIVE_DIR,
+                           force=False):
+    """Imports the JSON ledger, budgets, categories and archives into SQLite"""
+    store = SQLiteExpenseStore(db_file)
+    conn = store.load()
+
+    if store.exists() and not force:
+        return {"success": False,
+                "error": f"'{db_file}' already holds data. Pass force=True to import again."}
+
+    # The source ledger's journal, checkpoint and rollups live next to it.
+    # Read-only: migrating must not back-fill IDs into it or compact it.
+    def sibling(default):
+        return os.path.join(os.path.dirname(expense_file), os.path.basename(default))
+
+    ledger = ExpenseStore(expense_file=expense_file, journal_file=sibling(JOURNAL_FILE),
+                          checkpoint_file=sibling(CHECKPOINT_FILE),
+                          rollups_file=sibling(ROLLUPS_FILE), archive_dir=archive_dir,
+                          read_only=True)
+    expenses = ledger.load()
+
+    imported_entries = 0
+    archived_entries = 0
+    archive_months = []
+
+    with store._lock, conn:
+        if force:
+            for table in ("expenses", "expense_categories", "archived_expenses",
+                          "budgets", "categories", "meta"):
+                conn.execute(f"DELETE FROM {table}")
+
+        for category, entries in expenses.items():
+            conn.execute("INSERT OR IGNORE INTO expense_categories (name) VALUES (?)",
+                         (category,))
+            for position, entry in enumerate(entries, 1):
+                date = entry.get("date") or ""
+                conn.execute(
+                    "INSERT INTO expenses (category, position, amount, description, date, time, "
+                    "year_month, entry_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (category, position, entry.get("amount", 0), entry.get("description"),
+                     entry.get("date"), entry.get("time"), date[:7], entry["id"]))
+                imported_entries += 1
+
+        archives = ArchiveQueryEngine(archive_dir)
+        for year_month in archives.months():
+            archive = archives.load(year_month)
+            for category, entries in archive.items():
+                for position, entry in enumerate(entries):
+                    # Archives written before IDs existed get the same ID on every run
+                    entry_id = entry.get("id") or _legacy_entry_id(
+                        "archive", year_month, category, position, entry.get("amount"),
+                        entry.get("description"), entry.get("date"), entry.get("time"))
+                    conn.execute(
+                        "INSERT INTO archived_expenses (category, amount, description, date, time, "
+                        "year_month, entry_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (category, entry.get("amount", 0), entry.get("description"),
+                         entry.get("date"), entry.get("time"), year_month, entry_id))
+                    archived_entries += 1
+            archive_months.append(year_month)
+
+        if os.path.exists(budgets_file):
+            with open(budgets_file, "r") as file:
+                budgets = json.load(file)
+            conn.executemany("INSERT INTO budgets (category, budget) VALUES (?, ?)",
+                             budgets.items())
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('budgets', '1')")
+
+        if os.path.exists(categories_file):
+            with open(categories_file, "r") as file:
+                categories = json.load(file)
+            # Replaces the defaults the new database was seeded with
+            conn.execute("DELETE FROM categories")
+            conn.executemany("INSERT INTO categories (name, description) VALUES (?, ?)",
+                             categories.items())
+
+        store._mark_created(conn)
+
+    return {
+        "success": True,
+        "db_file": db_file,
+        "imported_entries": imported_entries,
+        "archived_entries": archived_entries,
+        "archive_months": archive_months
+        }
+
+
+if __name__ == "__main__":
+    # python -m tools.sqlite_store migrate [--force]
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        print(migrate_json_to_sqlite(force="--force" in sys.argv))
+    else:
+        print("Usage: python -m tools.sqlite_store migrate [--force]")
@@ -43,4 +43,42 @@ def interpret_date_reference(date_str):
         return datetime(year, target_month, 1).strftime("%Y-%m-%d")
     
     return None
-    
\ No newline at end of file
+    
+def interpret_date_range(range_str):
+    """Interprets a period like 'last 7 days' or 'this month' as (start, end) dates"""
+    today=datetime.now()
+    period=range_str.lower().strip().replace("_", " ")
+    
+    if period in ["today", "todays"]:
+        return today.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+    
+    if period=="yesterday":
+        yesterday=(today-timedelta(days=1)).strftime("%Y-%m-%d")
+        return yesterday, yesterday
+    
+    words=period.split()
+    if len(words)==3 and words[0] in ["last", "past"] and words[1].isdigit() and words[2] in ["day", "days"]:
+        num_days=int(words[1])
+        start=today-timedelta(days=max(num_days-1, 0))
+        return start.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+    
+    if period in ["this week", "current week"]:
+        start=today-timedelta(days=today.weekday())
+        return start.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+    
+    if period in ["last week", "previous week"]:
+        end=today-timedelta(days=today.weekday()+1)
+        start=end-timedelta(days=6)
+        return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    
+    if period in ["this month", "current month"]:
+        return today.strftime("%Y-%m-01"), today.strftime("%Y-%m-%d")
+    
+    if period in ["last month", "previous month"]:
+        end=today.replace(day=1)-timedelta(days=1)
+        return end.strftime("%Y-%m-01"), end.strftime("%Y-%m-%d")
+    
+    if period in ["this year", "current year"]:
+        return today.strftime("%Y-01-01"), today.strftime("%Y-%m-%d")
+    
+    return None